@@ -9,4 +9,6 @@ class ProfileAdmin(admin.ModelAdmin):
         Profile.user.field.name,
         Profile.date_of_birth.field.name,
         Profile.photo.field.name,
+        Profile.followers_count.field.name,
+        Profile.following_count.field.name,
     ]
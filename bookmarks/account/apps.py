@@ -5,3 +5,6 @@ class AccountConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "account"
     verbose_name = "Пользователь"
+
+    def ready(self) -> None:
+        import account.signals  # noqa: F401
@@ -0,0 +1,124 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest
+from django.utils import timezone
+
+from account.membership import get_membership, Membership
+from account.models import Contact, Profile
+
+
+def following(request: HttpRequest) -> Membership:
+    """
+    Кого из пользователей читает текущий пользователь
+    """
+    return get_membership(
+        request,
+        "following",
+        Contact.objects.filter(user_from_id=request.user.id),
+        "user_to_id",
+    )
+
+
+def change_counts(user_from_id: int, user_to_id: int, delta: int) -> None:
+    """
+    Сдвинуть счётчики подписок обоих пользователей на delta.
+    Вызывается в транзакции, в которой меняется сама связь
+    """
+    Profile.objects.filter(
+        user_id=user_to_id,
+        followers_count__gte=-delta,
+    ).update(followers_count=F("followers_count") + delta)
+    Profile.objects.filter(
+        user_id=user_from_id,
+        following_count__gte=-delta,
+    ).update(following_count=F("following_count") + delta)
+
+
+def _execute(sql: str, params: list[object]) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def follow(user_from: User, user_to: User) -> bool:
+    """
+    Подписаться одним INSERT ... ON CONFLICT DO NOTHING.
+    Повторный или параллельный запрос упирается в уникальное
+    ограничение и ничего не меняет. Возвращает True, если связь создана
+    """
+    table = Contact._meta.db_table
+    with transaction.atomic():
+        created = _execute(
+            f"INSERT INTO {table} (user_from_id, user_to_id, created) "
+            "VALUES (%s, %s, %s) ON CONFLICT DO NOTHING",
+            [
+                user_from.id,
+                user_to.id,
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+            ],
+        )
+        if created:
+            change_counts(user_from.id, user_to.id, 1)
+    return bool(created)
+
+
+def unfollow(user_from: User, user_to: User) -> bool:
+    """
+    Отписаться одним DELETE. Возвращает True, если связь была
+    """
+    table = Contact._meta.db_table
+    with transaction.atomic():
+        deleted = _execute(
+            f"DELETE FROM {table} WHERE user_from_id = %s AND user_to_id = %s",
+            [user_from.id, user_to.id],
+        )
+        if deleted:
+            change_counts(user_from.id, user_to.id, -1)
+    return bool(deleted)
+
+
+def follow_counts(user_from: User, user_to: User) -> dict[str, int]:
+    """
+    Число подписчиков user_to и подписок user_from одним запросом
+    """
+    counts = {
+        user_id: (followers, following)
+        for user_id, followers, following in Profile.objects.filter(
+            user_id__in=[user_from.id, user_to.id],
+        ).values_list("user_id", "followers_count", "following_count")
+    }
+    return {
+        "followers_count": counts.get(user_to.id, (0, 0))[0],
+        "following_count": counts.get(user_from.id, (0, 0))[1],
+    }
+
+
+def _count(field: str) -> Coalesce:
+    contacts = (
+        Contact.objects.filter(**{field: OuterRef("user_id")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(contacts), 0)
+
+
+def reconcile(user_ids: list[int]) -> int:
+    """
+    Пересчитать счётчики профилей по таблице подписок.
+    Возвращает число исправленных профилей
+    """
+    followers = _count("user_to_id")
+    following = _count("user_from_id")
+    return (
+        Profile.objects.filter(user_id__in=user_ids)
+        .annotate(actual_followers=followers, actual_following=following)
+        .exclude(
+            followers_count=F("actual_followers"),
+            following_count=F("actual_following"),
+        )
+        .update(followers_count=followers, following_count=following)
+    )
@@ -0,0 +1,46 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+import account.follows
+from account.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Recount Profile follower and following counts from contacts"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--start-id",
+            type=int,
+            default=0,
+            help="Resume after this user id",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queryset = Profile.objects.order_by("user_id").values_list(
+            "user_id",
+            flat=True,
+        )
+        last_id = options["start_id"]
+        checked = 0
+        repaired = 0
+        while True:
+            batch = list(
+                queryset.filter(user_id__gt=last_id)[: options["batch_size"]],
+            )
+            if not batch:
+                break
+
+            repaired += account.follows.reconcile(batch)
+            last_id = batch[-1]
+            checked += len(batch)
+            self.stdout.write(
+                f"Checked {checked} profile(s), repaired {repaired}, "
+                f"last user id {last_id}",
+            )
+
+        self.stdout.write(
+            f"Done, {checked} profile(s) checked, {repaired} repaired",
+        )
@@ -0,0 +1,65 @@
+from collections.abc import Iterable
+
+from django.db.models import QuerySet
+from django.http import HttpRequest
+
+
+class Membership:
+    """
+    Кеш на время запроса: связан ли текущий пользователь с объектами.
+    Одиночная проверка — EXISTS по индексу, пакетная — один запрос
+    на все ещё не проверенные id
+    """
+
+    def __init__(self, queryset: QuerySet, field: str) -> None:
+        self.queryset = queryset
+        self.field = field
+        self._known: dict[int, bool] = {}
+
+    def _lookup(self, ids: list[int]) -> set[int]:
+        if len(ids) == 1:
+            exists = self.queryset.filter(**{self.field: ids[0]}).exists()
+            return set(ids) if exists else set()
+
+        return set(
+            self.queryset.filter(**{f"{self.field}__in": ids})
+            .order_by()
+            .values_list(self.field, flat=True),
+        )
+
+    def prime(self, ids: Iterable[int]) -> None:
+        missing = list(dict.fromkeys(i for i in ids if i not in self._known))
+        if not missing:
+            return
+
+        found = self._lookup(missing)
+        for object_id in missing:
+            self._known[object_id] = object_id in found
+
+    def filter(self, ids: Iterable[int]) -> set[int]:
+        ids = list(ids)
+        self.prime(ids)
+        return {object_id for object_id in ids if self._known[object_id]}
+
+    def __contains__(self, object_id: int) -> bool:
+        self.prime([object_id])
+        return self._known[object_id]
+
+
+def get_membership(
+    request: HttpRequest,
+    name: str,
+    queryset: QuerySet,
+    field: str,
+) -> Membership:
+    """
+    Один Membership на запрос для каждого вида связи.
+    Для анонимного пользователя запросы к БД не выполняются
+    """
+    memberships = request.__dict__.setdefault("_memberships", {})
+    if name not in memberships:
+        if not request.user.is_authenticated:
+            queryset = queryset.none()
+        memberships[name] = Membership(queryset, field)
+
+    return memberships[name]
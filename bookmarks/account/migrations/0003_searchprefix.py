@@ -0,0 +1,87 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:27
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Копия account.search.user_prefixes на момент миграции: миграция
+# не должна меняться вместе с живым кодом
+PREFIX_MAX_LENGTH = 16
+
+
+def user_prefixes(username, first_name, last_name):
+    text = unicodedata.normalize(
+        "NFKD", f"{username} {first_name} {last_name}"
+    )
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    prefixes = set()
+    for word in re.findall(r"[^\W_]+", text.casefold()):
+        word = word[:PREFIX_MAX_LENGTH]
+        prefixes.update(word[:end] for end in range(1, len(word) + 1))
+    return prefixes
+
+
+def fill_prefixes(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    SearchPrefix = apps.get_model("account", "SearchPrefix")
+    users = User.objects.order_by("pk").values_list(
+        "pk",
+        "username",
+        "first_name",
+        "last_name",
+    )
+    rows = []
+    for pk, username, first_name, last_name in users.iterator(
+        chunk_size=1000,
+    ):
+        rows.extend(
+            SearchPrefix(user_id=pk, prefix=prefix, username=username)
+            for prefix in user_prefixes(username, first_name, last_name)
+        )
+        if len(rows) >= 10000:
+            SearchPrefix.objects.bulk_create(rows)
+            rows = []
+    SearchPrefix.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0002_contact"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchPrefix",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=16)),
+                ("username", models.CharField(max_length=150)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_prefixes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("prefix", "username")},
+            },
+        ),
+        migrations.RunPython(fill_prefixes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_follow_counts(apps, schema_editor):
+    Contact = apps.get_model("account", "Contact")
+    Profile = apps.get_model("account", "Profile")
+
+    def count(field):
+        contacts = (
+            Contact.objects.filter(**{field: OuterRef("user_id")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        return Coalesce(Subquery(contacts), 0)
+
+    Profile.objects.update(
+        followers_count=count("user_to_id"),
+        following_count=count("user_from_id"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0003_searchprefix"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import Count, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def recount(Contact, Profile, user_ids):
+    def count(field):
+        contacts = (
+            Contact.objects.filter(**{field: OuterRef("user_id")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        return Coalesce(Subquery(contacts), 0)
+
+    Profile.objects.filter(user_id__in=user_ids).update(
+        followers_count=count("user_to_id"),
+        following_count=count("user_from_id"),
+    )
+
+
+def remove_duplicates(apps, schema_editor):
+    # Из повторяющихся связей остаётся самая ранняя (с меньшим id)
+    Contact = apps.get_model("account", "Contact")
+    Profile = apps.get_model("account", "Profile")
+    duplicates = (
+        Contact.objects.order_by()
+        .values("user_from_id", "user_to_id")
+        .annotate(keep=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    while True:
+        batch = list(duplicates[:BATCH_SIZE])
+        if not batch:
+            break
+
+        pairs = Q()
+        user_ids = set()
+        for row in batch:
+            pairs |= Q(
+                user_from_id=row["user_from_id"],
+                user_to_id=row["user_to_id"],
+            )
+            user_ids.update((row["user_from_id"], row["user_to_id"]))
+        # Каждая пачка — своя короткая транзакция
+        with transaction.atomic():
+            Contact.objects.filter(pairs).exclude(
+                id__in=[row["keep"] for row in batch],
+            ).delete()
+            recount(Contact, Profile, user_ids)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("account", "0004_profile_follow_counts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="contact",
+            constraint=models.UniqueConstraint(
+                fields=("user_from", "user_to"),
+                name="account_contact_unique_edge",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["user_to", "user_from"],
+                name="account_contact_followers",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="contact",
+            name="user_from",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rel_from_set",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="contact",
+            name="user_to",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rel_to_set",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
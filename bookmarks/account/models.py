@@ -10,6 +10,8 @@ class Profile(models.Model):
     )
     date_of_birth = models.DateField(blank=True, null=True)
     photo = models.ImageField(upload_to="users/%Y/%m/%d/", blank=True)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"Profile of {self.user.username}"
@@ -19,25 +21,43 @@ class Profile(models.Model):
             f"{self.__class__.__name__}("
             f"{self.user!r}, "
             f"{self.date_of_birth!r}, "
-            f"{self.photo!r})"
+            f"{self.photo!r}, "
+            f"{self.followers_count!r}, "
+            f"{self.following_count!r})"
         )
 
 
 class Contact(models.Model):
+    # Отдельные индексы по FK не нужны: их покрывают уникальное
+    # ограничение (user_from, user_to) и индекс (user_to, user_from)
     user_from = models.ForeignKey(
         "auth.User",
         related_name="rel_from_set",
         on_delete=models.CASCADE,
+        db_index=False,
     )
     user_to = models.ForeignKey(
         "auth.User",
         related_name="rel_to_set",
         on_delete=models.CASCADE,
+        db_index=False,
     )
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        indexes = [models.Index(fields=["-created"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_from", "user_to"],
+                name="account_contact_unique_edge",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["-created"]),
+            models.Index(
+                fields=["user_to", "user_from"],
+                name="account_contact_followers",
+            ),
+        ]
         ordering = ["-created"]
 
     def __str__(self) -> str:
@@ -52,6 +72,38 @@ class Contact(models.Model):
         )
 
 
+class SearchPrefix(models.Model):
+    """
+    Префиксы слов из имени пользователя и полного имени для поиска
+    людей по началу слова. Имя пользователя продублировано, чтобы
+    выдача по префиксу шла по индексу в алфавитном порядке
+    """
+
+    MAX_LENGTH = 16
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="search_prefixes",
+        on_delete=models.CASCADE,
+    )
+    prefix = models.CharField(max_length=MAX_LENGTH)
+    username = models.CharField(max_length=150)
+
+    class Meta:
+        unique_together = [("prefix", "username")]
+
+    def __str__(self) -> str:
+        return f"{self.prefix} -> {self.username}"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"{self.user!r}, "
+            f"{self.prefix!r}, "
+            f"{self.username!r})"
+        )
+
+
 user_model = get_user_model()
 user_model.add_to_class(
     "following",
@@ -0,0 +1,83 @@
+from collections.abc import Iterable
+import re
+import unicodedata
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+
+from account.models import SearchPrefix
+
+
+SEARCH_FIELDS = ("username", "first_name", "last_name")
+
+
+def normalize(text: str) -> list[str]:
+    """
+    Слова текста без регистра и диакритики: «Zoë_Smith» -> zoe, smith
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r"[^\W_]+", text.casefold())
+
+
+def user_prefixes(username: str, first_name: str, last_name: str) -> set[str]:
+    prefixes = set()
+    for word in normalize(f"{username} {first_name} {last_name}"):
+        word = word[: SearchPrefix.MAX_LENGTH]
+        prefixes.update(word[:end] for end in range(1, len(word) + 1))
+    return prefixes
+
+
+def index_users(users: Iterable[User], batch_size: int = 1000) -> None:
+    """
+    Пересобрать префиксы пользователей
+    """
+    users = list(users)
+    rows = [
+        SearchPrefix(user=user, prefix=prefix, username=user.username)
+        for user in users
+        for prefix in user_prefixes(
+            user.username,
+            user.first_name,
+            user.last_name,
+        )
+    ]
+    with transaction.atomic():
+        SearchPrefix.objects.filter(user__in=users).delete()
+        SearchPrefix.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def search_users(query: str) -> QuerySet[SearchPrefix]:
+    """
+    Активные пользователи, у которых каждое слово запроса является
+    началом слова из имени пользователя или полного имени.
+    Выборка идёт по самому длинному слову, остальные проверяются
+    подзапросами. Слова длиннее MAX_LENGTH дополнительно
+    сверяются с самими полями пользователя
+    """
+    words = sorted(set(normalize(query)), key=len, reverse=True)
+    if not words:
+        return SearchPrefix.objects.none()
+
+    queryset = SearchPrefix.objects.filter(
+        prefix=words[0][: SearchPrefix.MAX_LENGTH],
+        user__is_active=True,
+    )
+    for word in words[1:]:
+        queryset = queryset.filter(
+            Exists(
+                SearchPrefix.objects.filter(
+                    user_id=OuterRef("user_id"),
+                    prefix=word[: SearchPrefix.MAX_LENGTH],
+                ),
+            ),
+        )
+    for word in words:
+        if len(word) > SearchPrefix.MAX_LENGTH:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f"user__{field}__icontains": word})
+            queryset = queryset.filter(condition)
+
+    return queryset.select_related("user")
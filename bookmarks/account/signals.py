@@ -0,0 +1,71 @@
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from account.follows import change_counts
+from account.models import Contact, Profile
+from account.search import index_users, SEARCH_FIELDS
+from account.thumbnails import photo_index
+
+
+@receiver(post_save, sender=User)
+def reindex_user(
+    sender: type,
+    instance: User,
+    created: bool,
+    update_fields: frozenset[str] | None = None,
+    **kwargs: Any,
+) -> None:
+    # Вход обновляет только last_login, индекс при этом не нужен
+    if update_fields is not None and not set(SEARCH_FIELDS) & update_fields:
+        return
+    index_users([instance])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_photo(sender: type, instance: Profile, **kwargs: Any) -> None:
+    photo_index.invalidate(instance.id, instance.photo.name)
+
+
+@receiver(post_save, sender=Contact)
+def count_new_contact(
+    sender: type,
+    instance: Contact,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    if created:
+        change_counts(instance.user_from_id, instance.user_to_id, 1)
+
+
+@receiver(post_delete, sender=Contact)
+def count_deleted_contact(
+    sender: type,
+    instance: Contact,
+    **kwargs: Any,
+) -> None:
+    change_counts(instance.user_from_id, instance.user_to_id, -1)
+
+
+@receiver(m2m_changed, sender=Contact)
+def count_added_following(
+    sender: type,
+    instance: User,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    # following.add() создаёт связи через bulk_create без post_save,
+    # в pk_set при этом только действительно добавленные id.
+    # Удаление через following.remove()/clear() вызывает post_delete
+    if action != "post_add":
+        return
+    for pk in pk_set:
+        if reverse:
+            change_counts(pk, instance.id, 1)
+        else:
+            change_counts(instance.id, pk, 1)
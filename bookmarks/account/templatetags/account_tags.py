@@ -0,0 +1,35 @@
+from collections.abc import Iterable
+from typing import Any
+
+from django import template
+from django.contrib.auth.models import User
+
+from account.follows import following
+from account.models import Profile
+from account.thumbnails import photo_url
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def is_following(context: dict[str, Any], user: User) -> bool:
+    return user.id in following(context["request"])
+
+
+@register.simple_tag(takes_context=True)
+def followed_users(context: dict[str, Any], users: Iterable[User]) -> set[int]:
+    """
+    id читаемых пользователей из списка, одним запросом
+    """
+    return following(context["request"]).filter(user.id for user in users)
+
+
+@register.filter
+def profile_photo(profile: Profile | None, alias: str) -> str:
+    """
+    URL миниатюры фото профиля по алиасу из THUMBNAIL_ALIASES
+    """
+    if not isinstance(profile, Profile):
+        return ""
+    return photo_url(profile, alias)
@@ -0,0 +1,214 @@
+from io import StringIO
+import threading
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, connections, IntegrityError
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from account.follows import follow, reconcile, unfollow
+from account.models import Contact, Profile
+
+
+def create_users(count=3):
+    users = []
+    for i in range(count):
+        user = User.objects.create_user(
+            username=f"user{i}",
+            password="password",
+        )
+        Profile.objects.create(user=user)
+        users.append(user)
+    return users
+
+
+def follow_counts(user):
+    return tuple(
+        Profile.objects.values_list(
+            "followers_count",
+            "following_count",
+        ).get(user=user),
+    )
+
+
+class TestFollowCounts(TestCase):
+    def setUp(self):
+        self.users = create_users()
+
+    def test_contact_create_and_delete(self):
+        contact = Contact.objects.create(
+            user_from=self.users[0],
+            user_to=self.users[1],
+        )
+        self.assertEqual(follow_counts(self.users[0]), (0, 1))
+        self.assertEqual(follow_counts(self.users[1]), (1, 0))
+
+        contact.delete()
+        self.assertEqual(follow_counts(self.users[0]), (0, 0))
+        self.assertEqual(follow_counts(self.users[1]), (0, 0))
+
+    def test_related_manager(self):
+        self.users[0].following.add(self.users[1], self.users[2])
+        self.users[0].following.add(self.users[1])
+        self.users[2].followers.add(self.users[1])
+        self.assertEqual(follow_counts(self.users[0]), (0, 2))
+        self.assertEqual(follow_counts(self.users[1]), (1, 1))
+        self.assertEqual(follow_counts(self.users[2]), (2, 0))
+
+        self.users[0].following.remove(self.users[1])
+        self.users[2].followers.clear()
+        self.assertEqual(follow_counts(self.users[0]), (0, 0))
+        self.assertEqual(follow_counts(self.users[1]), (0, 0))
+        self.assertEqual(follow_counts(self.users[2]), (0, 0))
+
+    def test_counts_do_not_go_negative(self):
+        Contact.objects.bulk_create(
+            [Contact(user_from=self.users[0], user_to=self.users[1])],
+        )
+        Contact.objects.all().delete()
+
+        self.assertEqual(follow_counts(self.users[0]), (0, 0))
+        self.assertEqual(follow_counts(self.users[1]), (0, 0))
+
+    def test_reconcile(self):
+        Contact.objects.bulk_create(
+            [
+                Contact(user_from=self.users[0], user_to=self.users[1]),
+                Contact(user_from=self.users[2], user_to=self.users[1]),
+            ],
+        )
+
+        repaired = reconcile([user.id for user in self.users])
+
+        self.assertEqual(repaired, 3)
+        self.assertEqual(follow_counts(self.users[0]), (0, 1))
+        self.assertEqual(follow_counts(self.users[1]), (2, 0))
+        self.assertEqual(follow_counts(self.users[2]), (0, 1))
+        self.assertEqual(reconcile([user.id for user in self.users]), 0)
+
+    def test_reconcile_command(self):
+        Contact.objects.bulk_create(
+            [Contact(user_from=self.users[0], user_to=self.users[1])],
+        )
+        out = StringIO()
+
+        call_command("reconcile_follows", batch_size=2, stdout=out)
+
+        self.assertIn("3 profile(s) checked, 2 repaired", out.getvalue())
+        self.assertEqual(follow_counts(self.users[1]), (1, 0))
+
+
+class TestFollowStatements(TestCase):
+    def setUp(self):
+        self.users = create_users()
+
+    def test_follow_is_idempotent(self):
+        self.assertTrue(follow(self.users[0], self.users[1]))
+        self.assertFalse(follow(self.users[0], self.users[1]))
+
+        self.assertEqual(Contact.objects.count(), 1)
+        self.assertEqual(follow_counts(self.users[1]), (1, 0))
+
+    def test_unfollow_is_idempotent(self):
+        follow(self.users[0], self.users[1])
+
+        self.assertTrue(unfollow(self.users[0], self.users[1]))
+        self.assertFalse(unfollow(self.users[0], self.users[1]))
+        self.assertEqual(follow_counts(self.users[1]), (0, 0))
+
+    def test_single_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            follow(self.users[0], self.users[1])
+
+        statements = [
+            query["sql"]
+            for query in queries
+            if "account_contact" in query["sql"]
+        ]
+        self.assertEqual(len(statements), 1)
+
+    def test_duplicate_edges_are_rejected(self):
+        follow(self.users[0], self.users[1])
+
+        with self.assertRaises(IntegrityError):
+            Contact.objects.bulk_create(
+                [Contact(user_from=self.users[0], user_to=self.users[1])],
+            )
+
+
+class TestConcurrentFollow(TransactionTestCase):
+    def setUp(self):
+        # Проверяется тестовая база, а не та, что в настройках
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest(
+                "in-memory SQLite locks tables instead of waiting for writers",
+            )
+        self.users = create_users()
+
+    def test_parallel_follow_requests(self):
+        threads_count = 8
+        barrier = threading.Barrier(threads_count)
+        results = []
+
+        def post():
+            client = Client()
+            client.login(username="user0", password="password")
+            barrier.wait(timeout=10)
+            try:
+                response = client.post(
+                    reverse("account:user_follow"),
+                    {"id": self.users[1].id, "action": "follow"},
+                )
+                results.append(response.json()["status"])
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=post) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["ok"] * threads_count)
+        self.assertEqual(Contact.objects.count(), 1)
+        self.assertEqual(follow_counts(self.users[1]), (1, 0))
+        self.assertEqual(follow_counts(self.users[0]), (0, 1))
+
+
+class TestFollowViewCounts(TestCase):
+    def setUp(self):
+        self.users = create_users()
+        self.client.login(username="user0", password="password")
+
+    def post(self, action):
+        return self.client.post(
+            reverse("account:user_follow"),
+            {"id": self.users[1].id, "action": action},
+        ).json()
+
+    def test_follow_returns_counts(self):
+        self.assertEqual(
+            self.post("follow"),
+            {"status": "ok", "followers_count": 1, "following_count": 1},
+        )
+        self.assertEqual(
+            self.post("follow"),
+            {"status": "ok", "followers_count": 1, "following_count": 1},
+        )
+        self.assertEqual(
+            self.post("unfollow"),
+            {"status": "ok", "followers_count": 0, "following_count": 0},
+        )
+
+    def test_profile_page_has_no_aggregates(self):
+        self.users[2].following.add(self.users[1])
+        url = reverse("account:user_detail", args=["user1"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertContains(response, '<span class="total">1</span>')
+        for query in queries:
+            self.assertNotIn("COUNT(", query["sql"])
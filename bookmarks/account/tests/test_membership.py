@@ -0,0 +1,63 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+
+from account.follows import following
+import account.models
+
+
+class TestMembership(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user")
+        self.others = [
+            User.objects.create_user(username=f"other{i}") for i in range(4)
+        ]
+        for other in self.others[:2]:
+            account.models.Contact.objects.create(
+                user_from=self.user,
+                user_to=other,
+            )
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_single_check(self):
+        with self.assertNumQueries(1):
+            self.assertIn(self.others[0].id, following(self.request))
+        with self.assertNumQueries(1):
+            self.assertNotIn(self.others[3].id, following(self.request))
+
+    def test_batch_is_one_query_and_cached_per_request(self):
+        ids = [other.id for other in self.others]
+
+        with self.assertNumQueries(1):
+            followed = following(self.request).filter(ids)
+        with self.assertNumQueries(0):
+            states = [
+                other.id in following(self.request) for other in self.others
+            ]
+
+        self.assertEqual(followed, {self.others[0].id, self.others[1].id})
+        self.assertEqual(states, [True, True, False, False])
+
+    def test_follow_state_of_list_in_one_query(self):
+        template = Template(
+            "{% load account_tags %}"
+            "{% followed_users users as followed %}"
+            "{% for user in users %}"
+            "{% is_following user as followed %}{{ followed|yesno:'1,0' }}"
+            "{% endfor %}",
+        )
+
+        with self.assertNumQueries(1):
+            html = template.render(
+                Context({"request": self.request, "users": self.others}),
+            )
+
+        self.assertEqual(html, "1100")
+
+    def test_anonymous_user_does_not_query(self):
+        self.request.user = AnonymousUser()
+
+        with self.assertNumQueries(0):
+            self.assertNotIn(self.others[0].id, following(self.request))
+            self.assertEqual(following(self.request).filter([1, 2]), set())
@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.test import override_settings, TestCase
+from django.urls import reverse
+
+from account.models import SearchPrefix
+from account.search import normalize, search_users, user_prefixes
+
+
+class TestNormalize(TestCase):
+    def test_words_are_folded(self):
+        self.assertEqual(
+            normalize("Zoë_Smith-JONES"),
+            ["zoe", "smith", "jones"],
+        )
+
+    def test_prefixes_are_truncated(self):
+        prefixes = user_prefixes("ab", "", "x" * 40)
+
+        self.assertEqual(
+            prefixes,
+            {"a", "ab"}
+            | {"x" * end for end in range(1, SearchPrefix.MAX_LENGTH + 1)},
+        )
+
+
+class TestSearchUsers(TestCase):
+    def setUp(self):
+        self.anna = User.objects.create_user(
+            username="anna_k",
+            first_name="Anna",
+            last_name="Karenina",
+        )
+        self.andrew = User.objects.create_user(
+            username="drew",
+            first_name="Andrew",
+            last_name="Smith",
+        )
+        self.bob = User.objects.create_user(
+            username="bob",
+            first_name="Bob",
+            last_name="Annenkov",
+        )
+
+    def usernames(self, query):
+        return [
+            row.username for row in search_users(query).order_by("username")
+        ]
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(self.usernames("an"), ["anna_k", "bob", "drew"])
+        self.assertEqual(self.usernames("KAR"), ["anna_k"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.usernames("an sm"), ["drew"])
+        self.assertEqual(self.usernames("an zz"), [])
+
+    def test_empty_query(self):
+        self.assertEqual(self.usernames(" _ "), [])
+
+    def test_inactive_users_are_hidden(self):
+        self.bob.is_active = False
+        self.bob.save()
+
+        self.assertEqual(self.usernames("bob"), [])
+
+    def test_rename_updates_index(self):
+        self.bob.username = "robert"
+        self.bob.save()
+
+        self.assertEqual(self.usernames("bob"), ["robert"])
+        self.assertEqual(self.usernames("rob"), ["robert"])
+        self.assertFalse(
+            SearchPrefix.objects.filter(username="bob").exists(),
+        )
+
+    def test_login_does_not_reindex(self):
+        with self.assertNumQueries(1):
+            self.bob.save(update_fields=["last_login"])
+
+    def test_long_words_are_checked_in_full(self):
+        User.objects.create_user(
+            username="u1",
+            last_name="Abcdefghijklmnopqrst",
+        )
+        User.objects.create_user(
+            username="u2",
+            last_name="Abcdefghijklmnopzzzz",
+        )
+
+        self.assertEqual(self.usernames("abcdefghijklmnopq"), ["u1"])
+
+
+@override_settings(ACCOUNT_USERS_PER_PAGE=2)
+class TestPeopleSearchViews(TestCase):
+    def setUp(self):
+        for username in ("amy", "anton", "andy", "bill"):
+            User.objects.create_user(username=username, password="testpass")
+        self.client.login(username="bill", password="testpass")
+
+    def test_autocomplete(self):
+        response = self.client.get(reverse("account:user_search"), {"q": "an"})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [user["username"] for user in response.json()["users"]],
+            ["andy", "anton"],
+        )
+
+    def test_people_list_pages(self):
+        url = reverse("account:user_list")
+        response = self.client.get(url, {"q": "a"})
+        users = [user.username for user in response.context["users"]]
+        response = self.client.get(
+            url,
+            {"q": "a", "cursor": response.context["next_cursor"]},
+        )
+        users += [user.username for user in response.context["users"]]
+
+        self.assertEqual(users, ["amy", "andy", "anton"])
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_people_list_without_query(self):
+        response = self.client.get(reverse("account:user_list"))
+
+        self.assertEqual(
+            [user.username for user in response.context["users"]],
+            ["amy", "andy"],
+        )
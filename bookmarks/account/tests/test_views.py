@@ -1,11 +1,19 @@
 from http import HTTPStatus
+import tempfile
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 import django.shortcuts
-from django.test import TestCase
+from django.test import override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 import account.models
+from account.thumbnails import photo_index
+from images.models import Images
+from images.tests.http_server import make_png
 
 
 class TestDashboardView(TestCase):
@@ -172,7 +180,10 @@ class TestUserFollowView(TestCase):
         )
 
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertJSONEqual(response.content, {"status": "ok"})
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "followers_count": 0, "following_count": 0},
+        )
 
         self.assertTrue(
             account.models.Contact.objects.filter(
@@ -195,7 +206,10 @@ class TestUserFollowView(TestCase):
         )
 
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertJSONEqual(response.content, {"status": "ok"})
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "followers_count": 0, "following_count": 0},
+        )
 
         self.assertFalse(
             account.models.Contact.objects.filter(
@@ -227,3 +241,181 @@ class TestUserFollowView(TestCase):
             + django.shortcuts.reverse("account:user_follow")
         )
         self.assertRedirects(response, url_redirect)
+
+
+class TestUserDetailFollowState(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(
+            username="testuser1",
+            password="password",
+        )
+        self.user2 = User.objects.create_user(
+            username="testuser2",
+            password="password",
+        )
+        self.client.login(username="testuser1", password="password")
+        self.url = reverse("account:user_detail", args=["testuser2"])
+
+    def test_not_followed_user(self):
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'data-action="follow"')
+
+    def test_followed_user(self):
+        account.models.Contact.objects.create(
+            user_from=self.user1,
+            user_to=self.user2,
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'data-action="unfollow"')
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_followers(self):
+        few = self.count_queries()
+        for i in range(5):
+            follower = User.objects.create_user(username=f"follower{i}")
+            account.models.Contact.objects.create(
+                user_from=follower,
+                user_to=self.user2,
+            )
+
+        self.assertEqual(self.count_queries(), few)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), ACCOUNT_USERS_PER_PAGE=5)
+class TestUserListView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="aaa",
+            password="testpass",
+        )
+        self.client.login(username="aaa", password="testpass")
+        self.url = reverse("account:user_list")
+        photo_index.clear()
+
+    def create_users(self, count, start=0):
+        for i in range(start, start + count):
+            user = User.objects.create_user(username=f"user{i:02}")
+            account.models.Profile.objects.create(
+                user=user,
+                photo=SimpleUploadedFile(f"{i}.png", make_png()),
+            )
+
+    def count_queries(self, **params):
+        self.client.get(self.url, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_users(self):
+        self.create_users(2)
+        few = self.count_queries()
+        self.create_users(10, start=2)
+
+        self.assertEqual(self.count_queries(), few)
+        self.assertEqual(self.count_queries(q="user"), few)
+
+    def test_list_shows_follow_state(self):
+        self.create_users(4)
+        for user in User.objects.filter(username__in=["user01", "user03"]):
+            account.models.Contact.objects.create(
+                user_from=self.user,
+                user_to=user,
+            )
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, '<span class="following">', count=2)
+
+    def test_fragment_pages(self):
+        self.create_users(7)
+
+        response = self.client.get(self.url)
+        self.assertContains(response, '<div class="user">', count=5)
+        cursor = response.context["next_cursor"]
+
+        response = self.client.get(
+            self.url,
+            {"users_only": 1, "cursor": cursor},
+        )
+        self.assertTemplateUsed(response, "account/user/list_users.html")
+        self.assertContains(response, '<div class="user">', count=3)
+        self.assertNotIn("X-Next-Cursor", response)
+
+    def test_fragment_with_invalid_cursor_is_empty(self):
+        response = self.client.get(
+            self.url,
+            {"users_only": 1, "cursor": "bad"},
+        )
+
+        self.assertEqual(response.content, b"")
+
+
+@override_settings(ACCOUNT_PROFILE_IMAGES_PER_PAGE=3)
+class TestUserDetailImages(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="author",
+            password="testpass",
+        )
+        self.other = User.objects.create_user(username="other")
+        self.client.login(username="author", password="testpass")
+        self.url = reverse("account:user_detail", args=["author"])
+
+    def create_images(self, user, count):
+        for i in range(count):
+            Images.objects.create(
+                user=user,
+                title=f"{user.username} {i}",
+                url=f"https://example.com/{user.username}/{i}.png",
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_profile_renders_one_page(self):
+        self.create_images(self.user, 5)
+        self.create_images(self.other, 2)
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'class="image"', count=3)
+        self.assertNotContains(response, "other 0")
+        self.assertTrue(response.context["images"].has_next())
+
+    def test_query_count_does_not_grow_with_images(self):
+        self.create_images(self.user, 4)
+        few = self.count_queries()
+        self.create_images(self.user, 20)
+
+        self.assertEqual(self.count_queries(), few)
+
+    def test_fragment_is_scoped_to_user(self):
+        self.create_images(self.user, 5)
+        self.create_images(self.other, 5)
+        cursor = self.client.get(self.url).context["images"].next_cursor
+
+        response = self.client.get(
+            self.url,
+            {"images_only": 1, "cursor": cursor},
+        )
+        other = self.client.get(
+            reverse("account:user_detail", args=["other"]),
+            {"images_only": 1, "cursor": cursor},
+        )
+
+        self.assertContains(response, 'class="image"', count=2)
+        self.assertNotContains(response, "other ")
+        self.assertNotIn("X-Next-Cursor", response)
+        self.assertNotContains(other, "author ")
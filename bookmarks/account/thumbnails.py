@@ -0,0 +1,15 @@
+from django.conf import settings
+
+from account.models import Profile
+from images.thumbnails import file_thumbnail_url, ThumbnailIndex
+
+
+photo_index = ThumbnailIndex(
+    settings.IMAGES_THUMBNAIL_INDEX_SIZE,
+    target="account.Profile.photo",
+    namespace="account",
+)
+
+
+def photo_url(profile: Profile, alias: str) -> str:
+    return file_thumbnail_url(photo_index, profile.id, profile.photo, alias)
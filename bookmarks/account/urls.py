@@ -27,6 +27,11 @@ urlpatterns = [
     path("register/", account.views.RegisterView.as_view(), name="register"),
     path("edit/", account.views.EditView.as_view(), name="edit"),
     path("users/", account.views.UserListView.as_view(), name="user_list"),
+    path(
+        "users/search/",
+        account.views.UserSearchView.as_view(),
+        name="user_search",
+    ),
     path(
         "users/follow/",
         account.views.UserFollowView.as_view(),
@@ -1,11 +1,11 @@
 from typing import Any
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
-from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse, JsonResponse
 import django.shortcuts
 from django.template.response import TemplateResponse
@@ -13,13 +13,24 @@ from django.urls import reverse_lazy
 from django.views.generic import (
     DetailView,
     FormView,
-    ListView,
     TemplateView,
     View,
 )
 
+from account.follows import follow, follow_counts, unfollow
 import account.forms
 import account.models
+from account.search import search_users
+from actions.rollups import rollup_feed
+from actions.utils import (
+    attach_targets,
+    create_action,
+    remove_author,
+    user_feed,
+)
+from images.models import Images
+from images.pagination import CursorPage, CursorPaginator, InvalidCursor
+from images.views import image_list_fragment
 
 
 class UserLoginView(FormView):
@@ -75,8 +86,41 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         context["section"] = "dashboard"
 
+        rollup_cursor = self.request.GET.get("rollup_cursor")
+        context["actions"] = []
+        if rollup_cursor is None:
+            paginator = CursorPaginator(
+                user_feed(self.request.user).select_related(
+                    "action__user__profile",
+                ),
+                settings.ACTIONS_FEED_PER_PAGE,
+                ordering=("-created", "-id"),
+            )
+            page = self.get_page(paginator, self.request.GET.get("cursor"))
+            context["actions"] = attach_targets(entry.action for entry in page)
+            context["next_cursor"] = page.next_cursor
+            if page.has_next():
+                return context
+
+        # За горизонтом хранения лента продолжается дневными итогами
+        paginator = CursorPaginator(
+            rollup_feed(self.request.user),
+            settings.ACTIONS_FEED_PER_PAGE,
+            ordering=("-day", "-id"),
+        )
+        page = self.get_page(paginator, rollup_cursor)
+        context["rollups"] = page
+        context["rollup_next_cursor"] = page.next_cursor
+
         return context
 
+    @staticmethod
+    def get_page(paginator: CursorPaginator, cursor: str | None) -> CursorPage:
+        try:
+            return paginator.page(cursor)
+        except InvalidCursor:
+            return paginator.page()
+
 
 class CustomPasswordChangeView(auth_views.PasswordChangeView):
     success_url = reverse_lazy("account:password_change_done")
@@ -144,33 +188,124 @@ class EditView(LoginRequiredMixin, FormView):
         return self.render_to_response(context)
 
 
-class UserListView(LoginRequiredMixin, ListView):
-    model = User
+class UserListView(LoginRequiredMixin, TemplateView):
     template_name = "account/user/list.html"
+    fragment_template_name = "account/user/list_users.html"
+
+    def get_paginator(self, query: str) -> CursorPaginator:
+        if query:
+            return CursorPaginator(
+                search_users(query).select_related("user__profile"),
+                settings.ACCOUNT_USERS_PER_PAGE,
+                ordering=("username",),
+            )
+        return CursorPaginator(
+            User.objects.filter(is_active=True).select_related("profile"),
+            settings.ACCOUNT_USERS_PER_PAGE,
+            ordering=("username",),
+        )
 
-    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        context = super().get_context_data(**kwargs)
+    def get(
+        self,
+        request: HttpRequest,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        query = request.GET.get("q", "").strip()
+        paginator = self.get_paginator(query)
+        cursor = request.GET.get("cursor")
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            if request.GET.get("users_only"):
+                return HttpResponse("")
+            page = paginator.page()
+
+        users = [row.user for row in page] if query else page.object_list
+        if request.GET.get("users_only"):
+            response = django.shortcuts.render(
+                request,
+                self.fragment_template_name,
+                {"users": users},
+            )
+            if page.next_cursor:
+                response["X-Next-Cursor"] = page.next_cursor
+            return response
+
+        context = self.get_context_data(**kwargs)
         context["section"] = "people"
-        context["users"] = self.get_queryset()
-        return context
+        context["query"] = query
+        context["users"] = users
+        context["next_cursor"] = page.next_cursor
+        return self.render_to_response(context)
+
 
-    def get_queryset(self) -> QuerySet[User]:
-        return User.objects.filter(is_active=True)
+class UserSearchView(LoginRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, request: HttpRequest) -> JsonResponse:
+        query = request.GET.get("q", "")
+        rows = search_users(query).order_by("username")[
+            : settings.ACCOUNT_SEARCH_RESULTS
+        ]
+        return JsonResponse(
+            {
+                "status": "ok",
+                "users": [
+                    {
+                        "username": row.username,
+                        "name": row.user.get_full_name(),
+                        "url": row.user.get_absolute_url(),
+                    }
+                    for row in rows
+                ],
+            },
+        )
 
 
 class UserDetailView(LoginRequiredMixin, DetailView):
     model = User
     template_name = "account/user/detail.html"
 
+    def get_image_paginator(self, user: User) -> CursorPaginator:
+        return CursorPaginator(
+            Images.objects.filter(user=user, status=Images.Status.READY),
+            settings.ACCOUNT_PROFILE_IMAGES_PER_PAGE,
+        )
+
+    def get(
+        self,
+        request: HttpRequest,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        if request.GET.get("images_only"):
+            user = django.shortcuts.get_object_or_404(
+                User,
+                username=self.kwargs.get("username"),
+                is_active=True,
+            )
+            return image_list_fragment(
+                request,
+                self.get_image_paginator(user),
+                request.GET.get("cursor"),
+                scope=f"user:{user.id}",
+            )
+        return super().get(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context["section"] = "people"
+        context["images"] = self.get_image_paginator(self.object).page()
 
         return context
 
     def get_object(self, queryset: Any = None) -> Any:
         username = self.kwargs.get("username")
-        user = User.objects.get(username=username, is_active=True)
+        user = User.objects.select_related("profile").get(
+            username=username,
+            is_active=True,
+        )
 
         return user
 
@@ -189,14 +324,11 @@ class UserFollowView(LoginRequiredMixin, View):
         if user_id and action:
             user = django.shortcuts.get_object_or_404(User, id=user_id)
             if action == "follow":
-                account.models.Contact.objects.get_or_create(
-                    user_from=request.user,
-                    user_to=user,
-                )
-            else:
-                account.models.Contact.objects.filter(
-                    user_from=request.user,
-                    user_to=user,
-                ).delete()
-            return JsonResponse({"status": "ok"})
+                if follow(request.user, user):
+                    create_action(request.user, "is following", user)
+            elif unfollow(request.user, user):
+                remove_author(request.user, user)
+            return JsonResponse(
+                {"status": "ok", **follow_counts(request.user, user)},
+            )
         return JsonResponse({"status": "error"})
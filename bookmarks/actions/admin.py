@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
-from actions.models import Action
+from actions.models import Action, ActionRollup, FanoutJob
+from actions.utils import target_prefetch
 
 
 @admin.register(Action)
@@ -13,3 +16,41 @@ class ActionAdmin(admin.ModelAdmin):
     ]
     list_filter = [Action.created.field.name]
     search_fields = [Action.verb.field.name]
+    list_select_related = [Action.user.field.name]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Action]:
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                target_prefetch(),
+            )
+        )
+
+
+@admin.register(FanoutJob)
+class FanoutJobAdmin(admin.ModelAdmin):
+    list_display = [
+        FanoutJob.action.field.name,
+        FanoutJob.status.field.name,
+        FanoutJob.position.field.name,
+        FanoutJob.updated.field.name,
+    ]
+    list_filter = [FanoutJob.status.field.name]
+    list_select_related = [FanoutJob.action.field.name]
+
+
+@admin.register(ActionRollup)
+class ActionRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        ActionRollup.user.field.name,
+        ActionRollup.day.field.name,
+        ActionRollup.verb.field.name,
+        ActionRollup.target_ct.field.name,
+        ActionRollup.count.field.name,
+    ]
+    list_filter = [ActionRollup.day.field.name]
+    list_select_related = [
+        ActionRollup.user.field.name,
+        ActionRollup.target_ct.field.name,
+    ]
@@ -0,0 +1,237 @@
+import atexit
+import datetime
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import IO
+import uuid
+
+from django.conf import settings
+from django.db import connection, connections, IntegrityError, transaction
+
+from actions.models import Action, FanoutJob
+
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def write_actions(actions: list[Action]) -> list[Action]:
+    """
+    Вставить действия пачкой вместе с их задачами разноса
+    """
+    with transaction.atomic():
+        if connection.features.can_return_rows_from_bulk_insert:
+            actions = Action.objects.bulk_create(actions)
+        else:
+            for action in actions:
+                action.save(force_insert=True)
+        FanoutJob.objects.bulk_create(
+            [FanoutJob(action=action) for action in actions],
+        )
+    return actions
+
+
+def _encode(action: Action) -> str:
+    return json.dumps(
+        [
+            action.user_id,
+            action.verb,
+            action.target_ct_id,
+            action.target_id,
+            action.created.isoformat(),
+        ],
+    )
+
+
+def _decode(line: str) -> Action:
+    user_id, verb, target_ct_id, target_id, created = json.loads(line)
+    return Action(
+        user_id=user_id,
+        verb=verb,
+        target_ct_id=target_ct_id,
+        target_id=target_id,
+        created=datetime.datetime.fromisoformat(created),
+    )
+
+
+def _lock(journal: IO[str]) -> bool:
+    try:
+        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class ActionBuffer:
+    """
+    Буфер действий процесса. Действия копятся в памяти и пишутся
+    одним bulk_create, когда их набирается max_size, через max_delay
+    секунд после первого из них или при завершении процесса.
+    Каждое действие сначала дописывается в журнал процесса
+    в journal_dir, и журнал удаляется только после записи в базу.
+    Журналы упавших процессов дописывает replay_journals.
+    Доставка «хотя бы раз»: если процесс упадёт между записью
+    в базу и удалением журнала, действия запишутся повторно
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_delay: float,
+        journal_dir: str | Path,
+    ) -> None:
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.journal_dir = Path(journal_dir)
+        self._pending = []
+        self._journal = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._registered = False
+
+    def _open_journal(self) -> IO[str]:
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{os.getpid()}-{uuid.uuid4().hex}"
+        # Журнал появляется под своим именем уже заблокированным,
+        # чтобы replay_journals не принял его за брошенный
+        path = self.journal_dir / f"{name}.new"
+        journal = path.open("a", encoding="utf-8")
+        _lock(journal)
+        path.rename(self.journal_dir / f"{name}{JOURNAL_SUFFIX}")
+        return journal
+
+    def _journal_path(self, journal: IO[str]) -> Path:
+        return self.journal_dir / (Path(journal.name).stem + JOURNAL_SUFFIX)
+
+    def add(self, action: Action) -> None:
+        with self._lock:
+            if not self._registered:
+                atexit.register(self.flush)
+                self._registered = True
+            if self._journal is None:
+                self._journal = self._open_journal()
+
+            self._journal.write(_encode(action) + "\n")
+            self._journal.flush()
+            self._pending.append(action)
+
+            full = len(self._pending) >= self.max_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(
+                    self.max_delay,
+                    self._flush_on_timer,
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        finally:
+            # Таймер работает в своём потоке со своим соединением
+            connections.close_all()
+
+    def flush(self) -> int:
+        """
+        Записать накопленные действия. Если запись не удалась,
+        журнал остаётся на диске для replay_journals
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                journal, self._journal = self._journal, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            if journal is None:
+                return 0
+
+            try:
+                if pending:
+                    write_actions(pending)
+            except Exception:
+                logger.exception(
+                    "Could not write %d buffered action(s), kept in %s",
+                    len(pending),
+                    self._journal_path(journal),
+                )
+                journal.close()
+                return 0
+
+            self._journal_path(journal).unlink()
+            journal.close()
+            return len(pending)
+
+
+def _write_skipping_invalid(actions: list[Action]) -> None:
+    try:
+        write_actions(actions)
+        return
+    except IntegrityError:
+        pass
+
+    # Автор или цель могли быть удалены, пока действие ждало
+    # в журнале: такие строки пропускаются, остальные пишутся
+    for action in actions:
+        try:
+            write_actions([action])
+        except IntegrityError:
+            logger.warning(
+                "Skipping action of deleted user %s",
+                action.user_id,
+            )
+
+
+def replay_journals(journal_dir: str | Path | None = None) -> int:
+    """
+    Записать действия из журналов, которые не держит ни один
+    живой процесс
+    """
+    if journal_dir is None:
+        journal_dir = settings.ACTIONS_BUFFER_JOURNAL_DIR
+
+    replayed = 0
+    for path in sorted(Path(journal_dir).glob(f"*{JOURNAL_SUFFIX}")):
+        with path.open("r", encoding="utf-8") as journal:
+            if not _lock(journal):
+                continue
+            if os.fstat(journal.fileno()).st_nlink == 0:
+                # Процесс успел записать журнал и удалить его
+                continue
+
+            # Последняя строка могла оборваться при падении процесса
+            lines = journal.read().splitlines()
+            actions = []
+            for line in lines:
+                try:
+                    actions.append(_decode(line))
+                except (TypeError, ValueError):
+                    logger.warning("Skipping damaged line in %s", path)
+
+            if actions:
+                _write_skipping_invalid(actions)
+            path.unlink()
+            replayed += len(actions)
+
+    return replayed
+
+
+action_buffer = ActionBuffer(
+    settings.ACTIONS_BUFFER_SIZE,
+    settings.ACTIONS_BUFFER_DELAY,
+    settings.ACTIONS_BUFFER_JOURNAL_DIR,
+)
@@ -0,0 +1,126 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from account.models import Contact
+from actions.models import FanoutJob, FeedEntry
+
+
+def requeue_stale(stale_after: int | None = None) -> int:
+    """
+    Вернуть в очередь задачи, брошенные упавшими воркерами.
+    Они продолжатся с сохранённой позиции
+    """
+    if stale_after is None:
+        stale_after = settings.ACTIONS_FANOUT_STALE_AFTER
+
+    deadline = timezone.now() - datetime.timedelta(seconds=stale_after)
+    return FanoutJob.objects.filter(
+        status=FanoutJob.Status.RUNNING,
+        updated__lt=deadline,
+    ).update(status=FanoutJob.Status.PENDING, updated=timezone.now())
+
+
+def prune_done(
+    keep_for: int | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Удалить пачками выполненные задачи старше keep_for секунд.
+    Действие без задачи считается уже разнесённым
+    """
+    if keep_for is None:
+        keep_for = settings.ACTIONS_FANOUT_DONE_RETENTION
+    if batch_size is None:
+        batch_size = settings.ACTIONS_FANOUT_BATCH_SIZE
+
+    deadline = timezone.now() - datetime.timedelta(seconds=keep_for)
+    jobs = FanoutJob.objects.filter(
+        status=FanoutJob.Status.DONE,
+        created__lt=deadline,
+    ).order_by()
+    deleted = 0
+    while True:
+        ids = list(jobs.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += FanoutJob.objects.filter(id__in=ids).delete()[0]
+
+
+def claim_jobs(limit: int) -> list[FanoutJob]:
+    pending_ids = list(
+        FanoutJob.objects.filter(status=FanoutJob.Status.PENDING)
+        .order_by("created")
+        .values_list("id", flat=True)[:limit],
+    )
+
+    claimed = []
+    for job_id in pending_ids:
+        updated = FanoutJob.objects.filter(
+            id=job_id,
+            status=FanoutJob.Status.PENDING,
+        ).update(status=FanoutJob.Status.RUNNING, updated=timezone.now())
+        if updated:
+            claimed.append(job_id)
+
+    return list(
+        FanoutJob.objects.filter(id__in=claimed).select_related("action"),
+    )
+
+
+def fan_out(job: FanoutJob, batch_size: int | None = None) -> int:
+    """
+    Разнести действие по лентам подписчиков автора пачками по
+    batch_size, обходя их по id. Позиция сохраняется в той же
+    транзакции, что и пачка строк ленты. Возвращает число вставок
+    """
+    if batch_size is None:
+        batch_size = settings.ACTIONS_FANOUT_BATCH_SIZE
+
+    action = job.action
+    followers = (
+        Contact.objects.filter(user_to_id=action.user_id)
+        .order_by("user_from_id")
+        .values_list("user_from_id", flat=True)
+    )
+    written = 0
+    while True:
+        pending = followers.filter(user_from_id__gt=job.position)
+        batch = list(pending[:batch_size])
+        if not batch:
+            break
+
+        with transaction.atomic():
+            FeedEntry.objects.bulk_create(
+                [
+                    FeedEntry(
+                        owner_id=owner_id,
+                        action_id=action.id,
+                        created=action.created,
+                    )
+                    for owner_id in batch
+                ],
+                ignore_conflicts=True,
+            )
+            job.position = batch[-1]
+            job.save(update_fields=["position", "updated"])
+        written += len(batch)
+
+    job.status = FanoutJob.Status.DONE
+    job.save(update_fields=["status", "updated"])
+    return written
+
+
+def run_pending(
+    batch_size: int | None = None,
+    jobs_limit: int = 100,
+) -> int:
+    """
+    Обработать одну пачку задач, вернуть число обработанных
+    """
+    jobs = claim_jobs(jobs_limit)
+    for job in jobs:
+        fan_out(job, batch_size)
+    return len(jobs)
@@ -0,0 +1,30 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from actions.suppression import COUNTERS
+from bookmarks import metrics
+
+
+class Command(BaseCommand):
+    help = "Show written and suppressed action counters"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stats = metrics.get(*COUNTERS)
+        total = stats["actions_written"] + stats["actions_suppressed"]
+        self.stdout.write(
+            f"Actions: {stats['actions_written']} written, "
+            f"{stats['actions_suppressed']} suppressed as duplicates, "
+            f"suppression rate "
+            f"{stats['actions_suppressed'] / total if total else 0.0:.1%}",
+        )
+
+        if options["reset"]:
+            metrics.reset(*COUNTERS)
@@ -0,0 +1,54 @@
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+import actions.fanout
+import actions.rollups
+
+
+class Command(BaseCommand):
+    help = "Roll actions older than the retention period into daily totals"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ACTIONS_RETENTION_DAYS,
+            help="Keep raw actions for this many days",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.ACTIONS_RETENTION_CHUNK_SIZE,
+            help="Actions compacted per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between chunks",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        cutoff = actions.rollups.retention_cutoff(options["days"])
+        total = 0
+        while True:
+            compacted = actions.rollups.compact_chunk(
+                cutoff,
+                options["chunk_size"],
+            )
+            if not compacted:
+                break
+
+            total += compacted
+            self.stdout.write(f"Compacted {total} action(s)")
+            time.sleep(options["pause"])
+
+        self.stdout.write(
+            f"Done: {total} action(s) before {cutoff:%Y-%m-%d} compacted",
+        )
+
+        pruned = actions.fanout.prune_done()
+        self.stdout.write(f"Pruned {pruned} finished fan-out job(s)")
@@ -0,0 +1,46 @@
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+import actions.fanout
+
+
+class Command(BaseCommand):
+    help = "Copy new actions into their authors' followers' feeds"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.ACTIONS_FANOUT_BATCH_SIZE,
+            help="Feed rows inserted per statement",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        while True:
+            requeued = actions.fanout.requeue_stale()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+            processed = actions.fanout.run_pending(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} job(s)")
+                continue
+
+            if options["once"]:
+                break
+
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+import actions.buffer
+
+
+class Command(BaseCommand):
+    help = "Write actions left in the journals of dead worker processes"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--journal-dir",
+            default=settings.ACTIONS_BUFFER_JOURNAL_DIR,
+            help="Directory with action buffer journals",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        replayed = actions.buffer.replay_journals(options["journal_dir"])
+        self.stdout.write(f"Replayed {replayed} action(s)")
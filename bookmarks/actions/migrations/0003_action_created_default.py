@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:54
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("actions", "0002_feed"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="action",
+            name="created",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 21:49
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    # Повторные итоги без цели складываются в самый ранний из них
+    ActionRollup = apps.get_model("actions", "ActionRollup")
+    duplicates = (
+        ActionRollup.objects.filter(target_ct__isnull=True)
+        .order_by()
+        .values("user_id", "day", "verb")
+        .annotate(keep=Min("id"), total=Sum("count"), rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        ActionRollup.objects.filter(id=row["keep"]).update(count=row["total"])
+        ActionRollup.objects.filter(
+            user_id=row["user_id"],
+            day=row["day"],
+            verb=row["verb"],
+            target_ct__isnull=True,
+        ).exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("actions", "0004_rollups"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="actionrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("target_ct__isnull", True)),
+                fields=("user", "day", "verb"),
+                name="actions_rollup_unique_day_no_target",
+            ),
+        ),
+    ]
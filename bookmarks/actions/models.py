@@ -1,6 +1,7 @@
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 
 
 class Action(models.Model):
@@ -10,7 +11,7 @@ class Action(models.Model):
         on_delete=models.CASCADE,
     )
     verb = models.CharField(max_length=255)
-    created = models.DateTimeField(auto_now_add=True)
+    created = models.DateTimeField(default=timezone.now)
     target_ct = models.ForeignKey(
         ContentType,
         blank=True,
@@ -31,10 +32,156 @@ class Action(models.Model):
     def __repr__(self) -> str:
         return (
             f"{self.__class__.__name__}("
-            f"user={self.user!r}, "
+            f"user_id={self.user_id!r}, "
             f"verb={self.verb!r}, "
             f"created={self.created!r}, "
-            f"target_ct={self.target_ct!r}, "
-            f"target_id={self.target_id!r}, "
-            f"target={self.target!r})"
+            f"target_ct_id={self.target_ct_id!r}, "
+            f"target_id={self.target_id!r})"
+        )
+
+
+class FeedEntry(models.Model):
+    """
+    Материализованная лента: строка на каждое действие каждого,
+    кого читает owner. Лента пользователя — чтение диапазона
+    индекса (owner, -created, -id)
+    """
+
+    owner = models.ForeignKey(
+        "auth.User",
+        related_name="feed",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    action = models.ForeignKey(
+        Action,
+        related_name="feed_entries",
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "action"],
+                name="actions_feedentry_unique_action",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["owner", "-created", "-id"],
+                name="actions_feed_owner_created",
+            ),
+        ]
+        ordering = ["-created", "-id"]
+        verbose_name_plural = "feed entries"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"owner_id={self.owner_id!r}, "
+            f"action_id={self.action_id!r}, "
+            f"created={self.created!r})"
+        )
+
+
+class FanoutJob(models.Model):
+    """
+    Задача разнести действие по лентам подписчиков автора.
+    position — id последнего обработанного подписчика, поэтому
+    прерванная задача продолжается с того же места
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+
+    action = models.OneToOneField(
+        Action,
+        related_name="fanout_job",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    position = models.PositiveBigIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created"]),
+        ]
+        ordering = ["created"]
+
+    def __str__(self) -> str:
+        return f"Fan-out of {self.action_id} ({self.status})"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"{self.action_id!r}, "
+            f"{self.status!r}, "
+            f"{self.position!r}, "
+            f"{self.created!r}, "
+            f"{self.updated!r})"
+        )
+
+
+class ActionRollup(models.Model):
+    """
+    Дневной итог действий пользователя, удалённых по сроку хранения:
+    сколько раз за day он совершил verb над целями типа target_ct
+    """
+
+    user = models.ForeignKey(
+        "auth.User",
+        related_name="action_rollups",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    day = models.DateField()
+    verb = models.CharField(max_length=255)
+    target_ct = models.ForeignKey(
+        ContentType,
+        blank=True,
+        null=True,
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "day", "verb", "target_ct"],
+                name="actions_rollup_unique_day",
+            ),
+            # NULL в target_ct не равен другому NULL, поэтому для итогов
+            # действий без цели нужна отдельная уникальность
+            models.UniqueConstraint(
+                fields=["user", "day", "verb"],
+                condition=models.Q(target_ct__isnull=True),
+                name="actions_rollup_unique_day_no_target",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["-day", "-id"],
+                name="actions_rollup_day",
+            ),
+        ]
+        ordering = ["-day", "-id"]
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"user_id={self.user_id!r}, "
+            f"day={self.day!r}, "
+            f"verb={self.verb!r}, "
+            f"target_ct_id={self.target_ct_id!r}, "
+            f"count={self.count!r})"
         )
@@ -0,0 +1,145 @@
+from collections import Counter
+import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Q, QuerySet, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from account.models import Contact
+from actions.models import Action, ActionRollup, FanoutJob, FeedEntry
+
+
+def retention_cutoff(days: int | None = None) -> datetime.datetime:
+    """
+    Начало дня, раньше которого действия хранятся только в итогах.
+    Граница по началу дня не делит день между итогами и действиями
+    """
+    if days is None:
+        days = settings.ACTIONS_RETENTION_DAYS
+
+    today = timezone.localdate()
+    return timezone.make_aware(
+        datetime.datetime.combine(
+            today - datetime.timedelta(days=days),
+            datetime.time.min,
+        ),
+    )
+
+
+def _delete_feed_entries(action_ids: list[int], batch_size: int) -> None:
+    # Записей в лентах у действия столько, сколько у автора
+    # подписчиков, поэтому они удаляются пачками в своих транзакциях
+    while True:
+        with transaction.atomic():
+            batch = list(
+                FeedEntry.objects.filter(action_id__in=action_ids)
+                .order_by()
+                .values_list("id", flat=True)[:batch_size],
+            )
+            if not batch:
+                return
+            FeedEntry.objects.filter(id__in=batch).delete()
+
+
+def compact_chunk(
+    cutoff: datetime.datetime,
+    chunk_size: int,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Свернуть в дневные итоги и удалить до chunk_size самых старых
+    действий раньше cutoff. Действия, чей разнос по лентам ещё
+    не закончен, не трогаются. Записи лент удаляются заранее
+    пачками по batch_size, а итоги и удаление самих действий
+    фиксируются одной короткой транзакцией, поэтому прерванное
+    сжатие продолжается со следующего вызова без двойного счёта
+    """
+    if batch_size is None:
+        batch_size = settings.ACTIONS_FANOUT_BATCH_SIZE
+
+    ids = list(
+        Action.objects.filter(created__lt=cutoff)
+        .filter(
+            Q(fanout_job__isnull=True)
+            | Q(fanout_job__status=FanoutJob.Status.DONE),
+        )
+        .order_by("created", "id")
+        .values_list("id", flat=True)[:chunk_size],
+    )
+    if not ids:
+        return 0
+
+    _delete_feed_entries(ids, batch_size)
+
+    with transaction.atomic():
+        # Параллельное сжатие могло успеть забрать часть действий
+        ids = list(
+            Action.objects.select_for_update()
+            .filter(id__in=ids)
+            .values_list("id", flat=True),
+        )
+        groups = (
+            Action.objects.filter(id__in=ids)
+            .annotate(day=TruncDate("created"))
+            .values("user_id", "day", "verb", "target_ct_id")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for group in groups:
+            total = group.pop("total")
+            updated = ActionRollup.objects.filter(**group).update(
+                count=F("count") + total,
+            )
+            if not updated:
+                ActionRollup.objects.create(**group, count=total)
+
+        Action.objects.filter(id__in=ids).delete()
+
+    return len(ids)
+
+
+def rollup_feed(user: User) -> QuerySet[ActionRollup]:
+    """
+    Итоги тех, кого читает user, — продолжение ленты за горизонтом
+    хранения действий
+    """
+    following = Contact.objects.filter(user_from=user).values("user_to_id")
+    return ActionRollup.objects.filter(user_id__in=following).select_related(
+        "user",
+        "user__profile",
+        "target_ct",
+    )
+
+
+def daily_counts(
+    user: User,
+    since: datetime.date,
+) -> dict[tuple[datetime.date, str], int]:
+    """
+    Число действий user по (день, verb) начиная с since: свежие
+    дни считаются по действиям, старые берутся из итогов
+    """
+    counts = Counter()
+    start = timezone.make_aware(
+        datetime.datetime.combine(since, datetime.time.min),
+    )
+    raw = (
+        Action.objects.filter(user=user, created__gte=start)
+        .annotate(day=TruncDate("created"))
+        .values("day", "verb")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    rolled = (
+        ActionRollup.objects.filter(user=user, day__gte=since)
+        .values("day", "verb")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    for row in [*raw, *rolled]:
+        counts[row["day"], row["verb"]] += row["total"]
+
+    return dict(counts)
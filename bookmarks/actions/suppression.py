@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from bookmarks import metrics
+
+
+COUNTERS = (
+    "actions_written",
+    "actions_suppressed",
+)
+
+
+class RecentActions:
+    """
+    Недавние действия (user, verb, target) за окно window секунд.
+    Повтор внутри окна отбрасывается: сначала проверяется память
+    процесса, затем общий кеш Django через cache.add, так что
+    базу данных проверка не трогает
+    """
+
+    def __init__(self, max_size: int, namespace: str = "actions") -> None:
+        self.max_size = max_size
+        self.namespace = namespace
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        user_id: int,
+        verb: str,
+        target_ct_id: int | None,
+        target_id: int | None,
+    ) -> str:
+        digest = hashlib.sha1(
+            f"{user_id}:{verb}:{target_ct_id}:{target_id}".encode(),
+        ).hexdigest()
+        return f"{self.namespace}:recent:{digest}"
+
+    def _remember(self, key: str, expires: float) -> None:
+        with self._lock:
+            self._local[key] = expires
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def claim(self, key: str, window: int) -> bool:
+        """
+        True, если действия с таким ключом не было в течение window
+        секунд. Ключ при этом занимается до конца окна
+        """
+        now = time.time()
+        with self._lock:
+            expires = self._local.get(key)
+            if expires is not None and expires <= now:
+                del self._local[key]
+                expires = None
+        if expires is not None:
+            return False
+
+        if cache.add(key, now, timeout=window):
+            self._remember(key, now + window)
+            return True
+
+        # Ключ занят другим процессом: в кеше лежит время первой
+        # записи, по нему окно запоминается и в этом процессе
+        started = cache.get(key)
+        if started is not None:
+            self._remember(key, started + window)
+        return False
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._local.pop(key, None)
+        cache.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+
+recent_actions = RecentActions(settings.ACTIONS_DUPLICATE_INDEX_SIZE)
+
+
+def record(written: bool) -> None:
+    metrics.incr("actions_written" if written else "actions_suppressed")
@@ -0,0 +1,16 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from actions.suppression import recent_actions
+
+
+class ActionsTestCase(TestCase):
+    """
+    Тест действий с чистым кешем: окна подавления дублей
+    и счётчики не переходят из теста в тест
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        recent_actions.clear()
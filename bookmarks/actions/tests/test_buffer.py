@@ -0,0 +1,195 @@
+from io import StringIO
+from pathlib import Path
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+
+import actions.buffer
+from actions.buffer import action_buffer, ActionBuffer, replay_journals
+from actions.models import Action, FanoutJob
+from actions.tests.base import ActionsTestCase
+from actions.utils import create_action
+from bookmarks import metrics
+from images.models import Images
+
+
+class BufferTestCase(ActionsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journal_dir = Path(tempfile.mkdtemp())
+        self.user = User.objects.create_user(username="user")
+        self.image = Images.objects.create(
+            user=self.user,
+            title="Image",
+            url="https://example.com/image.png",
+        )
+
+    def journals(self):
+        return sorted(self.journal_dir.glob("*.journal"))
+
+    def action(self, verb="likes"):
+        return Action(user=self.user, verb=verb)
+
+    def crash(self, buffer):
+        # Процесс умер: в памяти ничего не осталось, журнал не удалён
+        buffer._timer.cancel()
+        buffer._journal.close()
+        buffer._journal = None
+        buffer._pending.clear()
+
+
+class TestActionBuffer(BufferTestCase):
+    def setUp(self):
+        super().setUp()
+        self.buffer = ActionBuffer(3, 60, self.journal_dir)
+        self.addCleanup(self.buffer.flush)
+
+    def test_flush_on_size(self):
+        self.buffer.add(self.action("one"))
+        self.buffer.add(self.action("two"))
+
+        self.assertFalse(Action.objects.exists())
+        self.assertEqual(len(self.buffer), 2)
+        [journal] = self.journals()
+        self.assertEqual(len(journal.read_text().splitlines()), 2)
+
+        self.buffer.add(self.action("three"))
+
+        self.assertEqual(
+            list(Action.objects.order_by("id").values_list("verb", flat=True)),
+            ["one", "two", "three"],
+        )
+        self.assertEqual(FanoutJob.objects.count(), 3)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(self.journals(), [])
+
+    def test_flush_keeps_event_time(self):
+        action = self.action()
+        self.buffer.add(action)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(Action.objects.get().created, action.created)
+
+    def test_timer_is_scheduled_once(self):
+        self.buffer.add(self.action("one"))
+        timer = self.buffer._timer
+        self.buffer.add(self.action("two"))
+
+        self.assertIs(self.buffer._timer, timer)
+        self.assertEqual(timer.interval, 60)
+
+        self.buffer.flush()
+        self.assertIsNone(self.buffer._timer)
+        self.assertTrue(timer.finished.is_set())
+
+    def test_failed_flush_keeps_journal(self):
+        self.buffer.add(self.action())
+
+        with (
+            mock.patch.object(
+                actions.buffer,
+                "write_actions",
+                side_effect=DatabaseError,
+            ),
+            self.assertLogs("actions.buffer", "ERROR"),
+        ):
+            self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(len(self.journals()), 1)
+        self.assertEqual(replay_journals(self.journal_dir), 1)
+        self.assertEqual(Action.objects.count(), 1)
+        self.assertEqual(self.journals(), [])
+
+
+class TestReplayJournals(BufferTestCase):
+    def test_replays_journal_of_dead_process(self):
+        dead = ActionBuffer(10, 60, self.journal_dir)
+        dead.add(self.action("one"))
+        dead.add(self.action("two"))
+        dead._journal.write('[1, "bro')
+        self.crash(dead)
+
+        with self.assertLogs("actions.buffer", "WARNING"):
+            replayed = replay_journals(self.journal_dir)
+
+        self.assertEqual(replayed, 2)
+        self.assertEqual(FanoutJob.objects.count(), 2)
+        self.assertEqual(self.journals(), [])
+
+    def test_skips_journal_of_live_process(self):
+        live = ActionBuffer(10, 60, self.journal_dir)
+        self.addCleanup(live.flush)
+        live.add(self.action())
+
+        self.assertEqual(replay_journals(self.journal_dir), 0)
+        self.assertEqual(len(self.journals()), 1)
+
+    def test_command(self):
+        dead = ActionBuffer(10, 60, self.journal_dir)
+        dead.add(self.action())
+        self.crash(dead)
+        out = StringIO()
+
+        call_command(
+            "replay_action_journals",
+            journal_dir=self.journal_dir,
+            stdout=out,
+        )
+
+        self.assertIn("Replayed 1 action(s)", out.getvalue())
+        self.assertEqual(Action.objects.count(), 1)
+
+
+@override_settings(ACTIONS_BUFFER_SIZE=10)
+class TestBufferedCreateAction(BufferTestCase):
+    def setUp(self):
+        super().setUp()
+        for name, value in (
+            ("journal_dir", self.journal_dir),
+            ("max_size", 10),
+        ):
+            patcher = mock.patch.object(action_buffer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(action_buffer.flush)
+
+    def test_action_is_buffered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            action = create_action(self.user, "likes", self.image)
+            self.assertEqual(len(action_buffer), 0)
+
+        self.assertIsNone(action.pk)
+        self.assertEqual(len(action_buffer), 1)
+        self.assertFalse(Action.objects.exists())
+
+        action_buffer.flush()
+
+        action = Action.objects.get()
+        self.assertEqual(action.target, self.image)
+        self.assertTrue(FanoutJob.objects.filter(action=action).exists())
+
+    def test_rolled_back_action_does_not_suppress_repeat(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    create_action(self.user, "likes", self.image)
+                    raise DatabaseError("rolled back")
+
+            create_action(self.user, "likes", self.image)
+
+        self.assertEqual(len(action_buffer), 1)
+
+    def test_repeat_in_one_transaction_is_buffered_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_action(self.user, "likes", self.image)
+            create_action(self.user, "likes", self.image)
+
+        self.assertEqual(len(action_buffer), 1)
+        self.assertEqual(
+            metrics.get("actions_written", "actions_suppressed"),
+            {"actions_written": 1, "actions_suppressed": 1},
+        )
@@ -0,0 +1,253 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from account.models import Profile
+import actions.fanout
+from actions.models import Action, FanoutJob, FeedEntry
+from actions.tests.base import ActionsTestCase
+from actions.utils import (
+    attach_targets,
+    create_action,
+    remove_author,
+    user_feed,
+)
+from images.models import Images
+
+
+class FeedTestCase(ActionsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user(
+            username="author",
+            password="password",
+        )
+        self.followers = [
+            User.objects.create_user(username=f"follower{i}") for i in range(5)
+        ]
+        for follower in self.followers:
+            follower.following.add(self.author)
+        self.image = Images.objects.create(
+            user=self.author,
+            title="Image",
+            url="https://example.com/image.png",
+        )
+
+
+class TestFanout(FeedTestCase):
+    def test_create_action_queues_fanout(self):
+        action = create_action(self.author, "bookmarked image", self.image)
+
+        self.assertEqual(action.target, self.image)
+        self.assertEqual(action.fanout_job.status, FanoutJob.Status.PENDING)
+        self.assertFalse(FeedEntry.objects.exists())
+
+    def test_prune_done_jobs(self):
+        done = create_action(self.author, "likes", self.image)
+        actions.fanout.run_pending()
+        pending = create_action(self.author, "bookmarked image", self.image)
+
+        self.assertEqual(actions.fanout.prune_done(keep_for=60), 0)
+        FanoutJob.objects.update(
+            created=timezone.now() - datetime.timedelta(hours=1),
+        )
+        self.assertEqual(
+            actions.fanout.prune_done(keep_for=60, batch_size=1),
+            1,
+        )
+
+        self.assertFalse(FanoutJob.objects.filter(action=done).exists())
+        self.assertTrue(FanoutJob.objects.filter(action=pending).exists())
+        self.assertEqual(FeedEntry.objects.filter(action=done).count(), 5)
+
+    def test_fanout_in_batches(self):
+        action = create_action(self.author, "likes", self.image)
+
+        self.assertEqual(actions.fanout.run_pending(batch_size=2), 1)
+
+        job = FanoutJob.objects.get(action=action)
+        self.assertEqual(job.status, FanoutJob.Status.DONE)
+        self.assertEqual(job.position, self.followers[-1].id)
+        for follower in self.followers:
+            self.assertEqual(
+                [entry.action for entry in user_feed(follower)],
+                [action],
+            )
+        self.assertFalse(user_feed(self.author).exists())
+
+    def test_interrupted_fanout_resumes(self):
+        action = create_action(self.author, "likes", self.image)
+        job = action.fanout_job
+        job.position = self.followers[2].id
+        job.status = FanoutJob.Status.RUNNING
+        job.save()
+        FanoutJob.objects.filter(id=job.id).update(
+            updated=timezone.now() - datetime.timedelta(hours=1),
+        )
+
+        self.assertEqual(actions.fanout.requeue_stale(), 1)
+        actions.fanout.run_pending()
+
+        self.assertEqual(
+            set(FeedEntry.objects.values_list("owner_id", flat=True)),
+            {follower.id for follower in self.followers[3:]},
+        )
+
+    def test_feed_read_is_one_query(self):
+        for verb in ("bookmarked image", "likes"):
+            create_action(self.author, verb, self.image)
+        actions.fanout.run_pending()
+
+        with self.assertNumQueries(1):
+            feed = list(user_feed(self.followers[0])[:20])
+
+        self.assertEqual(
+            [entry.action.verb for entry in feed],
+            ["likes", "bookmarked image"],
+        )
+
+    def test_remove_author(self):
+        create_action(self.author, "likes", self.image)
+        actions.fanout.run_pending()
+
+        self.assertEqual(remove_author(self.followers[0], self.author), 1)
+        self.assertFalse(user_feed(self.followers[0]).exists())
+        self.assertTrue(user_feed(self.followers[1]).exists())
+
+    def test_command(self):
+        create_action(self.author, "likes", self.image)
+        out = StringIO()
+
+        call_command("fanout_actions", once=True, stdout=out)
+
+        self.assertIn("Processed 1 job(s)", out.getvalue())
+        self.assertEqual(FeedEntry.objects.count(), len(self.followers))
+
+
+class TestActionPaths(FeedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username="author", password="password")
+
+    def test_like_creates_action(self):
+        self.client.post(
+            reverse("images:like"),
+            {"id": self.image.id, "action": "like"},
+        )
+
+        action = Action.objects.get()
+        self.assertEqual(action.verb, "likes")
+        self.assertEqual(action.target, self.image)
+
+    def test_follow_and_unfollow(self):
+        other = User.objects.create_user(username="other")
+        self.client.post(
+            reverse("account:user_follow"),
+            {"id": other.id, "action": "follow"},
+        )
+        self.client.post(
+            reverse("account:user_follow"),
+            {"id": other.id, "action": "follow"},
+        )
+
+        self.assertEqual(
+            list(Action.objects.values_list("verb", "target_id")),
+            [("is following", other.id)],
+        )
+
+        create_action(other, "likes", self.image)
+        actions.fanout.run_pending()
+        self.assertTrue(user_feed(self.author).exists())
+
+        self.client.post(
+            reverse("account:user_follow"),
+            {"id": other.id, "action": "unfollow"},
+        )
+        self.assertFalse(user_feed(self.author).exists())
+
+
+class TestDashboardFeed(FeedTestCase):
+    def test_dashboard_shows_feed(self):
+        self.followers[0].set_password("password")
+        self.followers[0].save()
+        self.client.login(username="follower0", password="password")
+        for i in range(3):
+            create_action(self.author, f"verb{i}", self.image)
+        actions.fanout.run_pending()
+
+        response = self.client.get(reverse("account:dashboard"))
+
+        self.assertEqual(
+            [action.verb for action in response.context["actions"]],
+            ["verb2", "verb1", "verb0"],
+        )
+        self.assertContains(response, "verb2")
+
+
+class TestTargetLoading(FeedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = self.followers[0]
+        self.reader.set_password("password")
+        self.reader.is_staff = True
+        self.reader.is_superuser = True
+        self.reader.save()
+        self.client.login(username="follower0", password="password")
+
+    def create_actions(self, count):
+        start = Action.objects.count()
+        for i in range(start, start + count):
+            image = Images.objects.create(
+                user=self.author,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            other = User.objects.create_user(username=f"other{i}")
+            create_action(self.author, "likes", image)
+            create_action(self.author, "is following", other)
+        actions.fanout.run_pending()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_attach_targets(self):
+        other = User.objects.create_user(username="other")
+        profile = Profile.objects.create(user=other)
+        create_action(self.author, "likes", self.image)
+        create_action(self.author, "is following", other)
+        create_action(self.author, "registered")
+        actions = list(Action.objects.order_by("id"))
+
+        with self.assertNumQueries(2):
+            actions = attach_targets(actions)
+            targets = [action.target for action in actions]
+
+        self.assertEqual(targets, [self.image, other, None])
+        with self.assertNumQueries(0):
+            self.assertEqual(targets[1].profile, profile)
+
+    def test_dashboard_queries_do_not_grow(self):
+        self.create_actions(3)
+        few = self.count_queries(reverse("account:dashboard"))
+        self.create_actions(7)
+        many = self.count_queries(reverse("account:dashboard"))
+
+        self.assertEqual(few, many)
+
+    def test_admin_changelist_queries_do_not_grow(self):
+        url = reverse("admin:actions_action_changelist")
+        self.create_actions(3)
+        few = self.count_queries(url)
+        self.create_actions(25)
+        many = self.count_queries(url)
+
+        self.assertEqual(few, many)
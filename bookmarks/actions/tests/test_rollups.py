@@ -0,0 +1,209 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection, IntegrityError, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import actions.fanout
+from actions.models import Action, ActionRollup, FanoutJob, FeedEntry
+import actions.rollups
+from actions.rollups import (
+    compact_chunk,
+    daily_counts,
+    retention_cutoff,
+    rollup_feed,
+)
+from actions.tests.base import ActionsTestCase
+from actions.utils import create_action
+from images.models import Images
+
+
+class RollupTestCase(ActionsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(
+            username="reader",
+            password="password",
+        )
+        self.reader.following.add(self.author)
+        self.image = Images.objects.create(
+            user=self.author,
+            title="Image",
+            url="https://example.com/image.png",
+        )
+        self.cutoff = retention_cutoff(30)
+
+    def old_action(self, verb, days_ago, target=None, fanout=True):
+        action = create_action(self.author, verb, target)
+        Action.objects.filter(id=action.id).update(
+            created=self.cutoff - datetime.timedelta(days=days_ago),
+        )
+        if fanout:
+            actions.fanout.run_pending()
+        return action
+
+
+class TestCompaction(RollupTestCase):
+    def test_compact_chunks(self):
+        for i in range(3):
+            self.old_action(
+                "likes",
+                1,
+                Images.objects.create(
+                    user=self.author,
+                    title=f"Image {i}",
+                    url=f"https://example.com/{i}.png",
+                ),
+            )
+        self.old_action("registered", 5)
+        recent = create_action(self.author, "likes", self.image)
+        actions.fanout.run_pending()
+
+        self.assertEqual(compact_chunk(self.cutoff, 2), 2)
+        self.assertEqual(compact_chunk(self.cutoff, 2), 2)
+        self.assertEqual(compact_chunk(self.cutoff, 2), 0)
+
+        self.assertEqual(list(Action.objects.all()), [recent])
+        self.assertEqual(
+            list(FeedEntry.objects.values_list("action_id", flat=True)),
+            [recent.id],
+        )
+        self.assertEqual(FanoutJob.objects.count(), 1)
+
+        day = timezone.localdate(self.cutoff) - datetime.timedelta(days=1)
+        images_ct = ContentType.objects.get_for_model(Images)
+        self.assertEqual(
+            sorted(
+                ActionRollup.objects.values_list(
+                    "day",
+                    "verb",
+                    "target_ct",
+                    "count",
+                ),
+            ),
+            [
+                (
+                    day - datetime.timedelta(days=4),
+                    "registered",
+                    None,
+                    1,
+                ),
+                (day, "likes", images_ct.id, 3),
+            ],
+        )
+
+    def test_skips_actions_with_unfinished_fanout(self):
+        self.old_action("registered", 1)
+        pending = self.old_action("likes", 1, self.image, fanout=False)
+
+        self.assertEqual(compact_chunk(self.cutoff, 100), 1)
+        self.assertEqual(list(Action.objects.all()), [pending])
+
+        actions.fanout.run_pending()
+
+        self.assertEqual(compact_chunk(self.cutoff, 100), 1)
+        self.assertFalse(Action.objects.exists())
+
+    def test_feed_entries_are_deleted_in_batches(self):
+        for i in range(3):
+            User.objects.create_user(username=f"reader{i}").following.add(
+                self.author,
+            )
+        self.old_action("likes", 1, self.image)
+        self.assertEqual(FeedEntry.objects.count(), 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            actions.rollups._delete_feed_entries(
+                list(Action.objects.values_list("id", flat=True)),
+                2,
+            )
+
+        deletes = [
+            query for query in queries if query["sql"].startswith("DELETE")
+        ]
+        self.assertEqual(len(deletes), 2)
+        self.assertFalse(FeedEntry.objects.exists())
+
+    def test_daily_counts_merge_actions_and_rollups(self):
+        day = timezone.localdate(self.cutoff) - datetime.timedelta(days=1)
+        self.old_action("likes", 1, self.image)
+        compact_chunk(self.cutoff, 100)
+        create_action(self.author, "likes")
+
+        counts = daily_counts(self.author, day)
+
+        self.assertEqual(
+            counts,
+            {(day, "likes"): 1, (timezone.localdate(), "likes"): 1},
+        )
+
+    def test_untargeted_day_is_compacted_into_one_rollup(self):
+        self.old_action("registered", 1)
+        self.assertEqual(compact_chunk(self.cutoff, 100), 1)
+        with override_settings(ACTIONS_DUPLICATE_WINDOW=0):
+            self.old_action("registered", 1)
+        self.assertEqual(compact_chunk(self.cutoff, 100), 1)
+
+        rollup = ActionRollup.objects.get()
+        self.assertIsNone(rollup.target_ct)
+        self.assertEqual(rollup.count, 2)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ActionRollup.objects.create(
+                user=self.author,
+                day=rollup.day,
+                verb="registered",
+            )
+
+    def test_command(self):
+        self.old_action("likes", 1, self.image)
+        self.old_action("registered", 1)
+        out = StringIO()
+
+        call_command("compact_actions", days=30, chunk_size=1, stdout=out)
+
+        self.assertIn("Done: 2 action(s)", out.getvalue())
+        self.assertIn("Pruned 0 finished fan-out job(s)", out.getvalue())
+        self.assertFalse(Action.objects.exists())
+        self.assertEqual(ActionRollup.objects.count(), 2)
+
+
+class TestRollupFeed(RollupTestCase):
+    def test_rollup_feed_follows_contacts(self):
+        stranger = User.objects.create_user(username="stranger")
+        ActionRollup.objects.create(
+            user=stranger,
+            day=datetime.date(2026, 1, 1),
+            verb="likes",
+            count=2,
+        )
+        self.old_action("likes", 1, self.image)
+        compact_chunk(self.cutoff, 100)
+
+        self.assertEqual(
+            [rollup.user for rollup in rollup_feed(self.reader)],
+            [self.author],
+        )
+
+    def test_dashboard_continues_with_rollups(self):
+        self.old_action("likes", 1, self.image)
+        compact_chunk(self.cutoff, 100)
+        create_action(self.author, "bookmarked image", self.image)
+        actions.fanout.run_pending()
+        self.client.login(username="reader", password="password")
+
+        response = self.client.get(reverse("account:dashboard"))
+
+        self.assertEqual(
+            [action.verb for action in response.context["actions"]],
+            ["bookmarked image"],
+        )
+        self.assertEqual(len(response.context["rollups"]), 1)
+        self.assertContains(response, "likes images 1 time")
@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from actions.models import Action, FanoutJob
+from actions.suppression import recent_actions
+from actions.tests.base import ActionsTestCase
+from actions.utils import create_action
+from bookmarks import metrics
+from images.models import Images
+
+
+class TestDuplicateSuppression(ActionsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username="user",
+            password="password",
+        )
+        self.image = Images.objects.create(
+            user=self.user,
+            title="Image",
+            url="https://example.com/image.png",
+        )
+
+    def test_repeat_within_window_is_suppressed(self):
+        action = create_action(self.user, "likes", self.image)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(create_action(self.user, "likes", self.image))
+
+        self.assertEqual(list(Action.objects.all()), [action])
+        self.assertEqual(FanoutJob.objects.count(), 1)
+        self.assertEqual(
+            metrics.get("actions_written", "actions_suppressed"),
+            {"actions_written": 1, "actions_suppressed": 1},
+        )
+
+    def test_other_verb_or_target_is_written(self):
+        other = Images.objects.create(
+            user=self.user,
+            title="Other",
+            url="https://example.com/other.png",
+        )
+
+        create_action(self.user, "likes", self.image)
+        create_action(self.user, "likes", other)
+        create_action(self.user, "bookmarked image", self.image)
+        create_action(self.user, "likes")
+        create_action(self.user, "likes")
+
+        self.assertEqual(Action.objects.count(), 4)
+
+    def test_shared_cache_suppresses_in_other_process(self):
+        create_action(self.user, "likes", self.image)
+        recent_actions.clear()
+
+        self.assertIsNone(create_action(self.user, "likes", self.image))
+        self.assertEqual(Action.objects.count(), 1)
+
+    def test_repeat_after_window_is_written(self):
+        key = recent_actions.key(
+            self.user.id,
+            "likes",
+            None,
+            None,
+        )
+        create_action(self.user, "likes")
+        recent_actions.release(key)
+
+        self.assertIsNotNone(create_action(self.user, "likes"))
+
+    @override_settings(ACTIONS_DUPLICATE_WINDOW=0)
+    def test_zero_window_disables_suppression(self):
+        create_action(self.user, "likes", self.image)
+        create_action(self.user, "likes", self.image)
+
+        self.assertEqual(Action.objects.count(), 2)
+
+    def test_like_unlike_cycle_writes_one_action(self):
+        self.client.login(username="user", password="password")
+        for action in ("like", "unlike", "like", "unlike", "like"):
+            self.client.post(
+                reverse("images:like"),
+                {"id": self.image.id, "action": action},
+            )
+
+        self.assertEqual(Action.objects.filter(verb="likes").count(), 1)
+
+    def test_command(self):
+        create_action(self.user, "likes", self.image)
+        create_action(self.user, "likes", self.image)
+        out = StringIO()
+
+        call_command("action_metrics", reset=True, stdout=out)
+
+        self.assertIn("1 written, 1 suppressed", out.getvalue())
+        self.assertEqual(
+            metrics.get("actions_suppressed"),
+            {"actions_suppressed": 0},
+        )
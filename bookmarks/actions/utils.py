@@ -0,0 +1,122 @@
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects, QuerySet
+
+from actions.buffer import action_buffer
+from actions.models import Action, FanoutJob, FeedEntry
+from actions.suppression import recent_actions, record
+from images.models import Images
+
+
+def create_action(
+    user: User,
+    verb: str,
+    target: models.Model | None = None,
+) -> Action | None:
+    """
+    Записать действие пользователя. Разнос по лентам подписчиков
+    ставится в очередь и выполняется воркером fanout_actions.
+    При ACTIONS_BUFFER_SIZE > 0 действие после фиксации транзакции
+    уходит в буфер процесса и возвращается ещё без id.
+    Повтор того же действия с той же целью в течение
+    ACTIONS_DUPLICATE_WINDOW секунд не записывается, тогда
+    возвращается None. В режиме буфера повтор отбрасывается
+    только после фиксации, поэтому возвращается само действие
+    """
+    target_ct = (
+        ContentType.objects.get_for_model(target)
+        if target is not None
+        else None
+    )
+    target_id = target.pk if target is not None else None
+
+    window = settings.ACTIONS_DUPLICATE_WINDOW
+    key = recent_actions.key(
+        user.pk,
+        verb,
+        target_ct.pk if target_ct is not None else None,
+        target_id,
+    )
+    action = Action(
+        user=user,
+        verb=verb,
+        target_ct=target_ct,
+        target_id=target_id,
+    )
+    if settings.ACTIONS_BUFFER_SIZE > 0:
+        transaction.on_commit(lambda: _buffer_action(action, key, window))
+        return action
+
+    if window > 0 and not recent_actions.claim(key, window):
+        record(written=False)
+        return None
+
+    try:
+        with transaction.atomic():
+            action.save(force_insert=True)
+            FanoutJob.objects.create(action=action)
+    except Exception:
+        if window > 0:
+            recent_actions.release(key)
+        raise
+
+    record(written=True)
+    return action
+
+
+def _buffer_action(action: Action, key: str, window: int) -> None:
+    # Ключ занимается только после фиксации: действие из откаченной
+    # транзакции не должно подавлять следующее такое же
+    if window > 0 and not recent_actions.claim(key, window):
+        record(written=False)
+        return
+
+    action_buffer.add(action)
+    record(written=True)
+
+
+def user_feed(user: User) -> QuerySet[FeedEntry]:
+    return FeedEntry.objects.filter(owner=user).select_related(
+        "action",
+        "action__user",
+    )
+
+
+def target_prefetch() -> GenericPrefetch:
+    """
+    Цели действий одним запросом на каждый тип вместе со связями,
+    которые нужны при выводе. Типы без своего queryset загружаются
+    как есть
+    """
+    return GenericPrefetch(
+        "target",
+        [
+            User.objects.select_related("profile"),
+            Images.objects.all(),
+        ],
+    )
+
+
+def attach_targets(actions: Iterable[Action]) -> list[Action]:
+    """
+    Загрузить цели списка действий, сгруппировав их по target_ct
+    """
+    actions = list(actions)
+    prefetch_related_objects(actions, target_prefetch())
+    return actions
+
+
+def remove_author(owner: User, author: User) -> int:
+    """
+    Убрать из ленты owner действия author, например после отписки
+    """
+    deleted, _ = FeedEntry.objects.filter(
+        owner=owner,
+        action__user=author,
+    ).delete()
+    return deleted
@@ -0,0 +1,80 @@
+"""
+Пропускная способность записи действий: INSERT на каждое событие
+внутри запроса против буфера процесса с bulk_create
+
+    python -m benchmarks.actions --actions 5000 --buffer-size 200
+"""
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.utils import setup, test_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--actions", type=int, default=5000)
+    parser.add_argument("--images", type=int, default=500)
+    parser.add_argument("--buffer-size", type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+
+    from actions.buffer import action_buffer
+    from actions.models import Action
+    from actions.utils import create_action
+    from images.models import Images
+
+    with (
+        test_database(),
+        override_settings(ACTIONS_DUPLICATE_WINDOW=0),
+        tempfile.TemporaryDirectory() as journal_dir,
+    ):
+        user = User.objects.create_user(username="benchmark")
+        images = Images.objects.bulk_create(
+            Images(
+                user=user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            for i in range(args.images)
+        )
+        rng = random.Random(0)
+        targets = [rng.choice(images) for _ in range(args.actions)]
+
+        action_buffer.max_size = args.buffer_size
+        action_buffer.journal_dir = Path(journal_dir)
+
+        def direct() -> None:
+            for image in targets:
+                create_action(user, "likes", image)
+
+        def buffered() -> None:
+            with override_settings(ACTIONS_BUFFER_SIZE=args.buffer_size):
+                for image in targets:
+                    create_action(user, "likes", image)
+            action_buffer.flush()
+
+        for name, func in (
+            ("direct INSERT per action", direct),
+            (f"buffered, bulk_create of {args.buffer_size}", buffered),
+        ):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            sys.stdout.write(
+                f"{name:<45} {args.actions / elapsed:10.0f} actions/s\n",
+            )
+
+        sys.stdout.write(f"Actions written: {Action.objects.count()}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Лента действий: чтение наивным запросом «действия тех, кого
+читаю» против материализованной ленты FeedEntry, и цена разноса
+одного действия по подписчикам при записи
+
+    python -m benchmarks.feed --followers 10000 --actions-per-user 5
+"""
+
+import argparse
+from datetime import timedelta
+import sys
+from typing import Any
+
+from benchmarks.utils import measure, report, setup, test_database
+
+
+def seed(
+    followers: int,
+    actions_per_user: int,
+    batch_size: int = 5000,
+) -> tuple[Any, Any]:
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+
+    from account.models import Contact
+    from actions.models import Action, FeedEntry
+
+    reader = User.objects.create_user(username="reader")
+    author = User.objects.create_user(username="author")
+    users = User.objects.bulk_create(
+        User(username=f"user{i}") for i in range(followers)
+    )
+    # Читатель читает всех, все читают автора
+    Contact.objects.bulk_create(
+        [Contact(user_from=reader, user_to=user) for user in users]
+        + [Contact(user_from=user, user_to=author) for user in users],
+        batch_size=batch_size,
+    )
+
+    now = timezone.now()
+    actions = Action.objects.bulk_create(
+        (
+            Action(
+                user=user,
+                verb="likes",
+                created=now - timedelta(minutes=i * followers + n),
+            )
+            for i in range(actions_per_user)
+            for n, user in enumerate(users)
+        ),
+        batch_size=batch_size,
+    )
+
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(owner=reader, action=action, created=action.created)
+            for action in actions
+        ),
+        batch_size=batch_size,
+    )
+    return reader, author
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--followers", type=int, default=10_000)
+    parser.add_argument("--actions-per-user", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test import override_settings
+
+    from account.models import Contact
+    import actions.fanout
+    from actions.models import Action
+    from actions.utils import create_action, user_feed
+
+    # Бенчмарк повторяет одно и то же действие
+    with test_database(), override_settings(ACTIONS_DUPLICATE_WINDOW=0):
+        sys.stdout.write(
+            f"Seeding {args.followers} users, "
+            f"{args.followers * args.actions_per_user} actions...\n",
+        )
+        reader, author = seed(args.followers, args.actions_per_user)
+
+        following = Contact.objects.filter(user_from=reader).values(
+            "user_to_id",
+        )
+        naive = (
+            Action.objects.filter(user_id__in=following)
+            .select_related("user")
+            .order_by("-created", "-id")
+        )
+        timings = measure(
+            lambda: list(naive[: args.per_page]),
+            repeat=args.repeat,
+        )
+        report("read: actions WHERE user IN following", timings)
+
+        timings = measure(
+            lambda: list(user_feed(reader)[: args.per_page]),
+            repeat=args.repeat,
+        )
+        report("read: materialized feed", timings)
+
+        def write() -> None:
+            create_action(author, "bookmarked image")
+            actions.fanout.run_pending()
+
+        timings = measure(write, repeat=args.repeat)
+        report(f"write: fan-out to {args.followers} followers", timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Сравнение скачивания изображений с локального HTTP-сервера:
+новое соединение на каждый запрос (как requests.get раньше),
+общий пул keep-alive соединений и пул с условными запросами (304)
+
+    python -m benchmarks.fetch --requests 200 --size 262144
+"""
+
+import argparse
+import sys
+import tempfile
+
+import requests
+
+from benchmarks.utils import measure, report, setup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test.utils import override_settings
+
+    from images.fetch import Fetcher
+    from images.storage import write_blob_file
+    from images.tests.http_server import Route, serve
+
+    body = b"\xff" * args.size
+    routes = {
+        f"/{i}.png": Route(body, headers={"ETag": f'"{i}"'})
+        for i in range(args.requests)
+    }
+
+    def fetch_all(fetch: object) -> None:
+        for path in routes:
+            with fetch(f"{server.url}{path}"):
+                pass
+
+    def plain_get(url: str) -> requests.Response:
+        return requests.get(url, timeout=15)
+
+    def run(name: str, fetch: object) -> None:
+        connections = server.connections
+        timings = measure(lambda: fetch_all(fetch), repeat=3)
+        report(f"{name} x{args.requests}", timings)
+        sys.stdout.write(
+            f"{'':<45} {server.connections - connections} TCP connections\n",
+        )
+
+    with serve(routes) as server:
+        run("requests.get", plain_get)
+
+        with override_settings(IMAGES_FETCH_CACHE_DIR=""):
+            run("pooled fetcher", Fetcher().fetch)
+
+        # После 304 тело берётся из хранилища blob, поэтому
+        # скачанное сохраняется туда, как это делает загрузчик
+        with override_settings(
+            IMAGES_FETCH_CACHE_DIR=tempfile.mkdtemp(),
+            MEDIA_ROOT=tempfile.mkdtemp(),
+        ):
+            fetcher = Fetcher()
+
+            def fetch_and_store(url: str) -> object:
+                fetched = fetcher.fetch(url)
+                write_blob_file(fetched, fetched.digest, "png")
+                return fetched
+
+            run("pooled fetcher + 304 revalidation", fetch_and_store)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Пропускная способность записи лайков: по одному действию на запрос
+(like_image/unlike_image) против пачек apply_likes
+
+    python -m benchmarks.likes --actions 5000 --batch-size 50
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.utils import setup, test_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--actions", type=int, default=5000)
+    parser.add_argument("--images", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.contrib.auth.models import User
+
+    from images.likes import apply_likes, like_image, unlike_image
+    from images.models import Images
+
+    with test_database():
+        user = User.objects.create_user(username="benchmark")
+        Images.objects.bulk_create(
+            Images(
+                user=user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            for i in range(args.images)
+        )
+        image_ids = list(Images.objects.values_list("id", flat=True))
+        rng = random.Random(0)
+        actions = [
+            (rng.choice(image_ids), rng.choice(("like", "unlike")))
+            for _ in range(args.actions)
+        ]
+
+        def single() -> None:
+            for image_id, action in actions:
+                if action == "like":
+                    like_image(image_id, user)
+                else:
+                    unlike_image(image_id, user)
+
+        def batched() -> None:
+            for start in range(0, len(actions), args.batch_size):
+                end = start + args.batch_size
+                apply_likes(user, actions[start:end])
+
+        for name, func in (
+            ("single action per request", single),
+            (f"batches of {args.batch_size}", batched),
+        ):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            sys.stdout.write(
+                f"{name:<45} {args.actions / elapsed:10.0f} actions/s\n",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Время выдачи страницы ленты изображений на заданной глубине:
+OFFSET-пагинация через Paginator (COUNT(*) + OFFSET) против
+keyset-пагинации по (-created, -id)
+
+    python -m benchmarks.pagination --rows 1000000 --per-page 8
+"""
+
+import argparse
+from datetime import timedelta
+import sys
+
+from benchmarks.utils import measure, report, setup, test_database
+
+
+def seed(rows: int, batch_size: int = 10000) -> None:
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+
+    from images.models import Images
+
+    user = User.objects.create_user(username="benchmark")
+    created_field = Images._meta.get_field("created")
+    created_field.auto_now_add = False
+    now = timezone.now()
+    try:
+        for start in range(0, rows, batch_size):
+            Images.objects.bulk_create(
+                Images(
+                    user=user,
+                    title=f"Image {i}",
+                    slug=f"image-{i}",
+                    url=f"https://example.com/{i}.png",
+                    image=f"images/{i}.png",
+                    created=now - timedelta(seconds=i // 2),
+                )
+                for i in range(start, min(start + batch_size, rows))
+            )
+    finally:
+        created_field.auto_now_add = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.core.paginator import Paginator
+
+    from images.models import Images
+    from images.pagination import CursorPaginator
+
+    with test_database():
+        sys.stdout.write(f"Seeding {args.rows} images...\n")
+        seed(args.rows)
+
+        queryset = Images.objects.filter(status=Images.Status.READY)
+        last_page = args.rows // args.per_page
+        depths = sorted({2, 200, last_page // 2, last_page})
+        cursor_paginator = CursorPaginator(queryset, args.per_page)
+
+        for depth in depths:
+            offset_paginator = Paginator(
+                queryset.order_by("-created", "-id"),
+                args.per_page,
+            )
+            timings = measure(
+                lambda: list(offset_paginator.page(depth)),
+                repeat=args.repeat,
+            )
+            report(f"offset page {depth}", timings)
+
+            # Курсор на странице N берётся из последней записи страницы N-1
+            previous = queryset.order_by("-created", "-id")[
+                (depth - 1) * args.per_page - 1
+            ]
+            cursor = cursor_paginator.encode_cursor(previous)
+            timings = measure(
+                lambda: list(cursor_paginator.page(cursor)),
+                repeat=args.repeat,
+            )
+            report(f"cursor page {depth}", timings)
+
+
+if __name__ == "__main__":
+    main()
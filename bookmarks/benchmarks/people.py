@@ -0,0 +1,86 @@
+"""
+Время подсказок при поиске людей: icontains по имени пользователя
+и полному имени против таблицы префиксов SearchPrefix
+
+    python -m benchmarks.people --users 100000
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks.utils import measure, report, setup, test_database
+
+
+FIRST_NAMES = (
+    "Anna Andrew Boris Clara Daniel Elena Fedor Galina Igor Julia "
+    "Kirill Larisa Maxim Nina Oleg Pavel Roman Sofia Timur Vera"
+).split()
+LAST_NAMES = (
+    "Ivanov Petrov Smirnov Kuznetsov Popov Vasiliev Sokolov Mikhailov "
+    "Novikov Fedorov Morozov Volkov Alekseev Lebedev Semenov Egorov"
+).split()
+
+
+def seed(users: int, batch_size: int = 5000) -> None:
+    from django.contrib.auth.models import User
+
+    from account.search import index_users
+
+    generator = random.Random(0)
+    for start in range(0, users, batch_size):
+        batch = User.objects.bulk_create(
+            User(
+                username=f"user{i}",
+                first_name=generator.choice(FIRST_NAMES),
+                last_name=generator.choice(LAST_NAMES),
+            )
+            for i in range(start, min(start + batch_size, users))
+        )
+        index_users(batch)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.contrib.auth.models import User
+    from django.db.models import Q
+
+    from account.search import search_users
+
+    with test_database():
+        sys.stdout.write(f"Seeding {args.users} users...\n")
+        seed(args.users)
+
+        for query in ("a", "an", "ann", "anna vol", "user9999"):
+            queryset = User.objects.filter(is_active=True)
+            for word in query.split():
+                queryset = queryset.filter(
+                    Q(username__icontains=word)
+                    | Q(first_name__icontains=word)
+                    | Q(last_name__icontains=word),
+                )
+            queryset = queryset.order_by("username")
+            timings = measure(
+                lambda: list(queryset[: args.limit]),
+                repeat=args.repeat,
+            )
+            report(f"{query!r} icontains", timings)
+
+            timings = measure(
+                lambda: list(
+                    search_users(query).order_by("username")[: args.limit],
+                ),
+                repeat=args.repeat,
+            )
+            report(f"{query!r} prefix table", timings)
+
+
+if __name__ == "__main__":
+    main()
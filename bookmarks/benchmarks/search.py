@@ -0,0 +1,103 @@
+"""
+Время поиска изображений по названию и описанию:
+icontains по обоим полям (полный просмотр таблицы) против
+полнотекстового индекса с ранжированием
+
+    python -m benchmarks.search --rows 200000 --query aurora
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks.utils import measure, report, setup, test_database
+
+
+# Редкое слово встречается в одном изображении из тысячи:
+# icontains не может остановиться рано и просматривает всю таблицу
+RARE_WORD = "aurora"
+WORDS = (
+    "red green blue sunset mountain lake river forest city night "
+    "street portrait fox dog cat bird winter summer beach desert "
+    "bridge tower garden flower snow rain cloud market train road"
+).split()
+
+
+def seed(rows: int, batch_size: int = 10000) -> None:
+    from django.contrib.auth.models import User
+
+    from images.models import Images
+
+    generator = random.Random(0)
+    user = User.objects.create_user(username="benchmark")
+    for start in range(0, rows, batch_size):
+        Images.objects.bulk_create(
+            Images(
+                user=user,
+                title=" ".join(
+                    generator.sample(WORDS, 3)
+                    + ([RARE_WORD] if i % 1000 == 0 else []),
+                ),
+                slug=f"image-{i}",
+                url=f"https://example.com/{i}.png",
+                description=" ".join(generator.choices(WORDS, k=20)),
+            )
+            for i in range(start, min(start + batch_size, rows))
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument(
+        "--query",
+        action="append",
+        help=f"default: {RARE_WORD!r} and 'red fox'",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db.models import Q
+
+    from images.models import Images
+    from images.search import search_images
+
+    with test_database():
+        sys.stdout.write(f"Seeding {args.rows} images...\n")
+        seed(args.rows)
+
+        for query in args.query or [RARE_WORD, "red fox"]:
+            queryset = Images.objects.filter(status=Images.Status.READY)
+            for word in query.split():
+                queryset = queryset.filter(
+                    Q(title__icontains=word) | Q(description__icontains=word),
+                )
+            queryset = queryset.order_by("-id")
+
+            timings = measure(
+                lambda: list(queryset[: args.per_page]),
+                repeat=args.repeat,
+            )
+            report(f"{query!r} icontains first page", timings)
+
+            timings = measure(
+                lambda: search_images(query, args.per_page),
+                repeat=args.repeat,
+            )
+            report(f"{query!r} full-text first page", timings)
+
+            cursor = search_images(query, args.per_page).next_cursor
+            if cursor is None:
+                continue
+            timings = measure(
+                lambda: search_images(query, args.per_page, cursor),
+                repeat=args.repeat,
+            )
+            report(f"{query!r} full-text second page", timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from collections.abc import Callable, Iterator
+import contextlib
+import os
+import statistics
+import sys
+import time
+from typing import Any
+
+import django
+
+
+def setup() -> None:
+    """
+    Настроить Django для запуска бенчмарка как отдельного скрипта:
+    python -m benchmarks.<name> из каталога с manage.py
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookmarks.settings")
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database() -> Iterator[None]:
+    """
+    Создать временную тестовую БД, чтобы не трогать рабочие данные
+    """
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(
+    func: Callable[[], Any],
+    repeat: int = 5,
+    warmup: int = 1,
+) -> dict[str, float]:
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+
+
+def report(name: str, timings: dict[str, float], unit: str = "ms") -> None:
+    scale = 1000 if unit == "ms" else 1
+    sys.stdout.write(
+        f"{name:<45} "
+        f"min {timings['min'] * scale:10.2f}{unit}  "
+        f"median {timings['median'] * scale:10.2f}{unit}  "
+        f"max {timings['max'] * scale:10.2f}{unit}\n",
+    )
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+
+
+# Счётчики живут в общем кеше (CACHES в настройках), поэтому
+# команды вроде image_metrics видят сумму по всем процессам
+PREFIX = "metrics:"
+
+
+def incr(name: str, delta: int = 1) -> None:
+    key = f"{PREFIX}{name}"
+    if not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, timeout=None)
+
+
+def get(*names: str) -> dict[str, int]:
+    values = cache.get_many([f"{PREFIX}{name}" for name in names])
+    return {name: values.get(f"{PREFIX}{name}", 0) for name in names}
+
+
+def reset(*names: str) -> None:
+    cache.delete_many([f"{PREFIX}{name}" for name in names])
+
+
+def hit_rate(hits_name: str, misses_name: str) -> dict[str, float]:
+    values = get(hits_name, misses_name)
+    total = values[hits_name] + values[misses_name]
+    values["hit_rate"] = values[hits_name] / total if total else 0.0
+    return values
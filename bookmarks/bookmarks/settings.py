@@ -16,6 +16,14 @@ def load_list(key: str, default: str | bool) -> list[str]:
     return os.getenv(key=key, default=str(default)).split(",")
 
 
+def load_int(key: str, default: str | int) -> int:
+    return int(os.getenv(key=key, default=str(default)))
+
+
+def load_float(key: str, default: str | float) -> float:
+    return float(os.getenv(key=key, default=str(default)))
+
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv(key="DJANGO_SECRET_KEY", default="no_key")
@@ -82,6 +90,29 @@ DATABASES = {
     },
 }
 
+# SQLite для локальной разработки. Тестовая база — файл, а не память:
+# в общей памяти SQLite блокирует таблицы вместо ожидания,
+# и тесты параллельных запросов на ней не работают
+if os.getenv(key="DJANGO_DB_ENGINE") == "sqlite":
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+
+# Кеш общий для всех процессов: в нём лежат версии карточек,
+# счётчики и окна подавления дублей. LocMemCache по умолчанию
+# годится только для разработки в одном процессе
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            key="DJANGO_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv(key="DJANGO_CACHE_LOCATION", default=""),
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": (
@@ -129,6 +160,53 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+IMAGES_INGEST_WORKERS = load_int(key="DJANGO_IMAGES_INGEST_WORKERS", default=4)
+IMAGES_INGEST_MAX_ATTEMPTS = load_int(
+    key="DJANGO_IMAGES_INGEST_MAX_ATTEMPTS",
+    default=3,
+)
+IMAGES_INGEST_STALE_AFTER = load_int(
+    key="DJANGO_IMAGES_INGEST_STALE_AFTER",
+    default=600,
+)
+# Задержка перед повтором в секундах, удваивается с каждой попыткой
+IMAGES_INGEST_RETRY_BACKOFF = load_int(
+    key="DJANGO_IMAGES_INGEST_RETRY_BACKOFF",
+    default=60,
+)
+IMAGES_FETCH_MAX_SIZE = load_int(
+    key="DJANGO_IMAGES_FETCH_MAX_SIZE",
+    default=20 * 1024 * 1024,
+)
+IMAGES_FETCH_CONNECT_TIMEOUT = load_int(
+    key="DJANGO_IMAGES_FETCH_CONNECT_TIMEOUT",
+    default=5,
+)
+IMAGES_FETCH_READ_TIMEOUT = load_int(
+    key="DJANGO_IMAGES_FETCH_READ_TIMEOUT",
+    default=15,
+)
+IMAGES_FETCH_CHUNK_SIZE = 64 * 1024
+IMAGES_FETCH_POOL_HOSTS = load_int(
+    key="DJANGO_IMAGES_FETCH_POOL_HOSTS",
+    default=32,
+)
+IMAGES_FETCH_POOL_SIZE = load_int(
+    key="DJANGO_IMAGES_FETCH_POOL_SIZE",
+    default=IMAGES_INGEST_WORKERS,
+)
+IMAGES_FETCH_RETRIES = load_int(key="DJANGO_IMAGES_FETCH_RETRIES", default=3)
+IMAGES_FETCH_BACKOFF = load_float(
+    key="DJANGO_IMAGES_FETCH_BACKOFF",
+    default=0.5,
+)
+# Относительный путь считается от BASE_DIR, пустое значение —
+# каталог по умолчанию
+IMAGES_FETCH_CACHE_DIR = str(
+    BASE_DIR
+    / (os.getenv(key="DJANGO_IMAGES_FETCH_CACHE_DIR") or "cache/fetch"),
+)
+
 AUTHENTICATION_BACKENDS = [
     "social_core.backends.github.GithubOAuth2",
     "django.contrib.auth.backends.ModelBackend",
@@ -163,6 +241,62 @@ if DEBUG:
     mimetypes.add_type("application/javascript", ".js", True)
     mimetypes.add_type("text/css", ".css", True)
 
+THUMBNAIL_ALIASES = {
+    "images.Images.image": {
+        "list": {"size": (300, 300), "crop": "smart"},
+        "detail": {"size": (300, 0)},
+    },
+    "account.Profile.photo": {
+        "avatar": {"size": (180, 180)},
+    },
+}
+
+IMAGES_THUMBNAIL_INDEX_SIZE = load_int(
+    key="DJANGO_IMAGES_THUMBNAIL_INDEX_SIZE",
+    default=10000,
+)
+IMAGES_THUMBNAIL_INDEX_TIMEOUT = 7 * 24 * 60 * 60
+IMAGES_DETAIL_LIKERS = load_int(key="DJANGO_IMAGES_DETAIL_LIKERS", default=20)
+IMAGES_LIKERS_PER_PAGE = 50
+IMAGES_LIKE_BATCH_SIZE = 100
+IMAGES_SEARCH_PER_PAGE = 20
+IMAGES_CARD_CACHE_TIMEOUT = load_int(
+    key="DJANGO_IMAGES_CARD_CACHE_TIMEOUT",
+    default=24 * 60 * 60,
+)
+IMAGES_PAGE_CACHE_TIMEOUT = load_int(
+    key="DJANGO_IMAGES_PAGE_CACHE_TIMEOUT",
+    default=60,
+)
+
+ACCOUNT_USERS_PER_PAGE = 24
+ACCOUNT_SEARCH_RESULTS = 10
+ACCOUNT_PROFILE_IMAGES_PER_PAGE = 8
+
+ACTIONS_FEED_PER_PAGE = 20
+ACTIONS_FANOUT_BATCH_SIZE = load_int(
+    key="DJANGO_ACTIONS_FANOUT_BATCH_SIZE",
+    default=1000,
+)
+ACTIONS_FANOUT_STALE_AFTER = 5 * 60
+ACTIONS_FANOUT_DONE_RETENTION = 24 * 60 * 60
+ACTIONS_DUPLICATE_WINDOW = load_int(
+    key="DJANGO_ACTIONS_DUPLICATE_WINDOW",
+    default=60,
+)
+ACTIONS_DUPLICATE_INDEX_SIZE = 10000
+ACTIONS_BUFFER_SIZE = load_int(key="DJANGO_ACTIONS_BUFFER_SIZE", default=0)
+ACTIONS_BUFFER_DELAY = load_float(key="DJANGO_ACTIONS_BUFFER_DELAY", default=1)
+ACTIONS_BUFFER_JOURNAL_DIR = os.getenv(
+    key="DJANGO_ACTIONS_BUFFER_JOURNAL_DIR",
+    default=str(BASE_DIR / "cache" / "actions"),
+)
+ACTIONS_RETENTION_DAYS = load_int(
+    key="DJANGO_ACTIONS_RETENTION_DAYS",
+    default=90,
+)
+ACTIONS_RETENTION_CHUNK_SIZE = 1000
+
 ABSOLUTE_URL_OVERRIDES = {
     "auth.user": lambda u: reverse_lazy(
         "account:user_detail",
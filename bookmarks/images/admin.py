@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from images.models import Images
+from images.models import ImageBlob, Images, IngestJob, Like
 
 
 @admin.register(Images)
@@ -9,6 +9,44 @@ class ImagesAdmin(admin.ModelAdmin):
         Images.title.field.name,
         Images.slug.field.name,
         Images.image.field.name,
+        Images.status.field.name,
+        Images.total_likes.field.name,
         Images.created.field.name,
     ]
-    list_filter = [Images.created.field.name]
+    list_filter = [Images.status.field.name, Images.created.field.name]
+
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = [
+        IngestJob.image.field.name,
+        IngestJob.status.field.name,
+        IngestJob.attempts.field.name,
+        IngestJob.next_attempt_at.field.name,
+        IngestJob.updated.field.name,
+    ]
+    list_filter = [IngestJob.status.field.name]
+    list_select_related = [IngestJob.image.field.name]
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = [
+        ImageBlob.digest.field.name,
+        ImageBlob.file.field.name,
+        ImageBlob.size.field.name,
+        ImageBlob.ref_count.field.name,
+        ImageBlob.created.field.name,
+    ]
+    search_fields = [ImageBlob.digest.field.name]
+
+
+@admin.register(Like)
+class LikeAdmin(admin.ModelAdmin):
+    list_display = [
+        Like.image.field.name,
+        Like.user.field.name,
+        Like.created.field.name,
+    ]
+    list_select_related = [Like.image.field.name, Like.user.field.name]
+    raw_id_fields = [Like.image.field.name, Like.user.field.name]
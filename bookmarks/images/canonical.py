@@ -0,0 +1,45 @@
+import hashlib
+from urllib.parse import (
+    parse_qsl,
+    quote,
+    unquote,
+    urlencode,
+    urlsplit,
+    urlunsplit,
+)
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "yclid", "mc_")
+
+
+def _is_tracking(param: str) -> bool:
+    return param.lower().startswith(TRACKING_PARAMS)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Привести URL к каноническому виду: схема и хост в нижнем регистре,
+    без порта по умолчанию, фрагмента и трекинговых параметров,
+    с отсортированной строкой запроса
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = quote(unquote(parts.path), safe="/%:@!$&'()*+,;=~") or "/"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking(key)
+        ),
+    )
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
@@ -0,0 +1,147 @@
+from collections.abc import Iterable
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from images.models import Images
+from images.pagination import CursorPage
+from images.thumbnails import thumbnail_url
+
+
+CARD_TEMPLATE = "images/image/card.html"
+VERSION_KEY = "images:card:version:{}"
+CARD_KEY = "images:card:{}:{}"
+LIST_VERSION_KEY = "images:list:version"
+PAGE_KEY = "images:list:page:{}:{}:{}"
+
+
+def _new_version() -> str:
+    return str(time.time_ns())
+
+
+def get_versions(image_ids: Iterable[int]) -> dict[int, str]:
+    """
+    Текущие версии карточек. Отсутствующая версия создаётся заново,
+    поэтому вытеснение её из кеша не может вернуть старую карточку
+    """
+    image_ids = list(image_ids)
+    keys = {image_id: VERSION_KEY.format(image_id) for image_id in image_ids}
+    found = cache.get_many(keys.values())
+
+    versions = {}
+    for image_id, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _new_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[image_id] = version
+
+    return versions
+
+
+def invalidate(image_id: int) -> None:
+    cache.set(VERSION_KEY.format(image_id), _new_version(), timeout=None)
+
+
+def get_list_version() -> str:
+    """
+    Версия состава ленты. Сохранённые страницы других версий
+    не используются
+    """
+    version = cache.get(LIST_VERSION_KEY)
+    if version is None:
+        version = _new_version()
+        if not cache.add(LIST_VERSION_KEY, version, timeout=None):
+            version = cache.get(LIST_VERSION_KEY, version)
+    return version
+
+
+def invalidate_list() -> None:
+    """
+    Сбросить сохранённые страницы ленты, например когда в ней
+    появилось новое изображение
+    """
+    cache.set(LIST_VERSION_KEY, _new_version(), timeout=None)
+
+
+def _render(images: Iterable[Images]) -> tuple[str, dict[int, str]]:
+    images = list(images)
+    versions = get_versions(image.id for image in images)
+    keys = {
+        image.id: CARD_KEY.format(image.id, versions[image.id])
+        for image in images
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = {}
+    cards = []
+    for image in images:
+        card = cached.get(keys[image.id])
+        if card is None:
+            thumbnail = thumbnail_url(image, "list")
+            card = render_to_string(
+                CARD_TEMPLATE,
+                {"image": image, "thumbnail": thumbnail},
+            )
+            # Карточку без миниатюры не кешируем, чтобы ошибка
+            # генерации не держалась всё время жизни кеша
+            if thumbnail or not image.image:
+                missing[keys[image.id]] = card
+        cards.append(card)
+
+    if missing:
+        cache.set_many(missing, timeout=settings.IMAGES_CARD_CACHE_TIMEOUT)
+
+    return "".join(cards), versions
+
+
+def render_cards(images: Iterable[Images]) -> str:
+    """
+    Отрисовать карточки изображений, беря готовые из кеша.
+    Шаблон рендерится только для карточек, которых в кеше нет
+    """
+    return _render(images)[0]
+
+
+def get_page(
+    cursor: str,
+    list_version: str,
+    scope: str = "all",
+) -> tuple[str, str | None, list[int]] | None:
+    """
+    Готовый фрагмент страницы ленты по курсору и id его изображений,
+    если ни одна из его карточек не менялась с момента сохранения.
+    scope отделяет ленты с разными фильтрами, например по автору
+    """
+    page = cache.get(PAGE_KEY.format(list_version, scope, cursor))
+    if page is None:
+        return None
+
+    html, next_cursor, versions = page
+    if get_versions(versions) != versions:
+        return None
+
+    return html, next_cursor, list(versions)
+
+
+def render_page(
+    cursor: str,
+    page: CursorPage,
+    list_version: str,
+    scope: str = "all",
+) -> str:
+    """
+    Отрисовать страницу ленты и сохранить её. list_version берётся
+    до запроса страницы, иначе изображение, ставшее готовым между
+    запросом и сохранением, пропадёт из неё до истечения кеша
+    """
+    html, versions = _render(page)
+    cache.set(
+        PAGE_KEY.format(list_version, scope, cursor),
+        (html, page.next_cursor, versions),
+        timeout=settings.IMAGES_PAGE_CACHE_TIMEOUT,
+    )
+    return html
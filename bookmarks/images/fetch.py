@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.temp import NamedTemporaryFile
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from images.storage import blob_path, guess_extension
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+def _content_type(response: requests.Response) -> str:
+    value = response.headers.get("Content-Type", "")
+    return value.split(";", 1)[0].strip().lower()
+
+
+class HTTPCache:
+    """
+    Дисковый кеш валидаторов ETag/Last-Modified. Тело ответа
+    не копируется: после 304 файл берётся из контентно-адресуемого
+    хранилища по sha256, куда его записал download. Запись кеша —
+    несколько сотен байт на URL
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        try:
+            with self._path(url).open() as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+        if not meta.get("name") or not default_storage.exists(meta["name"]):
+            return None
+
+        return meta
+
+    def validators(self, url: str) -> dict[str, str]:
+        meta = self.get(url)
+        if meta is None:
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(
+        self,
+        url: str,
+        response: requests.Response,
+        fetched: File,
+    ) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        meta_path = self._path(url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_tmp = meta_path.with_suffix(
+            f".{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        with meta_tmp.open("w") as meta_file:
+            json.dump(
+                {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "content_type": fetched.content_type,
+                    "digest": fetched.digest,
+                    "name": blob_path(
+                        fetched.digest,
+                        guess_extension(fetched.content_type, url),
+                    ),
+                },
+                meta_file,
+            )
+        meta_tmp.replace(meta_path)
+
+    def open(self, url: str) -> File | None:
+        meta = self.get(url)
+        if meta is None:
+            return None
+
+        try:
+            cached = default_storage.open(meta["name"], "rb")
+        except FileNotFoundError:
+            return None
+
+        cached.content_type = meta["content_type"]
+        cached.digest = meta["digest"]
+        return cached
+
+
+class Fetcher:
+    """
+    Общий потокобезопасный HTTP-клиент: пул keep-alive соединений
+    по хостам, повторы с экспоненциальной задержкой и условные запросы
+    """
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "django-bookmarks/0.1"
+        adapter = HTTPAdapter(
+            pool_connections=settings.IMAGES_FETCH_POOL_HOSTS,
+            pool_maxsize=settings.IMAGES_FETCH_POOL_SIZE,
+            max_retries=Retry(
+                total=settings.IMAGES_FETCH_RETRIES,
+                backoff_factor=settings.IMAGES_FETCH_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=["GET"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        cache_dir = settings.IMAGES_FETCH_CACHE_DIR
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _check_response(
+        self,
+        response: requests.Response,
+        url: str,
+        max_size: int,
+    ) -> None:
+        if response.status_code != requests.codes.ok:
+            raise ImageFetchError(
+                f"{url} responded with HTTP {response.status_code}",
+            )
+
+        content_type = _content_type(response)
+        if not content_type.startswith("image/"):
+            raise ImageFetchError(
+                f"{url} is not an image (Content-Type: {content_type!r})",
+            )
+
+        content_length = response.headers.get("Content-Length")
+        if content_length and int(content_length) > max_size:
+            raise ImageFetchError(
+                f"{url} is {content_length} bytes, limit is {max_size}",
+            )
+
+    def _stream_to_file(
+        self,
+        response: requests.Response,
+        url: str,
+        max_size: int,
+    ) -> File:
+        temp_file = NamedTemporaryFile(suffix=".download")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            for chunk in response.iter_content(
+                chunk_size=settings.IMAGES_FETCH_CHUNK_SIZE,
+            ):
+                size += len(chunk)
+                if size > max_size:
+                    raise ImageFetchError(
+                        f"{url} exceeds the limit of {max_size} bytes",
+                    )
+                digest.update(chunk)
+                temp_file.write(chunk)
+        except requests.RequestException as exc:
+            temp_file.close()
+            raise ImageFetchError(f"Reading {url} failed: {exc}") from exc
+        except ImageFetchError:
+            temp_file.close()
+            raise
+
+        temp_file.flush()
+        temp_file.seek(0)
+        fetched = File(temp_file)
+        fetched.content_type = _content_type(response)
+        fetched.digest = digest.hexdigest()
+        return fetched
+
+    def _get(
+        self,
+        url: str,
+        headers: dict[str, str],
+        timeout: tuple[float, float],
+    ) -> requests.Response:
+        try:
+            return self.session.get(
+                url,
+                headers=headers,
+                stream=True,
+                timeout=timeout,
+            )
+        except requests.RequestException as exc:
+            raise ImageFetchError(f"Request to {url} failed: {exc}") from exc
+
+    def fetch(
+        self,
+        url: str,
+        max_size: int | None = None,
+        timeout: tuple[float, float] | None = None,
+    ) -> File:
+        """
+        Скачать изображение потоково во временный файл.
+        Память не зависит от размера файла: тело читается кусками
+        """
+        if max_size is None:
+            max_size = settings.IMAGES_FETCH_MAX_SIZE
+        if timeout is None:
+            timeout = (
+                settings.IMAGES_FETCH_CONNECT_TIMEOUT,
+                settings.IMAGES_FETCH_READ_TIMEOUT,
+            )
+
+        headers = self.cache.validators(url) if self.cache else {}
+        response = self._get(url, headers, timeout)
+        if response.status_code == requests.codes.not_modified:
+            with response:
+                response.raw.drain_conn()
+            cached = self.cache.open(url) if self.cache else None
+            if cached is not None:
+                return cached
+
+            # Файл удалили из хранилища после проверки валидаторов:
+            # повторяем запрос без условных заголовков
+            response = self._get(url, {}, timeout)
+
+        with response:
+            self._check_response(response, url, max_size)
+            fetched = self._stream_to_file(response, url, max_size)
+
+        if self.cache:
+            self.cache.store(url, response, fetched)
+        return fetched
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> Fetcher:
+    global _fetcher
+
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+        return _fetcher
+
+
+@receiver(setting_changed)
+def reset_fetcher(setting: str, **kwargs: Any) -> None:
+    global _fetcher
+
+    if setting.startswith("IMAGES_FETCH_"):
+        with _fetcher_lock:
+            if _fetcher is not None:
+                _fetcher.close()
+            _fetcher = None
+
+
+def fetch_image(
+    url: str,
+    max_size: int | None = None,
+    timeout: tuple[float, float] | None = None,
+) -> File:
+    return get_fetcher().fetch(url, max_size=max_size, timeout=timeout)
@@ -1,10 +1,10 @@
 from typing import Any
 
 from django import forms
-from django.core.files.base import ContentFile
-from django.utils.text import slugify
-import requests
+from django.db import transaction
 
+from bookmarks import metrics
+import images.ingest
 from images.models import Images
 
 
@@ -38,14 +38,15 @@ class ImagesCreateForm(forms.ModelForm):
         commit: bool = True,
     ) -> Any:
         image = super().save(commit=False)
-        image_url = self.cleaned_data["url"]
-        name = slugify(image.title)
-        extension = image.url.rsplit(".", 1)[1].lower()
-        image_name = f"{name}.{extension}"
-
-        response = requests.get(image_url)
-        image.image.save(image_name, ContentFile(response.content), save=False)
+        image.status = Images.Status.PENDING
         if commit:
-            image.save()
+            with transaction.atomic():
+                image.save()
+                reused = images.ingest.reuse_ingested(image)
+                metrics.incr(
+                    "url_dedup_hits" if reused else "url_dedup_misses",
+                )
+                if not reused:
+                    images.ingest.enqueue(image)
 
         return image
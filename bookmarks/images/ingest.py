@@ -0,0 +1,248 @@
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+import images.cards
+from images.fetch import fetch_image
+from images.models import Images, IngestJob
+from images.storage import (
+    attach_blob,
+    get_or_create_blob,
+    guess_extension,
+    write_blob_file,
+)
+from images.thumbnails import generate_thumbnails
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(image: Images) -> IngestJob:
+    """
+    Поставить загрузку изображения в очередь
+    """
+    return IngestJob.objects.create(image=image)
+
+
+def requeue_stale(stale_after: int | None = None) -> int:
+    """
+    Вернуть в очередь задачи, брошенные упавшими воркерами
+    """
+    if stale_after is None:
+        stale_after = settings.IMAGES_INGEST_STALE_AFTER
+
+    deadline = timezone.now() - datetime.timedelta(seconds=stale_after)
+    return IngestJob.objects.filter(
+        status=IngestJob.Status.RUNNING,
+        updated__lt=deadline,
+    ).update(status=IngestJob.Status.PENDING, updated=timezone.now())
+
+
+def reuse_ingested(image: Images) -> bool:
+    """
+    Взять файл у уже скачанного изображения с тем же каноническим URL.
+    Счётчики попаданий ведёт вызывающий, который принимает решение
+    """
+    source = (
+        Images.objects.filter(
+            url_hash=image.url_hash,
+            status=Images.Status.READY,
+        )
+        .exclude(id=image.id)
+        .exclude(image="")
+        .select_related("blob")
+        .first()
+    )
+    if source is None:
+        return False
+
+    with transaction.atomic():
+        if source.blob is not None:
+            attach_blob(image, source.blob)
+        else:
+            image.image.name = source.image.name
+        image.status = Images.Status.READY
+        Images.objects.filter(id=image.id).update(
+            image=image.image.name,
+            status=image.status,
+        )
+        images.cards.invalidate_list()
+
+    return True
+
+
+def claim_jobs(limit: int) -> list[IngestJob]:
+    due = Q(next_attempt_at__isnull=True) | Q(
+        next_attempt_at__lte=timezone.now(),
+    )
+    pending_ids = list(
+        IngestJob.objects.filter(due, status=IngestJob.Status.PENDING)
+        .order_by("created")
+        .values_list("id", flat=True)[:limit],
+    )
+
+    claimed = []
+    for job_id in pending_ids:
+        updated = IngestJob.objects.filter(
+            id=job_id,
+            status=IngestJob.Status.PENDING,
+        ).update(
+            status=IngestJob.Status.RUNNING,
+            attempts=F("attempts") + 1,
+            updated=timezone.now(),
+        )
+        if updated:
+            claimed.append(job_id)
+
+    return list(
+        IngestJob.objects.filter(id__in=claimed).select_related("image"),
+    )
+
+
+def download(image: Images) -> tuple[str, str, int]:
+    """
+    Скачать изображение в контентно-адресуемое хранилище.
+    Возвращает имя файла, sha256 и размер
+    """
+    with fetch_image(image.url) as fetched:
+        extension = guess_extension(fetched.content_type, image.url)
+        name = write_blob_file(fetched, fetched.digest, extension)
+        return name, fetched.digest, fetched.size
+
+
+def _download(job: IngestJob) -> tuple[str, str, int] | Exception:
+    try:
+        return download(job.image)
+    except Exception as exc:
+        logger.warning("Ingest of image %s failed: %s", job.image_id, exc)
+        return exc
+
+
+def retry_delay(attempts: int) -> datetime.timedelta:
+    """
+    Экспоненциальная задержка перед следующей попыткой
+    """
+    backoff = settings.IMAGES_INGEST_RETRY_BACKOFF
+    return datetime.timedelta(seconds=backoff * 2 ** max(attempts - 1, 0))
+
+
+def _fail_job(job: IngestJob, error: Exception) -> None:
+    failed = job.attempts >= settings.IMAGES_INGEST_MAX_ATTEMPTS
+    with transaction.atomic():
+        if failed:
+            job.status = IngestJob.Status.FAILED
+            job.next_attempt_at = None
+        else:
+            job.status = IngestJob.Status.PENDING
+            job.next_attempt_at = timezone.now() + retry_delay(job.attempts)
+        job.error = str(error)
+        job.save(
+            update_fields=["status", "next_attempt_at", "error", "updated"],
+        )
+        if failed:
+            Images.objects.filter(id=job.image_id).update(
+                status=Images.Status.FAILED,
+            )
+
+
+def finish_job(
+    job: IngestJob,
+    result: tuple[str, str, int] | Exception,
+) -> bool:
+    if isinstance(result, Exception):
+        _fail_job(job, result)
+        return False
+
+    name, digest, size = result
+    try:
+        with transaction.atomic():
+            blob = get_or_create_blob(digest, name, size)
+            attach_blob(job.image, blob)
+    except FileNotFoundError as exc:
+        # Файл удалил gc_image_blobs: при повторе он запишется заново
+        _fail_job(job, exc)
+        return False
+
+    try:
+        generate_thumbnails(job.image)
+    except Exception as exc:
+        logger.warning(
+            "Thumbnails for image %s failed: %s",
+            job.image_id,
+            exc,
+        )
+
+    with transaction.atomic():
+        Images.objects.filter(id=job.image_id).update(
+            status=Images.Status.READY,
+        )
+        images.cards.invalidate(job.image_id)
+        images.cards.invalidate_list()
+        job.status = IngestJob.Status.DONE
+        job.error = ""
+        job.save(update_fields=["status", "error", "updated"])
+
+    return True
+
+
+def finish_reused(job: IngestJob) -> None:
+    job.status = IngestJob.Status.DONE
+    job.error = ""
+    job.save(update_fields=["status", "error", "updated"])
+
+
+def process_job(job: IngestJob) -> bool:
+    if reuse_ingested(job.image):
+        finish_reused(job)
+        return True
+
+    return finish_job(job, _download(job))
+
+
+def run_pending(
+    workers: int | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Обработать одну пачку задач, вернуть число обработанных.
+    Потоки пула только скачивают файлы, в БД пишет вызывающий поток
+    """
+    if workers is None:
+        workers = settings.IMAGES_INGEST_WORKERS
+    if batch_size is None:
+        batch_size = workers * 4
+
+    claimed = claim_jobs(batch_size)
+    if not claimed:
+        return 0
+
+    jobs, followers, seen = [], [], set()
+    for job in claimed:
+        if job.image.url_hash in seen:
+            followers.append(job)
+            continue
+
+        seen.add(job.image.url_hash)
+        if reuse_ingested(job.image):
+            finish_reused(job)
+        else:
+            jobs.append(job)
+
+    if workers <= 1:
+        results = map(_download, jobs)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_download, jobs))
+
+    for job, result in zip(jobs, results):
+        finish_job(job, result)
+
+    for job in followers:
+        process_job(job)
+
+    return len(claimed)
@@ -0,0 +1,193 @@
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest
+
+from account.membership import get_membership, Membership
+from images.models import Images, Like
+
+
+def _change_total(image_id: int, delta: int) -> int:
+    if delta:
+        Images.objects.filter(id=image_id, total_likes__gte=-delta).update(
+            total_likes=F("total_likes") + delta,
+        )
+    return Images.objects.values_list("total_likes", flat=True).get(
+        id=image_id,
+    )
+
+
+def _lock_user(user: User) -> None:
+    # Все изменения лайков одного пользователя идут по очереди,
+    # поэтому прочитанное в транзакции состояние лайков точное
+    list(User.objects.select_for_update().filter(id=user.id).values("id"))
+
+
+def like_image(image_id: int, user: User) -> tuple[int, bool]:
+    """
+    Поставить лайк и вернуть новое число лайков и признак того,
+    что лайк создан. Счётчик меняется в той же транзакции, что
+    и связь, и только если связь действительно создана, поэтому
+    повторы его не сбивают
+    """
+    with transaction.atomic():
+        _lock_user(user)
+        _, created = Like.objects.get_or_create(
+            image_id=image_id,
+            user_id=user.id,
+        )
+        return _change_total(image_id, 1 if created else 0), created
+
+
+def unlike_image(image_id: int, user: User) -> int:
+    with transaction.atomic():
+        _lock_user(user)
+        deleted, _ = Like.objects.filter(
+            image_id=image_id,
+            user_id=user.id,
+        ).delete()
+        return _change_total(image_id, -1 if deleted else 0)
+
+
+def coalesce_actions(
+    actions: list[tuple[int, str]],
+) -> dict[int, tuple[int, str]]:
+    """
+    Оставить для каждого изображения только последнее действие:
+    like → unlike → like сворачивается в один like
+    """
+    final = {}
+    for position, (image_id, action) in enumerate(actions):
+        final[image_id] = (position, action)
+    return final
+
+
+def _outcome(
+    image_id: int,
+    action: str,
+    position: int,
+    final: dict[int, tuple[int, str]],
+    changed: dict[int, str],
+    totals: dict[int, int],
+) -> dict[str, Any]:
+    result = {"id": image_id, "action": action}
+    if image_id not in totals:
+        result.update(status="error", message="Image does not exist")
+        return result
+
+    if final[image_id][0] != position:
+        result["status"] = "coalesced"
+    else:
+        result["status"] = changed.get(image_id, "unchanged")
+    result["total_likes"] = totals[image_id]
+    return result
+
+
+def apply_likes(
+    user: User,
+    actions: list[tuple[int, str]],
+) -> list[dict[str, Any]]:
+    """
+    Применить пачку действий like/unlike одной транзакцией:
+    одна вставка, одно удаление и по одному UPDATE счётчиков.
+    Действия идемпотентны, результат возвращается для каждого элемента
+    """
+    final = coalesce_actions(actions)
+    with transaction.atomic():
+        _lock_user(user)
+        existing = set(
+            Images.objects.filter(id__in=final)
+            .order_by()
+            .values_list("id", flat=True),
+        )
+        liked = set(
+            Like.objects.filter(user_id=user.id, image_id__in=existing)
+            .order_by()
+            .values_list("image_id", flat=True),
+        )
+        changed = {
+            image_id: "liked" if action == "like" else "unliked"
+            for image_id, (_, action) in final.items()
+            if image_id in existing
+            and (image_id in liked) != (action == "like")
+        }
+        to_like = [i for i, status in changed.items() if status == "liked"]
+        to_unlike = [i for i, status in changed.items() if status == "unliked"]
+
+        Like.objects.bulk_create(
+            Like(image_id=image_id, user_id=user.id) for image_id in to_like
+        )
+        Like.objects.filter(
+            user_id=user.id,
+            image_id__in=to_unlike,
+        ).delete()
+        Images.objects.filter(id__in=to_like).update(
+            total_likes=F("total_likes") + 1,
+        )
+        Images.objects.filter(id__in=to_unlike, total_likes__gt=0).update(
+            total_likes=F("total_likes") - 1,
+        )
+        totals = dict(
+            Images.objects.filter(id__in=existing)
+            .order_by()
+            .values_list("id", "total_likes"),
+        )
+
+    return [
+        _outcome(image_id, action, position, final, changed, totals)
+        for position, (image_id, action) in enumerate(actions)
+    ]
+
+
+def recent_likes(image_id: int) -> models.QuerySet:
+    """
+    Лайки изображения от новых к старым вместе с пользователями
+    и профилями одним запросом по индексу (image, -created)
+    """
+    return (
+        Like.objects.filter(image_id=image_id)
+        .select_related("user", "user__profile")
+        .order_by("-created", "-id")
+    )
+
+
+def recent_likers(image_id: int, limit: int) -> list[User]:
+    return [like.user for like in recent_likes(image_id)[:limit]]
+
+
+def liked_by(request: HttpRequest) -> Membership:
+    """
+    Какие изображения лайкнул текущий пользователь
+    """
+    return get_membership(
+        request,
+        "liked_images",
+        Like.objects.filter(user_id=request.user.id),
+        "image_id",
+    )
+
+
+def likes_count() -> Coalesce:
+    likes = (
+        Like.objects.filter(image_id=OuterRef("pk"))
+        .order_by()
+        .values("image_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(likes), 0)
+
+
+def reconcile(image_ids: list[int]) -> int:
+    """
+    Пересчитать total_likes по таблице лайков одним UPDATE.
+    Возвращает число исправленных строк
+    """
+    return (
+        Images.objects.filter(id__in=image_ids)
+        .exclude(total_likes=likes_count())
+        .update(total_likes=likes_count())
+    )
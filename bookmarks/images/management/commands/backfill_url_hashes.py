@@ -0,0 +1,42 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from images.canonical import url_hash
+from images.models import Images
+
+
+class Command(BaseCommand):
+    help = "Fill Images.url_hash for rows created before the URL index"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute hashes for every row, not only empty ones",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queryset = Images.objects.order_by("id").only("id", "url")
+        if not options["all"]:
+            queryset = queryset.filter(url_hash="")
+
+        last_id = 0
+        updated = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)[: options["batch_size"]],
+            )
+            if not batch:
+                break
+
+            for image in batch:
+                image.url_hash = url_hash(image.url)
+            Images.objects.bulk_update(batch, ["url_hash"])
+
+            last_id = batch[-1].id
+            updated += len(batch)
+            self.stdout.write(f"Updated {updated} image(s), last id {last_id}")
+
+        self.stdout.write(f"Done, {updated} image(s) updated")
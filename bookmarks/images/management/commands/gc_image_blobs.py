@@ -0,0 +1,69 @@
+import datetime
+from typing import Any
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from images.models import ImageBlob, Images
+import images.storage
+
+
+class Command(BaseCommand):
+    help = "Delete stored image blobs no longer referenced by any image"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Keep blobs younger than this many seconds",
+        )
+        parser.add_argument(
+            "--orphans",
+            action="store_true",
+            help="Also delete blob files that have no database row",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deadline = timezone.now() - datetime.timedelta(
+            seconds=options["min_age"],
+        )
+        unreferenced = ImageBlob.objects.filter(
+            ref_count=0,
+            created__lt=deadline,
+        ).exclude(Exists(Images.objects.filter(blob=OuterRef("pk"))))
+
+        deleted = 0
+        for blob_id in list(unreferenced.values_list("id", flat=True)):
+            if options["dry_run"] or images.storage.collect_blob(blob_id):
+                deleted += 1
+
+        self.stdout.write(f"Deleted {deleted} unreferenced blob(s)")
+
+        if options["orphans"]:
+            orphans = self.delete_orphans(options["dry_run"])
+            self.stdout.write(f"Deleted {orphans} orphaned file(s)")
+
+    def delete_orphans(self, dry_run: bool) -> int:
+        deleted = 0
+        for name in self.walk(images.storage.BLOBS_DIR):
+            if ImageBlob.objects.filter(file=name).exists():
+                continue
+            if not dry_run:
+                default_storage.delete(name)
+            deleted += 1
+
+        return deleted
+
+    def walk(self, path: str) -> Any:
+        if not default_storage.exists(path):
+            return
+
+        directories, files = default_storage.listdir(path)
+        for name in files:
+            yield f"{path}/{name}"
+        for directory in directories:
+            yield from self.walk(f"{path}/{directory}")
@@ -0,0 +1,46 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from bookmarks import metrics
+from images.thumbnails import COUNTERS, thumbnail_index
+
+
+class Command(BaseCommand):
+    help = "Show image ingestion and caching counters"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stats = metrics.hit_rate("url_dedup_hits", "url_dedup_misses")
+        self.stdout.write(
+            f"URL dedup: {stats['url_dedup_hits']} hit(s), "
+            f"{stats['url_dedup_misses']} miss(es), "
+            f"hit rate {stats['hit_rate']:.1%}",
+        )
+
+        thumbnail_index.flush_stats()
+        thumbnails = metrics.get(*COUNTERS)
+        hits = (
+            thumbnails["thumbnail_local_hits"]
+            + thumbnails["thumbnail_shared_hits"]
+        )
+        lookups = hits + thumbnails["thumbnail_misses"]
+        self.stdout.write(
+            f"Thumbnail index: {thumbnails['thumbnail_local_hits']} local "
+            f"hit(s), {thumbnails['thumbnail_shared_hits']} shared hit(s), "
+            f"{thumbnails['thumbnail_misses']} miss(es), "
+            f"hit rate {hits / lookups if lookups else 0.0:.1%}",
+        )
+
+        if options["reset"]:
+            metrics.reset(
+                "url_dedup_hits",
+                "url_dedup_misses",
+                *COUNTERS,
+            )
@@ -0,0 +1,55 @@
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+import images.ingest
+
+
+class Command(BaseCommand):
+    help = "Download pending bookmarked images in a thread pool"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.IMAGES_INGEST_WORKERS,
+            help="Number of download threads",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Jobs claimed per iteration (default: workers * 4)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        workers = options["workers"]
+        batch_size = options["batch_size"]
+
+        while True:
+            requeued = images.ingest.requeue_stale()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+            processed = images.ingest.run_pending(workers, batch_size)
+            if processed:
+                self.stdout.write(f"Processed {processed} job(s)")
+                continue
+
+            if options["once"]:
+                break
+
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,43 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+import images.likes
+from images.models import Images
+
+
+class Command(BaseCommand):
+    help = "Recount Images.total_likes from the likes table"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--start-id",
+            type=int,
+            default=0,
+            help="Resume after this image id",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queryset = Images.objects.order_by("id").values_list("id", flat=True)
+        last_id = options["start_id"]
+        checked = 0
+        repaired = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)[: options["batch_size"]],
+            )
+            if not batch:
+                break
+
+            repaired += images.likes.reconcile(batch)
+            last_id = batch[-1]
+            checked += len(batch)
+            self.stdout.write(
+                f"Checked {checked} image(s), repaired {repaired}, "
+                f"last id {last_id}",
+            )
+
+        self.stdout.write(
+            f"Done, {checked} image(s) checked, {repaired} repaired",
+        )
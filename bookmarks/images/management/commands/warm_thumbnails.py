@@ -0,0 +1,104 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+from typing import Any
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections
+from easy_thumbnails.engine import NoSourceGenerator
+from easy_thumbnails.exceptions import EasyThumbnailsError
+
+from images.models import Images
+from images.thumbnails import generate_thumbnails
+
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker() -> None:
+    if not apps.ready:
+        django.setup()
+
+
+def _warm_batch(image_ids: list[int]) -> tuple[int, int]:
+    generated, failed = 0, 0
+    for image in Images.objects.filter(id__in=image_ids).only("id", "image"):
+        try:
+            generate_thumbnails(image)
+            generated += 1
+        except (EasyThumbnailsError, NoSourceGenerator, OSError):
+            # Битый или пропавший файл: остальные изображения пачки
+            # обрабатываются дальше, прочие ошибки прерывают команду
+            logger.exception("Thumbnails for image %s failed", image.id)
+            failed += 1
+
+    return generated, failed
+
+
+class Command(BaseCommand):
+    help = "Pre-generate thumbnail aliases for all stored images"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--start-id",
+            type=int,
+            default=0,
+            help="Resume from images with a greater id",
+        )
+
+    def batches(self, start_id: int, batch_size: int) -> Any:
+        queryset = (
+            Images.objects.filter(
+                status=Images.Status.READY,
+                id__gt=start_id,
+            )
+            .exclude(image="")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        last_id = start_id
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return
+            last_id = batch[-1]
+            yield batch
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batches = list(
+            self.batches(options["start_id"], options["batch_size"]),
+        )
+        if not batches:
+            self.stdout.write("Nothing to do")
+            return
+
+        if options["processes"] <= 1:
+            self.collect(batches, map(_warm_batch, batches))
+            return
+
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=options["processes"],
+            initializer=_init_worker,
+        ) as executor:
+            self.collect(batches, executor.map(_warm_batch, batches))
+
+    def collect(self, batches: list[list[int]], results: Any) -> None:
+        generated, failed = 0, 0
+        for batch, (batch_generated, batch_failed) in zip(batches, results):
+            generated += batch_generated
+            failed += batch_failed
+            self.stdout.write(
+                f"Warmed {generated} image(s), last id {batch[-1]}",
+            )
+
+        self.stdout.write(f"Done: {generated} warmed, {failed} failed")
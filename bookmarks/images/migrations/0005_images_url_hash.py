@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("images", "0004_imageblob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="images",
+            name="url_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_total_likes(apps, schema_editor):
+    Images = apps.get_model("images", "Images")
+    likes = (
+        Images.users_like.through.objects.filter(images_id=OuterRef("pk"))
+        .order_by()
+        .values("images_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Images.objects.update(total_likes=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("images", "0005_images_url_hash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="images",
+            name="total_likes",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_total_likes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="images",
+            index=models.Index(
+                fields=["-total_likes"], name="images_imag_total_l_6fd6e6_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,145 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class AddIndexOnline(migrations.AddIndex):
+    """
+    На PostgreSQL индекс строится через CREATE INDEX CONCURRENTLY,
+    не блокируя запись лайков; на остальных СУБД это обычный AddIndex
+    """
+
+    def database_forwards(
+        self,
+        app_label,
+        schema_editor,
+        from_state,
+        to_state,
+    ):
+        if schema_editor.connection.vendor != "postgresql":
+            super().database_forwards(
+                app_label,
+                schema_editor,
+                from_state,
+                to_state,
+            )
+            return
+
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(
+        self,
+        app_label,
+        schema_editor,
+        from_state,
+        to_state,
+    ):
+        if schema_editor.connection.vendor != "postgresql":
+            super().database_backwards(
+                app_label,
+                schema_editor,
+                from_state,
+                to_state,
+            )
+            return
+
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнить внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ("images", "0006_images_total_likes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Like maps onto the existing auto-created M2M table, so only the
+        # state changes here: no rows are copied.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="Like",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "image",
+                            models.ForeignKey(
+                                db_column="images_id",
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="likes",
+                                to="images.images",
+                            ),
+                        ),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="likes",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "images_images_users_like",
+                        "unique_together": {("image", "user")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="images",
+                    name="users_like",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="images_liked",
+                        through="images.Like",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.AddField(
+            model_name="like",
+            name="created",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+            ),
+            preserve_default=False,
+        ),
+        migrations.AlterModelOptions(
+            name="like",
+            options={"ordering": ["-created"]},
+        ),
+        AddIndexOnline(
+            model_name="like",
+            index=models.Index(
+                fields=["image", "-created"],
+                name="images_imag_images__4e604c_idx",
+            ),
+        ),
+        AddIndexOnline(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "-created"],
+                name="images_imag_user_id_bc2906_idx",
+            ),
+        ),
+    ]
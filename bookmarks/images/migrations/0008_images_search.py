@@ -0,0 +1,142 @@
+from django.db import migrations, transaction
+
+
+BATCH_SIZE = 1000
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce({row}description, '')), 'B')
+"""
+
+# Обычная колонка вместо GENERATED ... STORED: её добавление
+# не переписывает таблицу, а значения заполняются пачками
+POSTGRESQL_FORWARD = [
+    "ALTER TABLE images_images ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION images_images_search_vector()
+    RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER images_images_search_vector
+    BEFORE INSERT OR UPDATE OF title, description ON images_images
+    FOR EACH ROW EXECUTE FUNCTION images_images_search_vector()
+    """,
+]
+
+POSTGRESQL_FILL = f"""
+    UPDATE images_images SET search_vector = {SEARCH_VECTOR.format(row="")}
+    WHERE id IN (
+        SELECT id FROM images_images
+        WHERE id > %s
+        ORDER BY id
+        LIMIT %s
+    )
+    RETURNING id
+"""
+
+POSTGRESQL_INDEX = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS images_images_search_vector_idx
+    ON images_images USING GIN (search_vector)
+"""
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX CONCURRENTLY IF EXISTS images_images_search_vector_idx",
+    "DROP TRIGGER IF EXISTS images_images_search_vector ON images_images",
+    "DROP FUNCTION IF EXISTS images_images_search_vector()",
+    "ALTER TABLE images_images DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE images_search USING fts5(
+        title,
+        description,
+        content='images_images',
+        content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER images_search_insert AFTER INSERT ON images_images BEGIN
+        INSERT INTO images_search(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER images_search_delete AFTER DELETE ON images_images BEGIN
+        INSERT INTO images_search(images_search, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER images_search_update
+    AFTER UPDATE OF title, description ON images_images BEGIN
+        INSERT INTO images_search(images_search, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO images_search(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO images_search(images_search) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS images_search_insert",
+    "DROP TRIGGER IF EXISTS images_search_delete",
+    "DROP TRIGGER IF EXISTS images_search_update",
+    "DROP TABLE IF EXISTS images_search",
+]
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        with transaction.atomic():
+            for statement in SQLITE_FORWARD:
+                schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        for statement in POSTGRESQL_FORWARD:
+            schema_editor.execute(statement)
+        # Каждая пачка — своя короткая транзакция, новые строки
+        # уже заполняет триггер
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                with schema_editor.connection.cursor() as cursor:
+                    cursor.execute(POSTGRESQL_FILL, [last_id, BATCH_SIZE])
+                    ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            last_id = max(ids)
+        schema_editor.execute(POSTGRESQL_INDEX)
+
+
+def backwards(apps, schema_editor):
+    statements = {
+        "postgresql": POSTGRESQL_BACKWARD,
+        "sqlite": SQLITE_BACKWARD,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнить внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ("images", "0007_like"),
+    ]
+
+    operations = [
+        # The search index lives outside the model: a tsvector column
+        # kept in sync by a trigger, filled in batches and indexed with
+        # GIN concurrently on PostgreSQL, and an external-content FTS5
+        # table kept in sync by triggers on SQLite.
+        migrations.RunPython(forwards, backwards),
+    ]
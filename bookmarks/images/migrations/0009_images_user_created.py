@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("images", "0008_images_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="images",
+            index=models.Index(
+                fields=["user", "-created"],
+                name="images_imag_user_id_6d2ef0_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="images",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="images_created",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
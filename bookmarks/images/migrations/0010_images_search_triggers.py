@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+# SQLite выполняет AlterField пересозданием images_images, и триггеры
+# FTS5 пропадают вместе со старой таблицей (здесь — после 0009).
+# Каждая следующая миграция, пересоздающая таблицу, должна так же
+# вернуть триггеры через restore_sqlite_triggers
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS images_search_insert
+    AFTER INSERT ON images_images BEGIN
+        INSERT INTO images_search(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_search_delete
+    AFTER DELETE ON images_images BEGIN
+        INSERT INTO images_search(images_search, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_search_update
+    AFTER UPDATE OF title, description ON images_images BEGIN
+        INSERT INTO images_search(images_search, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO images_search(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    # Строки, скопированные при пересоздании таблицы, в индекс
+    # не попали: индекс собирается заново
+    "INSERT INTO images_search(images_search) VALUES ('rebuild')",
+]
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for statement in SQLITE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("images", "0009_images_user_created"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            restore_sqlite_triggers,
+            migrations.RunPython.noop,
+        ),
+    ]
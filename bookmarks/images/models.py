@@ -5,28 +5,79 @@ from django.db import models
 import django.shortcuts
 from django.utils.text import slugify
 
+from images.canonical import url_hash
+
+
+class ImageBlob(models.Model):
+    digest = models.CharField(max_length=64, unique=True)
+    file = models.ImageField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ref_count", "created"]),
+        ]
+
+    def __str__(self) -> str:
+        return self.digest
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"{self.digest!r}, "
+            f"{self.file!r}, "
+            f"{self.size!r}, "
+            f"{self.ref_count!r}, "
+            f"{self.created!r})"
+        )
+
 
 class Images(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="images_created",
         on_delete=models.CASCADE,
+        db_index=False,
     )
     users_like = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
+        through="Like",
         related_name="images_liked",
         blank=True,
     )
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, blank=True)
     url = models.URLField(max_length=2000)
-    image = models.ImageField(upload_to="images/%Y/%m/%d/")
+    url_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    image = models.ImageField(upload_to="images/%Y/%m/%d/", blank=True)
+    blob = models.ForeignKey(
+        ImageBlob,
+        related_name="images",
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+    )
     description = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.READY,
+    )
+    total_likes = models.PositiveIntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["-created"]),
+            models.Index(fields=["-total_likes"]),
+            models.Index(fields=["user", "-created"]),
         ]
         ordering = ["-created"]
 
@@ -43,12 +94,16 @@ class Images(models.Model):
             f"{self.url!r}, "
             f"{self.image!r}, "
             f"{self.description!r}, "
+            f"{self.status!r}, "
+            f"{self.total_likes!r}, "
             f"{self.created!r})"
         )
 
     def save(self, *args: Any, **kwargs: Any) -> None:
         if not self.slug:
             self.slug = slugify(self.title)
+        if self.url:
+            self.url_hash = url_hash(self.url)
         super().save(*args, **kwargs)
 
     def get_absolute_url(self) -> str:
@@ -56,3 +111,88 @@ class Images(models.Model):
             "images:detail",
             args=[self.id, self.slug],
         )
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == self.Status.READY
+
+
+class Like(models.Model):
+    image = models.ForeignKey(
+        Images,
+        related_name="likes",
+        on_delete=models.CASCADE,
+        db_column="images_id",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="likes",
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "images_images_users_like"
+        unique_together = [("image", "user")]
+        indexes = [
+            models.Index(fields=["image", "-created"]),
+            models.Index(fields=["user", "-created"]),
+        ]
+        ordering = ["-created"]
+
+    def __str__(self) -> str:
+        return f"{self.user} likes {self.image}"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"{self.image_id!r}, "
+            f"{self.user_id!r}, "
+            f"{self.created!r})"
+        )
+
+
+class IngestJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    image = models.OneToOneField(
+        Images,
+        related_name="ingest_job",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Неудачная задача не берётся в работу раньше этого времени
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created"]),
+        ]
+        ordering = ["created"]
+
+    def __str__(self) -> str:
+        return f"Ingest of {self.image_id} ({self.status})"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"{self.image_id!r}, "
+            f"{self.status!r}, "
+            f"{self.attempts!r}, "
+            f"{self.next_attempt_at!r}, "
+            f"{self.error!r}, "
+            f"{self.created!r}, "
+            f"{self.updated!r})"
+        )
@@ -0,0 +1,140 @@
+import base64
+import binascii
+from collections.abc import Sequence
+import datetime
+import json
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o: Any) -> Any:
+        # DjangoJSONEncoder обрезает время до миллисекунд,
+        # а курсору нужно точное значение для сравнения
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_values(values: Sequence[Any]) -> str:
+    data = json.dumps(list(values), cls=CursorEncoder).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_values(cursor: str) -> list[Any]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+
+    return values
+
+
+class CursorPage(Sequence):
+    def __init__(
+        self,
+        object_list: list[Any],
+        next_cursor: str | None,
+    ) -> None:
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        return self.object_list[index]
+
+    def __repr__(self) -> str:
+        return f"<CursorPage of {len(self)} item(s)>"
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинация: следующая страница выбирается по значениям полей
+    сортировки последней записи, а не через OFFSET, и без COUNT(*).
+    Последнее поле сортировки должно быть уникальным (обычно id)
+    """
+
+    def __init__(
+        self,
+        queryset: models.QuerySet,
+        per_page: int,
+        ordering: Sequence[str] = ("-created", "-id"),
+    ) -> None:
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip("-"))
+            for name in ordering
+        ]
+
+    def encode_cursor(self, obj: models.Model) -> str:
+        return encode_values(
+            [getattr(obj, field.attname) for field in self.fields],
+        )
+
+    def decode_cursor(self, cursor: str) -> list[Any]:
+        try:
+            values = [
+                field.to_python(value)
+                for field, value in zip(
+                    self.fields,
+                    decode_values(cursor),
+                    strict=True,
+                )
+            ]
+        except (TypeError, ValueError, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+
+        if any(value is None for value in values):
+            raise InvalidCursor(cursor)
+
+        return values
+
+    def _after(self, values: list[Any]) -> Q:
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            lookup = "lt" if name.startswith("-") else "gt"
+            term = Q(**{f"{name.lstrip('-')}__{lookup}": values[position]})
+            for previous, value in zip(self.ordering[:position], values):
+                term &= Q(**{previous.lstrip("-"): value})
+            condition |= term
+
+        return condition
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        queryset = self.queryset
+        if cursor:
+            values = self.decode_cursor(cursor)
+            first = self.ordering[0]
+            bound = "lte" if first.startswith("-") else "gte"
+            # Нестрогая граница по первому полю даёт планировщику
+            # диапазон по индексу, точное условие уточняет его.
+            queryset = queryset.filter(
+                **{f"{first.lstrip('-')}__{bound}": values[0]},
+            ).filter(self._after(values))
+
+        object_list = list(queryset[: self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[: self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+
+        return CursorPage(object_list, next_cursor)
@@ -0,0 +1,169 @@
+import abc
+from typing import Any
+
+from django.db import connection
+from django.db.models import Q
+
+from images.models import Images
+from images.pagination import (
+    CursorPage,
+    decode_values,
+    encode_values,
+    InvalidCursor,
+)
+
+
+class SearchBackend(abc.ABC):
+    """
+    Поиск по названию и описанию с ранжированием.
+    Запрос возвращает пары (id, rank) по убыванию rank, id, чтобы
+    по ним работала keyset-пагинация
+    """
+
+    @abc.abstractmethod
+    def ranked_ids(
+        self,
+        query: str,
+        after: list[Any] | None,
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        pass
+
+    def _keyset(self, after: list[Any] | None) -> tuple[str, list[Any]]:
+        if after is None:
+            return "", []
+
+        rank, image_id = after
+        return (
+            "WHERE score < %s OR (score = %s AND id < %s)",
+            [rank, rank, image_id],
+        )
+
+    def _fetch(self, sql: str, params: list[Any]) -> list[tuple[int, float]]:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(row[0], float(row[1])) for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    def ranked_ids(
+        self,
+        query: str,
+        after: list[Any] | None,
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        keyset, params = self._keyset(after)
+        return self._fetch(
+            f"""
+            SELECT id, score FROM (
+                SELECT id, ts_rank_cd(search_vector, query) AS score
+                FROM images_images,
+                     websearch_to_tsquery('english', %s) AS query
+                WHERE search_vector @@ query AND status = %s
+            ) AS found
+            {keyset}
+            ORDER BY score DESC, id DESC
+            LIMIT %s
+            """,
+            [query, Images.Status.READY, *params, limit],
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    @staticmethod
+    def match_expression(query: str) -> str:
+        # Каждое слово — отдельная фраза в кавычках, чтобы символы
+        # синтаксиса FTS5 из пользовательского ввода не ломали запрос
+        words = query.replace('"', " ").split()
+        return " ".join(f'"{word}"' for word in words)
+
+    def ranked_ids(
+        self,
+        query: str,
+        after: list[Any] | None,
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        match = self.match_expression(query)
+        if not match:
+            return []
+
+        keyset, params = self._keyset(after)
+        return self._fetch(
+            f"""
+            SELECT id, score FROM (
+                SELECT images_images.id AS id,
+                       -bm25(images_search, 10.0, 5.0) AS score
+                FROM images_search
+                JOIN images_images ON images_images.id = images_search.rowid
+                WHERE images_search MATCH %s AND images_images.status = %s
+            )
+            {keyset}
+            ORDER BY score DESC, id DESC
+            LIMIT %s
+            """,
+            [match, Images.Status.READY, *params, limit],
+        )
+
+
+class FallbackSearchBackend(SearchBackend):
+    """
+    Для прочих СУБД: icontains без ранжирования, rank всегда 0
+    """
+
+    def ranked_ids(
+        self,
+        query: str,
+        after: list[Any] | None,
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        queryset = Images.objects.filter(status=Images.Status.READY)
+        for word in query.split():
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(description__icontains=word),
+            )
+        if after is not None:
+            queryset = queryset.filter(id__lt=after[1])
+
+        ids = queryset.order_by("-id").values_list("id", flat=True)[:limit]
+        return [(image_id, 0.0) for image_id in ids]
+
+
+BACKENDS = {
+    "postgresql": PostgreSQLSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_backend() -> SearchBackend:
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
+
+
+def search_images(
+    query: str,
+    per_page: int,
+    cursor: str | None = None,
+) -> CursorPage:
+    """
+    Найти готовые изображения по названию и описанию.
+    Страница упорядочена по релевантности, курсор хранит (rank, id)
+    """
+    after = None
+    if cursor:
+        after = decode_values(cursor)
+        if len(after) != 2 or not all(
+            isinstance(value, (int, float)) for value in after
+        ):
+            raise InvalidCursor(cursor)
+
+    ranked = get_backend().ranked_ids(query.strip(), after, per_page + 1)
+    next_cursor = None
+    if len(ranked) > per_page:
+        ranked = ranked[:per_page]
+        image_id, rank = ranked[-1]
+        next_cursor = encode_values([rank, image_id])
+
+    found = Images.objects.in_bulk([image_id for image_id, _ in ranked])
+    return CursorPage(
+        [found[image_id] for image_id, _ in ranked if image_id in found],
+        next_cursor,
+    )
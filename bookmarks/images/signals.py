@@ -0,0 +1,39 @@
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+import images.cards
+from images.models import Images
+import images.storage
+from images.thumbnails import thumbnail_index
+
+
+@receiver(post_delete, sender=Images)
+def release_image_blob(sender: type, instance: Images, **kwargs: Any) -> None:
+    if instance.blob_id:
+        images.storage.release_blob(instance.blob_id)
+
+
+@receiver(post_save, sender=Images)
+@receiver(post_delete, sender=Images)
+def invalidate_rendered(
+    sender: type,
+    instance: Images,
+    **kwargs: Any,
+) -> None:
+    thumbnail_index.invalidate(instance.id, instance.image.name)
+    images.cards.invalidate(instance.id)
+
+
+@receiver(post_save, sender=Images)
+def invalidate_list(
+    sender: type,
+    instance: Images,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    # Ingest помечает изображения готовыми через update без сигналов
+    # и сбрасывает ленту сам
+    if created and instance.is_ready:
+        images.cards.invalidate_list()
@@ -0,0 +1,123 @@
+import mimetypes
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from easy_thumbnails.files import get_thumbnailer
+
+from images.models import ImageBlob, Images
+
+
+BLOBS_DIR = "blobs"
+
+
+def blob_path(digest: str, extension: str) -> str:
+    return f"{BLOBS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+def guess_extension(content_type: str, url: str) -> str:
+    extension = mimetypes.guess_extension(content_type or "")
+    if extension:
+        return extension.lstrip(".")
+
+    return url.rsplit(".", 1)[1].lower()
+
+
+def write_blob_file(content: File, digest: str, extension: str) -> str:
+    """
+    Записать содержимое по адресу, вычисленному из хеша.
+    Если файл уже есть в хранилище, повторно он не пишется
+    """
+    name = blob_path(digest, extension)
+    if default_storage.exists(name):
+        return name
+
+    return default_storage.save(name, content)
+
+
+def get_or_create_blob(digest: str, name: str, size: int) -> ImageBlob:
+    """
+    Строка blob для записанного файла. Вызывается в транзакции:
+    найденная строка блокируется до её конца, чтобы gc_image_blobs
+    не удалил blob раньше, чем attach_blob добавит ссылку
+    """
+    blob = ImageBlob.objects.select_for_update().filter(digest=digest).first()
+    if blob is None:
+        # Файл мог удалить gc_image_blobs вместе со старой строкой
+        # после того, как write_blob_file счёл его записанным
+        if not default_storage.exists(name):
+            raise FileNotFoundError(name)
+        try:
+            with transaction.atomic():
+                blob = ImageBlob.objects.create(
+                    digest=digest,
+                    file=name,
+                    size=size,
+                )
+        except IntegrityError:
+            blob = ImageBlob.objects.select_for_update().get(digest=digest)
+
+    if blob.file.name != name:
+        default_storage.delete(name)
+
+    return blob
+
+
+def attach_blob(image: Images, blob: ImageBlob) -> None:
+    """
+    Привязать blob к изображению. Повторная привязка того же blob
+    ничего не меняет, прежний blob изображения освобождается
+    """
+    with transaction.atomic():
+        current = list(
+            Images.objects.select_for_update()
+            .filter(id=image.id)
+            .values_list("blob_id", flat=True),
+        )
+        if current and current[0] != blob.id:
+            ImageBlob.objects.filter(id=blob.id).update(
+                ref_count=F("ref_count") + 1,
+            )
+            if current[0] is not None:
+                release_blob(current[0])
+            Images.objects.filter(id=image.id).update(
+                blob=blob,
+                image=blob.file.name,
+            )
+
+    image.blob = blob
+    image.image.name = blob.file.name
+
+
+def release_blob(blob_id: int) -> None:
+    ImageBlob.objects.filter(id=blob_id, ref_count__gt=0).update(
+        ref_count=F("ref_count") - 1,
+    )
+
+
+def delete_blob(blob: ImageBlob) -> None:
+    get_thumbnailer(blob.file).delete_thumbnails()
+    default_storage.delete(blob.file.name)
+    blob.delete()
+
+
+def collect_blob(blob_id: int) -> bool:
+    """
+    Удалить blob, если на него по-прежнему нет ссылок. Строка
+    заблокирована на время проверки и удаления, поэтому параллельные
+    get_or_create_blob и attach_blob дожидаются результата
+    """
+    with transaction.atomic():
+        blob = (
+            ImageBlob.objects.select_for_update()
+            .filter(id=blob_id, ref_count=0)
+            .exclude(Exists(Images.objects.filter(blob=OuterRef("pk"))))
+            .first()
+        )
+        if blob is None:
+            return False
+
+        delete_blob(blob)
+
+    return True
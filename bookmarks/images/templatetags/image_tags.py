@@ -0,0 +1,46 @@
+from collections.abc import Iterable
+from typing import Any
+
+from django import template
+from django.utils.safestring import mark_safe, SafeString
+
+from images.cards import render_cards
+from images.likes import liked_by
+from images.models import Images
+from images.thumbnails import thumbnail_url
+
+
+register = template.Library()
+
+
+@register.filter
+def image_thumbnail(image: Images, alias: str) -> str:
+    """
+    URL миниатюры изображения по алиасу из THUMBNAIL_ALIASES.
+    Берётся из индекса миниатюр без обращения к хранилищу
+    """
+    return thumbnail_url(image, alias)
+
+
+@register.simple_tag
+def image_cards(images: Iterable[Images]) -> SafeString:
+    """
+    Карточки изображений из кеша фрагментов
+    """
+    return mark_safe(render_cards(images))
+
+
+@register.simple_tag(takes_context=True)
+def has_liked(context: dict[str, Any], image: Images) -> bool:
+    return image.id in liked_by(context["request"])
+
+
+@register.simple_tag(takes_context=True)
+def liked_images(
+    context: dict[str, Any],
+    images: Iterable[Images],
+) -> set[int]:
+    """
+    id лайкнутых изображений из списка, одним запросом
+    """
+    return liked_by(context["request"]).filter(image.id for image in images)
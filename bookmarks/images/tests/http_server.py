@@ -0,0 +1,116 @@
+from collections.abc import Iterator
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import threading
+
+from PIL import Image
+
+
+def make_png(size: tuple[int, int] = (8, 8)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class Route:
+    def __init__(
+        self,
+        body: bytes = b"",
+        status: int = 200,
+        content_type: str = "image/png",
+        headers: dict[str, str] | None = None,
+        fail_first: int = 0,
+    ) -> None:
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.fail_first = fail_first
+        self.hits = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def send_empty(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def is_not_modified(self, route: Route) -> bool:
+        etag = route.headers.get("ETag")
+        last_modified = route.headers.get("Last-Modified")
+        return bool(
+            (etag and self.headers.get("If-None-Match") == etag)
+            or (
+                last_modified
+                and self.headers.get("If-Modified-Since") == last_modified
+            ),
+        )
+
+    def do_GET(self) -> None:  # noqa: N802
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self.send_empty(404)
+            return
+
+        route.hits += 1
+        if route.hits <= route.fail_first:
+            self.send_empty(503)
+            return
+
+        if self.is_not_modified(route):
+            self.send_empty(304)
+            return
+
+        self.send_response(route.status)
+        self.send_header("Content-Type", route.content_type)
+        for name, value in route.headers.items():
+            self.send_header(name, value)
+
+        body = route.body() if callable(route.body) else route.body
+        if isinstance(body, bytes):
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in body:
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def serve(routes: dict[str, Route]) -> Iterator[_Server]:
+    """
+    Локальная замена удалённого хоста с изображениями для тестов
+    и бенчмарков
+    """
+    server = _Server(("127.0.0.1", 0), _Handler)
+    server.routes = routes
+    server.connections = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
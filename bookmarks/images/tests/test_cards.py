@@ -0,0 +1,180 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+import django.shortcuts
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+import images.cards
+from images.likes import like_image
+from images.models import Images
+import images.thumbnails
+
+
+class TestImageCards(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        self.images = [
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            for i in range(10)
+        ]
+
+    def test_cached_cards_are_not_rendered_again(self):
+        first = images.cards.render_cards(self.images)
+
+        with mock.patch.object(
+            images.cards,
+            "render_to_string",
+            side_effect=AssertionError("template rendered"),
+        ):
+            second = images.cards.render_cards(self.images)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.count('class="image"'), 10)
+
+    def test_save_invalidates_only_changed_card(self):
+        images.cards.render_cards(self.images)
+        image = self.images[0]
+        image.title = "Renamed"
+        image.save()
+
+        with mock.patch.object(
+            images.cards,
+            "render_to_string",
+            wraps=images.cards.render_to_string,
+        ) as render:
+            html = images.cards.render_cards(self.images)
+
+        self.assertIn("Renamed", html)
+        self.assertEqual(render.call_count, 1)
+
+    def test_lost_version_does_not_resurrect_old_card(self):
+        image = self.images[0]
+        images.cards.render_cards([image])
+        Images.objects.filter(id=image.id).update(title="Changed")
+        image.refresh_from_db()
+        cache.delete(images.cards.VERSION_KEY.format(image.id))
+
+        self.assertIn("Changed", images.cards.render_cards([image]))
+
+    def test_card_with_failed_thumbnail_is_not_cached(self):
+        image = self.images[0]
+        image.image.name = "images/2026/10/18/missing.png"
+        with mock.patch.object(
+            images.thumbnails,
+            "get_thumbnailer",
+            side_effect=OSError("broken file"),
+        ):
+            self.assertIn('src=""', images.cards.render_cards([image]))
+
+        with mock.patch.object(
+            images.cards,
+            "thumbnail_url",
+            return_value="/media/thumb.png",
+        ):
+            html = images.cards.render_cards([image])
+
+        self.assertIn('src="/media/thumb.png"', html)
+
+
+class TestImageListFragmentCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        self.client.login(username="testuser", password="testpass")
+        for i in range(20):
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+        self.url = django.shortcuts.reverse("images:list")
+        self.cursor = self.client.get(self.url).context["images"].next_cursor
+
+    def get_fragment(self):
+        return self.client.get(
+            self.url,
+            {"images_only": 1, "cursor": self.cursor},
+        )
+
+    def test_warm_fragment_skips_database_templates_and_thumbnails(self):
+        first = self.get_fragment()
+
+        with (
+            CaptureQueriesContext(connection) as queries,
+            mock.patch.object(
+                images.cards,
+                "render_to_string",
+                side_effect=AssertionError("template rendered"),
+            ),
+            mock.patch.object(
+                images.thumbnails.thumbnail_index,
+                "get",
+                side_effect=AssertionError("thumbnail lookup"),
+            ),
+        ):
+            second = self.get_fragment()
+
+        self.assertEqual(second.status_code, HTTPStatus.OK)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(
+            first.get("X-Next-Cursor"),
+            second.get("X-Next-Cursor"),
+        )
+        # Остаётся только проверка лайков текущего пользователя
+        self.assertNotIn(
+            f'"{Images._meta.db_table}"',
+            " ".join(query["sql"] for query in queries),
+        )
+
+    def test_fragment_marks_liked_images(self):
+        image = Images.objects.order_by("-created", "-id")[8]
+        like_image(image.id, self.user)
+
+        for _ in range(2):
+            response = self.get_fragment()
+            self.assertContains(
+                response,
+                f'class="liked-images" data-ids="{image.id}"',
+            )
+
+    def test_edited_image_rebuilds_fragment(self):
+        self.get_fragment()
+        image = Images.objects.order_by("-created", "-id")[8]
+        image.title = "Renamed"
+        image.save()
+
+        self.assertContains(self.get_fragment(), "Renamed")
+
+    def test_image_becoming_ready_rebuilds_fragment(self):
+        self.get_fragment()
+        image = Images.objects.order_by("-created", "-id")[8]
+        pending = Images.objects.create(
+            user=self.user,
+            title="Pending",
+            url="https://example.com/pending.png",
+            status=Images.Status.PENDING,
+        )
+        # Новое изображение попадает на страницу курсора, как только
+        # становится готовым
+        Images.objects.filter(id=pending.id).update(
+            created=image.created,
+            status=Images.Status.READY,
+        )
+        images.cards.invalidate_list()
+
+        self.assertContains(self.get_fragment(), "Pending")
@@ -0,0 +1,200 @@
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.test import override_settings, SimpleTestCase
+
+from images.fetch import fetch_image, get_fetcher, ImageFetchError
+from images.storage import write_blob_file
+from images.tests.http_server import make_png, Route, serve
+
+
+CHUNK = b"\xff" * 64 * 1024
+
+
+def stream_body(size):
+    def body():
+        for _ in range(size // len(CHUNK)):
+            yield CHUNK
+
+    return body
+
+
+def peak_memory_of_fetch(url):
+    tracemalloc.start()
+    try:
+        with fetch_image(url) as fetched:
+            size = fetched.size
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return size, peak
+
+
+class TestFetchImage(SimpleTestCase):
+    def test_fetch_image_into_temporary_file(self):
+        body = make_png()
+        with serve({"/image.png": Route(body)}) as server:
+            with fetch_image(f"{server.url}/image.png") as fetched:
+                self.assertEqual(fetched.read(), body)
+                self.assertEqual(fetched.content_type, "image/png")
+
+    @override_settings(IMAGES_FETCH_MAX_SIZE=64 * 1024 * 1024)
+    def test_peak_memory_does_not_depend_on_image_size(self):
+        small = 1024 * 1024
+        large = 32 * 1024 * 1024
+        routes = {
+            "/small.png": Route(stream_body(small)),
+            "/large.png": Route(stream_body(large)),
+        }
+        with serve(routes) as server:
+            small_size, small_peak = peak_memory_of_fetch(
+                f"{server.url}/small.png",
+            )
+            large_size, large_peak = peak_memory_of_fetch(
+                f"{server.url}/large.png",
+            )
+
+        self.assertEqual(small_size, small)
+        self.assertEqual(large_size, large)
+        self.assertLess(large_peak, 2 * 1024 * 1024)
+        self.assertLess(large_peak, small_peak + 512 * 1024)
+
+    @override_settings(IMAGES_FETCH_MAX_SIZE=1024)
+    def test_content_length_over_limit(self):
+        with serve({"/image.png": Route(b"\xff" * 2048)}) as server:
+            with self.assertRaisesMessage(ImageFetchError, "limit is 1024"):
+                fetch_image(f"{server.url}/image.png")
+
+    @override_settings(IMAGES_FETCH_MAX_SIZE=1024 * 1024)
+    def test_streamed_body_over_limit_is_aborted(self):
+        routes = {"/image.png": Route(stream_body(8 * 1024 * 1024))}
+        with serve(routes) as server:
+            with self.assertRaisesMessage(ImageFetchError, "exceeds"):
+                fetch_image(f"{server.url}/image.png")
+
+    def test_non_image_content_type(self):
+        routes = {"/image.png": Route(b"<html>", content_type="text/html")}
+        with serve(routes) as server:
+            with self.assertRaisesMessage(ImageFetchError, "not an image"):
+                fetch_image(f"{server.url}/image.png")
+
+        self.assertEqual(routes["/image.png"].hits, 1)
+
+    def test_http_error(self):
+        with serve({}) as server:
+            with self.assertRaisesMessage(ImageFetchError, "HTTP 404"):
+                fetch_image(f"{server.url}/missing.png")
+
+    def test_read_timeout(self):
+        def slow_body():
+            yield CHUNK
+            time.sleep(1)
+            yield CHUNK
+
+        with serve({"/image.png": Route(slow_body)}) as server:
+            with self.assertRaises(ImageFetchError):
+                fetch_image(f"{server.url}/image.png", timeout=(1, 0.2))
+
+
+@override_settings(
+    IMAGES_FETCH_BACKOFF=0,
+    IMAGES_FETCH_CACHE_DIR=tempfile.mkdtemp(),
+    MEDIA_ROOT=tempfile.mkdtemp(),
+)
+class TestFetcher(SimpleTestCase):
+    def test_fetcher_is_shared(self):
+        self.assertIs(get_fetcher(), get_fetcher())
+
+    def test_connections_are_reused(self):
+        routes = {f"/{i}.png": Route(make_png()) for i in range(5)}
+        with serve(routes) as server:
+            for path in routes:
+                with fetch_image(f"{server.url}{path}"):
+                    pass
+
+        self.assertEqual(server.connections, 1)
+
+    def test_retry_on_server_error(self):
+        route = Route(make_png(), fail_first=2)
+        with serve({"/image.png": route}) as server:
+            with fetch_image(f"{server.url}/image.png") as fetched:
+                self.assertEqual(fetched.read(), make_png())
+
+        self.assertEqual(route.hits, 3)
+
+    @override_settings(IMAGES_FETCH_RETRIES=1)
+    def test_retries_exhausted(self):
+        route = Route(make_png(), fail_first=5)
+        with serve({"/image.png": route}) as server:
+            with self.assertRaisesMessage(ImageFetchError, "HTTP 503"):
+                fetch_image(f"{server.url}/image.png")
+
+        self.assertEqual(route.hits, 2)
+
+    def test_etag_revalidation_returns_stored_blob(self):
+        route = Route(make_png(), headers={"ETag": '"v1"'})
+        with serve({"/etag.png": route}) as server:
+            with fetch_image(f"{server.url}/etag.png") as first:
+                first_digest = first.digest
+                write_blob_file(first, first.digest, "png")
+            route.body = b""
+            with fetch_image(f"{server.url}/etag.png") as second:
+                self.assertEqual(second.read(), make_png())
+                self.assertEqual(second.digest, first_digest)
+                self.assertEqual(second.content_type, "image/png")
+
+        self.assertEqual(route.hits, 2)
+
+    def test_missing_blob_is_fetched_unconditionally(self):
+        route = Route(make_png(), headers={"ETag": '"v1"'})
+        with serve({"/gone.png": route}) as server:
+            with fetch_image(f"{server.url}/gone.png") as first:
+                name = write_blob_file(first, first.digest, "png")
+            default_storage.delete(name)
+            with fetch_image(f"{server.url}/gone.png") as second:
+                self.assertEqual(second.read(), make_png())
+
+        self.assertEqual(route.hits, 2)
+
+    def test_not_modified_without_stored_blob_refetches(self):
+        route = Route(make_png(), headers={"ETag": '"v1"'})
+        with serve({"/race.png": route}) as server:
+            url = f"{server.url}/race.png"
+            with fetch_image(url) as first:
+                name = write_blob_file(first, first.digest, "png")
+            fetcher = get_fetcher()
+            validators = fetcher.cache.validators(url)
+            default_storage.delete(name)
+            with mock.patch.object(
+                fetcher.cache,
+                "validators",
+                return_value=validators,
+            ):
+                with fetch_image(url) as second:
+                    self.assertEqual(second.read(), make_png())
+
+        self.assertEqual(route.hits, 3)
+
+    def test_last_modified_revalidation(self):
+        route = Route(
+            make_png(),
+            headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        )
+        with serve({"/lm.png": route}) as server:
+            for _ in range(2):
+                with fetch_image(f"{server.url}/lm.png") as fetched:
+                    self.assertEqual(fetched.read(), make_png())
+
+    def test_changed_resource_is_downloaded_again(self):
+        route = Route(make_png(), headers={"ETag": '"v1"'})
+        with serve({"/changed.png": route}) as server:
+            with fetch_image(f"{server.url}/changed.png"):
+                pass
+            route.body = make_png(size=(4, 4))
+            route.headers = {"ETag": '"v2"'}
+            with fetch_image(f"{server.url}/changed.png") as fetched:
+                self.assertEqual(fetched.read(), make_png(size=(4, 4)))
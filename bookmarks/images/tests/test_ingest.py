@@ -0,0 +1,475 @@
+import io
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import (
+    override_settings,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+)
+from django.utils import timezone
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+
+from bookmarks import metrics
+from images.canonical import canonicalize_url, url_hash
+import images.cards
+import images.forms
+import images.ingest
+from images.models import ImageBlob, Images, IngestJob
+import images.storage
+from images.tests.http_server import make_png, Route, serve
+
+
+def thumbnail_exists(fieldfile, alias):
+    options = aliases.get(alias, target=fieldfile)
+    thumbnailer = get_thumbnailer(fieldfile)
+    return thumbnailer.get_existing_thumbnail(options) is not None
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestIngestQueue(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="password",
+        )
+
+    def create_image(self, url, title="Test Image"):
+        form = images.forms.ImagesCreateForm(
+            data={"title": title, "url": url},
+        )
+        self.assertTrue(form.is_valid())
+        form.instance.user = self.user
+        return form.save()
+
+    def test_form_save_creates_pending_image_without_download(self):
+        image = self.create_image("http://127.0.0.1:1/image.png")
+
+        self.assertEqual(image.status, Images.Status.PENDING)
+        self.assertFalse(image.image)
+        self.assertEqual(image.ingest_job.status, IngestJob.Status.PENDING)
+
+    def test_run_pending_downloads_images_in_thread_pool(self):
+        routes = {f"/{i}.png": Route(make_png()) for i in range(5)}
+        with serve(routes) as server:
+            for i in range(5):
+                self.create_image(f"{server.url}/{i}.png", title=f"Image {i}")
+            list_version = images.cards.get_list_version()
+
+            processed = images.ingest.run_pending(workers=3)
+
+        self.assertEqual(processed, 5)
+        self.assertNotEqual(images.cards.get_list_version(), list_version)
+        self.assertEqual(
+            Images.objects.filter(status=Images.Status.READY).count(),
+            5,
+        )
+        self.assertEqual(
+            IngestJob.objects.filter(status=IngestJob.Status.DONE).count(),
+            5,
+        )
+        for image in Images.objects.all():
+            self.assertTrue(image.image.name.endswith(".png"))
+            self.assertTrue(image.image.storage.exists(image.image.name))
+            self.assertTrue(thumbnail_exists(image.image, "list"))
+            self.assertTrue(thumbnail_exists(image.image, "detail"))
+
+    def test_new_bookmark_counts_one_dedup_miss(self):
+        cache.clear()
+        self.create_image("http://127.0.0.1:1/image.png")
+        images.ingest.run_pending(workers=1)
+
+        self.assertEqual(
+            metrics.get("url_dedup_hits", "url_dedup_misses"),
+            {"url_dedup_hits": 0, "url_dedup_misses": 1},
+        )
+
+    @override_settings(IMAGES_INGEST_MAX_ATTEMPTS=2)
+    def test_failed_download_is_retried_then_marked_failed(self):
+        with serve({}) as server:
+            image = self.create_image(f"{server.url}/missing.png")
+
+            images.ingest.run_pending(workers=1)
+            job = IngestJob.objects.get(image=image)
+            self.assertEqual(job.status, IngestJob.Status.PENDING)
+            self.assertEqual(job.attempts, 1)
+            self.assertGreater(job.next_attempt_at, timezone.now())
+
+            # До истечения задержки задача не берётся повторно
+            self.assertEqual(images.ingest.run_pending(workers=1), 0)
+
+            IngestJob.objects.filter(id=job.id).update(
+                next_attempt_at=timezone.now(),
+            )
+            images.ingest.run_pending(workers=1)
+
+        job.refresh_from_db()
+        image.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("404", job.error)
+        self.assertEqual(image.status, Images.Status.FAILED)
+
+    @override_settings(IMAGES_INGEST_RETRY_BACKOFF=10)
+    def test_retry_delay_doubles_with_each_attempt(self):
+        self.assertEqual(
+            [images.ingest.retry_delay(n).total_seconds() for n in (1, 2, 3)],
+            [10, 20, 40],
+        )
+
+    def test_same_url_in_one_batch_is_downloaded_once(self):
+        route = Route(make_png())
+        with serve({"/image.png": route}) as server:
+            for i in range(3):
+                self.create_image(f"{server.url}/image.png", title=f"Copy {i}")
+
+            images.ingest.run_pending(workers=3)
+
+        self.assertEqual(route.hits, 1)
+        self.assertEqual(
+            Images.objects.filter(status=Images.Status.READY).count(),
+            3,
+        )
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        self.create_image("http://127.0.0.1:1/image.png")
+
+        self.assertEqual(len(images.ingest.claim_jobs(10)), 1)
+        self.assertEqual(images.ingest.claim_jobs(10), [])
+
+    def test_requeue_stale_running_jobs(self):
+        self.create_image("http://127.0.0.1:1/image.png")
+        images.ingest.claim_jobs(10)
+
+        self.assertEqual(images.ingest.requeue_stale(stale_after=-1), 1)
+        self.assertEqual(
+            IngestJob.objects.get().status,
+            IngestJob.Status.PENDING,
+        )
+
+    def test_ingest_images_command_once(self):
+        with serve({"/image.png": Route(make_png())}) as server:
+            image = self.create_image(f"{server.url}/image.png")
+            call_command(
+                "ingest_images",
+                "--once",
+                "--workers=2",
+                stdout=io.StringIO(),
+            )
+
+        image.refresh_from_db()
+        self.assertEqual(image.status, Images.Status.READY)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestContentAddressedStorage(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="password",
+        )
+
+    def ingest(self, urls):
+        for i, url in enumerate(urls):
+            form = images.forms.ImagesCreateForm(
+                data={"title": f"Image {i}", "url": url},
+            )
+            self.assertTrue(form.is_valid())
+            form.instance.user = self.user
+            form.save()
+
+        images.ingest.run_pending(workers=2)
+
+    def test_identical_bytes_are_stored_once(self):
+        routes = {
+            "/a.png": Route(make_png()),
+            "/b.png": Route(make_png()),
+            "/c.png": Route(make_png(size=(16, 16))),
+        }
+        with serve(routes) as server:
+            self.ingest([f"{server.url}{path}" for path in routes])
+
+        self.assertEqual(ImageBlob.objects.count(), 2)
+        first = Images.objects.get(url__endswith="/a.png")
+        second = Images.objects.get(url__endswith="/b.png")
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith("blobs/"))
+        self.assertEqual(first.blob.ref_count, 2)
+        self.assertEqual(first.blob.size, len(make_png()))
+
+    def test_deleting_images_releases_blob_and_gc_removes_it(self):
+        routes = {"/a.png": Route(make_png()), "/b.png": Route(make_png())}
+        with serve(routes) as server:
+            self.ingest([f"{server.url}{path}" for path in routes])
+
+        blob = ImageBlob.objects.get()
+        storage = blob.file.storage
+        self.assertTrue(storage.exists(blob.file.name))
+
+        Images.objects.first().delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        call_command("gc_image_blobs", "--min-age=-1", stdout=io.StringIO())
+        self.assertTrue(ImageBlob.objects.filter(id=blob.id).exists())
+
+        Images.objects.get().delete()
+        call_command("gc_image_blobs", "--min-age=-1", stdout=io.StringIO())
+
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(storage.exists(blob.file.name))
+
+    def test_repeated_attach_adds_one_reference(self):
+        routes = {"/a.png": Route(make_png())}
+        with serve(routes) as server:
+            self.ingest([f"{server.url}/a.png"])
+
+        image = Images.objects.get()
+        blob = image.blob
+        images.storage.attach_blob(image, blob)
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        image.delete()
+        call_command("gc_image_blobs", "--min-age=-1", stdout=io.StringIO())
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_attach_releases_previous_blob(self):
+        routes = {"/a.png": Route(make_png())}
+        with serve(routes) as server:
+            self.ingest([f"{server.url}/a.png"])
+
+        image = Images.objects.get()
+        previous = image.blob
+        blob = ImageBlob.objects.create(
+            digest="0" * 64,
+            file="blobs/00/00/other.png",
+            size=1,
+        )
+        images.storage.attach_blob(image, blob)
+
+        previous.refresh_from_db()
+        blob.refresh_from_db()
+        self.assertEqual(previous.ref_count, 0)
+        self.assertEqual(blob.ref_count, 1)
+        self.assertEqual(Images.objects.get().blob, blob)
+
+    def test_collect_rechecks_references(self):
+        blob = ImageBlob.objects.create(
+            digest="0" * 64,
+            file="blobs/00/00/other.png",
+            size=1,
+            ref_count=1,
+        )
+
+        self.assertFalse(images.storage.collect_blob(blob.id))
+        self.assertTrue(ImageBlob.objects.filter(id=blob.id).exists())
+
+    def test_blob_file_removed_by_gc_is_not_registered(self):
+        with self.assertRaises(FileNotFoundError):
+            images.storage.get_or_create_blob(
+                "0" * 64,
+                "blobs/00/00/missing.png",
+                1,
+            )
+
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_gc_removes_orphaned_blob_files(self):
+        routes = {"/a.png": Route(make_png())}
+        with serve(routes) as server:
+            self.ingest([f"{server.url}/a.png"])
+
+        blob = ImageBlob.objects.get()
+        orphan = blob.file.storage.save(
+            "blobs/00/00/orphan.png",
+            ContentFile(b"orphan"),
+        )
+
+        call_command(
+            "gc_image_blobs",
+            "--orphans",
+            "--min-age=-1",
+            stdout=io.StringIO(),
+        )
+
+        self.assertFalse(blob.file.storage.exists(orphan))
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+
+
+class TestCanonicalUrl(SimpleTestCase):
+    def test_equivalent_urls_have_same_hash(self):
+        self.assertEqual(
+            url_hash("HTTPS://Example.COM:443/a/b.png?y=2&x=1#top"),
+            url_hash("https://example.com/a/b.png?x=1&y=2&utm_source=feed"),
+        )
+
+    def test_canonicalize_url(self):
+        self.assertEqual(
+            canonicalize_url("HTTP://Example.com:8080/a%20b.png?b=1&a=2"),
+            "http://example.com:8080/a%20b.png?a=2&b=1",
+        )
+
+    def test_different_urls_have_different_hash(self):
+        self.assertNotEqual(
+            url_hash("https://example.com/a.png"),
+            url_hash("https://example.com/b.png"),
+        )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestUrlDedup(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="password",
+        )
+        self.existing = Images.objects.create(
+            user=self.user,
+            title="Existing",
+            url="https://example.com/image.png",
+            image=ContentFile(b"content", name="image.png"),
+        )
+
+    def create_image(self, url):
+        form = images.forms.ImagesCreateForm(
+            data={"title": "New", "url": url},
+        )
+        self.assertTrue(form.is_valid())
+        form.instance.user = self.user
+        return form.save()
+
+    def test_bookmark_of_ingested_url_reuses_stored_file(self):
+        image = self.create_image("https://EXAMPLE.com:443/image.png")
+
+        self.assertEqual(image.status, Images.Status.READY)
+        self.assertEqual(image.image.name, self.existing.image.name)
+        self.assertFalse(IngestJob.objects.filter(image=image).exists())
+        image.refresh_from_db()
+        self.assertEqual(image.image.name, self.existing.image.name)
+
+        stats = metrics.hit_rate("url_dedup_hits", "url_dedup_misses")
+        self.assertEqual(stats["url_dedup_hits"], 1)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_bookmark_of_new_url_is_queued(self):
+        image = self.create_image("https://example.com/other.png")
+
+        self.assertEqual(image.status, Images.Status.PENDING)
+        self.assertTrue(IngestJob.objects.filter(image=image).exists())
+        self.assertEqual(
+            metrics.get("url_dedup_misses"),
+            {"url_dedup_misses": 1},
+        )
+
+    def test_reuse_increments_blob_references(self):
+        blob = ImageBlob.objects.create(
+            digest="a" * 64,
+            file=self.existing.image.name,
+            size=7,
+            ref_count=1,
+        )
+        Images.objects.filter(id=self.existing.id).update(blob=blob)
+
+        image = self.create_image("https://example.com/image.png")
+
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(Images.objects.get(id=image.id).blob, blob)
+
+    def test_backfill_url_hashes(self):
+        Images.objects.update(url_hash="")
+
+        call_command(
+            "backfill_url_hashes",
+            "--batch-size=1",
+            stdout=io.StringIO(),
+        )
+
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            self.existing.url_hash,
+            url_hash("https://example.com/image.png"),
+        )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestWarmThumbnails(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="password",
+        )
+
+    def test_warm_thumbnails_command(self):
+        created = [
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+                image=SimpleUploadedFile(f"{i}.png", make_png(size=(40, 30))),
+            )
+            for i in range(3)
+        ]
+        for image in created:
+            self.assertFalse(thumbnail_exists(image.image, "list"))
+
+        out = io.StringIO()
+        call_command(
+            "warm_thumbnails",
+            "--processes=1",
+            "--batch-size=2",
+            stdout=out,
+        )
+
+        self.assertIn("Done: 3 warmed, 0 failed", out.getvalue())
+        for image in created:
+            self.assertTrue(thumbnail_exists(image.image, "list"))
+            self.assertTrue(thumbnail_exists(image.image, "detail"))
+
+    def test_warm_thumbnails_logs_broken_images(self):
+        Images.objects.create(
+            user=self.user,
+            title="Broken",
+            url="https://example.com/broken.png",
+            image=SimpleUploadedFile("broken.png", b"not an image"),
+        )
+
+        out = io.StringIO()
+        with self.assertLogs(
+            "images.management.commands.warm_thumbnails",
+            "ERROR",
+        ) as logs:
+            call_command("warm_thumbnails", "--processes=1", stdout=out)
+
+        self.assertIn("Done: 0 warmed, 1 failed", out.getvalue())
+        self.assertIn("Thumbnails for image", logs.output[0])
+
+    def test_warm_thumbnails_resumes_from_start_id(self):
+        first, second = (
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+                image=SimpleUploadedFile(f"{i}.png", make_png()),
+            )
+            for i in range(2)
+        )
+
+        call_command(
+            "warm_thumbnails",
+            "--processes=1",
+            f"--start-id={first.id}",
+            stdout=io.StringIO(),
+        )
+
+        self.assertFalse(thumbnail_exists(first.image, "list"))
+        self.assertTrue(thumbnail_exists(second.image, "list"))
@@ -0,0 +1,233 @@
+import io
+import re
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+import images.likes
+from images.models import Images
+
+
+class TestTotalLikes(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="pass")
+            for i in range(3)
+        ]
+        self.images = [
+            Images.objects.create(
+                user=self.users[0],
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            for i in range(3)
+        ]
+
+    def total_likes(self, image):
+        image.refresh_from_db(fields=["total_likes"])
+        return image.total_likes
+
+    def test_like_and_unlike_return_new_count(self):
+        image = self.images[0]
+
+        self.assertEqual(
+            images.likes.like_image(image.id, self.users[0]),
+            (1, True),
+        )
+        self.assertEqual(
+            images.likes.like_image(image.id, self.users[1]),
+            (2, True),
+        )
+        self.assertEqual(
+            images.likes.like_image(image.id, self.users[1]),
+            (2, False),
+        )
+        self.assertEqual(
+            images.likes.unlike_image(image.id, self.users[0]),
+            1,
+        )
+        self.assertEqual(
+            images.likes.unlike_image(image.id, self.users[0]),
+            1,
+        )
+        self.assertEqual(self.total_likes(image), image.users_like.count())
+
+    def test_counter_never_goes_negative(self):
+        image = self.images[0]
+        image.users_like.add(self.users[0])
+
+        self.assertEqual(
+            images.likes.unlike_image(image.id, self.users[0]),
+            0,
+        )
+
+    def test_reconcile_command_repairs_drift(self):
+        first, second, third = self.images
+        first.users_like.add(*self.users)
+        second.users_like.add(self.users[0])
+        images.likes.like_image(third.id, self.users[0])
+        Images.objects.filter(id=third.id).update(total_likes=5)
+
+        out = io.StringIO()
+        call_command("reconcile_likes", "--batch-size=2", stdout=out)
+
+        self.assertIn("Done, 3 image(s) checked, 3 repaired", out.getvalue())
+        self.assertEqual(
+            [self.total_likes(image) for image in self.images],
+            [3, 1, 1],
+        )
+
+    def test_reconcile_command_resumes_from_start_id(self):
+        first, second, _ = self.images
+        first.users_like.add(self.users[0])
+        second.users_like.add(self.users[0])
+
+        call_command(
+            "reconcile_likes",
+            f"--start-id={first.id}",
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(self.total_likes(first), 0)
+        self.assertEqual(self.total_likes(second), 1)
+
+
+class TestApplyLikes(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass")
+        self.images = [
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            for i in range(4)
+        ]
+        self.ids = [image.id for image in self.images]
+
+    def test_batch_outcomes(self):
+        first, second, third, fourth = self.ids
+        images.likes.like_image(second, self.user)
+        images.likes.like_image(third, self.user)
+
+        results = images.likes.apply_likes(
+            self.user,
+            [
+                (first, "like"),
+                (second, "like"),
+                (third, "unlike"),
+                (fourth, "unlike"),
+                (9999999, "like"),
+            ],
+        )
+
+        self.assertEqual(
+            [
+                (result["status"], result.get("total_likes"))
+                for result in results
+            ],
+            [
+                ("liked", 1),
+                ("unchanged", 1),
+                ("unliked", 0),
+                ("unchanged", 0),
+                ("error", None),
+            ],
+        )
+        self.assertEqual(
+            set(self.user.images_liked.values_list("id", flat=True)),
+            {first, second},
+        )
+
+    def test_toggles_are_coalesced(self):
+        first, second, *_ = self.ids
+
+        with self.assertNumQueries(8):
+            results = images.likes.apply_likes(
+                self.user,
+                [
+                    (first, "like"),
+                    (second, "like"),
+                    (first, "unlike"),
+                    (first, "like"),
+                    (second, "unlike"),
+                ],
+            )
+
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["coalesced", "coalesced", "coalesced", "liked", "unchanged"],
+        )
+        self.assertEqual(self.total_likes(first), 1)
+        self.assertEqual(self.total_likes(second), 0)
+
+    def test_repeated_batch_is_idempotent(self):
+        actions = [(image_id, "like") for image_id in self.ids]
+
+        images.likes.apply_likes(self.user, actions)
+        results = images.likes.apply_likes(self.user, actions)
+
+        self.assertEqual(
+            {result["status"] for result in results},
+            {"unchanged"},
+        )
+        self.assertEqual(
+            [self.total_likes(image_id) for image_id in self.ids],
+            [1, 1, 1, 1],
+        )
+
+    def total_likes(self, image_id):
+        return Images.objects.get(id=image_id).total_likes
+
+
+class TestLikedImages(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass")
+        self.images = [
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            for i in range(5)
+        ]
+        for image in self.images[::2]:
+            images.likes.like_image(image.id, self.user)
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_like_state_of_list_in_one_query(self):
+        template = Template(
+            "{% load image_tags %}"
+            "{% liked_images images as liked %}"
+            "{% for image in images %}"
+            "{% has_liked image as is_liked %}{{ is_liked|yesno:'1,0' }}"
+            "{% endfor %}",
+        )
+
+        with self.assertNumQueries(1):
+            html = template.render(
+                Context({"request": self.request, "images": self.images}),
+            )
+
+        self.assertEqual(html, "10101")
+
+    def test_image_list_primes_like_state(self):
+        self.client.login(username="user", password="pass")
+        for image in self.images:
+            image.status = Images.Status.READY
+            image.save()
+
+        response = self.client.get(reverse("images:list"))
+
+        [ids] = re.findall(
+            r'class="liked-images" data-ids="([\d,]+)"',
+            response.content.decode(),
+        )
+        self.assertEqual(
+            {int(image_id) for image_id in ids.split(",")},
+            {image.id for image in self.images[::2]},
+        )
@@ -1,9 +1,11 @@
-from datetime import date
+from datetime import date, timedelta
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
 
 import account.models
 import images.models
@@ -47,3 +49,44 @@ class TestImageModel(TestCase):
             image = images.models.Images(user=self.user, title="", url="")
             image.full_clean()
             image.save()
+
+
+class TestLikeModel(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="test", password="pass")
+        self.image = images.models.Images.objects.create(
+            user=self.user,
+            title="test",
+            url="http://test.com/image.png",
+        )
+
+    def test_m2m_add_creates_timestamped_like(self):
+        self.image.users_like.add(self.user)
+
+        like = images.models.Like.objects.get()
+        self.assertEqual(like.image, self.image)
+        self.assertEqual(like.user, self.user)
+        self.assertIsNotNone(like.created)
+        self.assertIn(self.image, self.user.images_liked.all())
+
+    def test_like_is_unique_per_image_and_user(self):
+        images.models.Like.objects.create(image=self.image, user=self.user)
+
+        with self.assertRaises(IntegrityError):
+            images.models.Like.objects.create(
+                image=self.image,
+                user=self.user,
+            )
+
+    def test_recent_likes(self):
+        other = User.objects.create(username="other", password="pass")
+        images.models.Like.objects.create(image=self.image, user=self.user)
+        old = images.models.Like.objects.create(image=self.image, user=other)
+        images.models.Like.objects.filter(id=old.id).update(
+            created=timezone.now() - timedelta(hours=2),
+        )
+
+        recent = self.image.likes.filter(
+            created__gte=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual([like.user for like in recent], [self.user])
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.db import connection
+import django.shortcuts
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from images.models import Images
+from images.pagination import CursorPaginator, InvalidCursor
+
+
+class TestCursorPaginator(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        now = timezone.now()
+        for i in range(11):
+            image = Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+            # Пары записей с одинаковым created проверяют разрыв по id
+            Images.objects.filter(id=image.id).update(
+                created=now - timedelta(minutes=i // 2),
+            )
+
+    def walk(self, paginator):
+        seen = []
+        cursor = None
+        while True:
+            page = paginator.page(cursor)
+            seen.extend(image.id for image in page)
+            if not page.has_next():
+                return seen
+            cursor = page.next_cursor
+
+    def test_pages_cover_queryset_in_order(self):
+        expected = list(
+            Images.objects.order_by("-created", "-id").values_list(
+                "id",
+                flat=True,
+            ),
+        )
+
+        for per_page in (1, 3, 4, 11, 20):
+            with self.subTest(per_page=per_page):
+                paginator = CursorPaginator(Images.objects.all(), per_page)
+                self.assertEqual(self.walk(paginator), expected)
+
+    def test_ascending_ordering(self):
+        paginator = CursorPaginator(
+            Images.objects.all(),
+            4,
+            ordering=("title", "id"),
+        )
+
+        self.assertEqual(
+            self.walk(paginator),
+            list(
+                Images.objects.order_by("title", "id").values_list(
+                    "id",
+                    flat=True,
+                ),
+            ),
+        )
+
+    def test_no_count_or_offset_queries(self):
+        paginator = CursorPaginator(Images.objects.all(), 4)
+        cursor = paginator.page().next_cursor
+
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(cursor)
+
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]["sql"].upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_invalid_cursor(self):
+        paginator = CursorPaginator(Images.objects.all(), 4)
+
+        for cursor in ("garbage", "W10", "WzEsMiwzXQ", "WyJ4IiwgMV0"):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(cursor)
+
+
+class TestImageListCursor(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        self.client.login(username="testuser", password="testpass")
+        for i in range(10):
+            Images.objects.create(
+                user=self.user,
+                title=f"Image {i}",
+                url=f"https://example.com/{i}.png",
+            )
+        self.url = django.shortcuts.reverse("images:list")
+
+    def test_infinite_scroll_follows_cursor(self):
+        response = self.client.get(self.url)
+        cursor = response.context["images"].next_cursor
+        self.assertContains(response, f'data-next-cursor="{cursor}"')
+
+        response = self.client.get(
+            self.url,
+            {"images_only": 1, "cursor": cursor},
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'class="image"', count=2)
+        self.assertNotIn("X-Next-Cursor", response)
+
+    def test_fragment_with_invalid_cursor_is_empty(self):
+        response = self.client.get(
+            self.url,
+            {"images_only": 1, "cursor": "garbage"},
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.content, b"")
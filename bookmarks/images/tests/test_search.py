@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+from django.contrib.auth.models import User
+from django.db import connection
+import django.shortcuts
+from django.test import TestCase
+
+from images.models import Images
+from images.pagination import InvalidCursor
+from images.search import search_images
+
+
+class TestSearchImages(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+
+    def create(self, title, description="", **kwargs):
+        return Images.objects.create(
+            user=self.user,
+            title=title,
+            description=description,
+            url="https://example.com/image.png",
+            **kwargs,
+        )
+
+    def titles(self, query, **kwargs):
+        return [image.title for image in search_images(query, 20, **kwargs)]
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.create("Sunset over the sea", "orange sky")
+        self.create("Mountain lake", "a sunset behind the peaks")
+        self.create("City at night")
+
+        self.assertEqual(
+            self.titles("sunset"),
+            ["Sunset over the sea", "Mountain lake"],
+        )
+
+    def test_stemming_and_all_words_required(self):
+        self.create("Running dogs")
+        self.create("Dog sleeping")
+
+        self.assertEqual(self.titles("run dog"), ["Running dogs"])
+
+    def test_only_ready_images_are_found(self):
+        self.create("Pending sunset", status=Images.Status.PENDING)
+        self.create("Failed sunset", status=Images.Status.FAILED)
+
+        self.assertEqual(self.titles("sunset"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        image = self.create("Old title")
+        image.title = "New title"
+        image.save()
+        self.create("Removed").delete()
+
+        self.assertEqual(self.titles("old"), [])
+        self.assertEqual(self.titles("new"), ["New title"])
+        self.assertEqual(self.titles("removed"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.create('Quote " and star * NEAR(')
+
+        self.assertEqual(self.titles('" * NEAR( OR'), [])
+        self.assertEqual(self.titles("star"), ['Quote " and star * NEAR('])
+
+    def test_keyset_pages_cover_all_results(self):
+        for i in range(7):
+            self.create(f"Cat {i}", "cat " * (i % 3))
+        expected = search_images("cat", 100)
+
+        seen = []
+        cursor = None
+        while True:
+            page = search_images("cat", 3, cursor)
+            seen.extend(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, list(expected))
+        self.assertEqual(len(seen), 7)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            search_images("cat", 3, "WyJ4Il0")
+
+    def test_triggers_survive_table_rebuilds(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("FTS5 triggers are SQLite-only")
+
+        # Тестовая база собрана миграциями, включая пересоздание
+        # images_images в 0009
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'",
+            )
+            triggers = {name for (name,) in cursor.fetchall()}
+
+        self.assertLessEqual(
+            {
+                "images_search_insert",
+                "images_search_delete",
+                "images_search_update",
+            },
+            triggers,
+        )
+        self.create("Created after migrate")
+        self.assertEqual(self.titles("created"), ["Created after migrate"])
+
+
+class TestImageSearchView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        self.client.login(username="testuser", password="testpass")
+        self.url = django.shortcuts.reverse("images:search")
+
+    def test_search_page(self):
+        Images.objects.create(
+            user=self.user,
+            title="Sunset",
+            url="https://example.com/image.png",
+        )
+
+        response = self.client.get(self.url, {"q": "sunset"})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'class="image"', count=1)
+
+    def test_empty_query(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIsNone(response.context["images"])
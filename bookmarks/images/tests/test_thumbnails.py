@@ -0,0 +1,131 @@
+import io
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import override_settings, TestCase
+
+from bookmarks import metrics
+from images.models import Images
+from images.tests.http_server import make_png
+import images.thumbnails
+from images.thumbnails import (
+    COUNTERS,
+    generate_thumbnails,
+    thumbnail_index,
+    ThumbnailIndex,
+)
+
+
+LIST_TEMPLATE = Template(
+    "{% load image_tags %}"
+    "{% for image in images %}{{ image|image_thumbnail:'list' }};"
+    "{% endfor %}",
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestThumbnailIndex(TestCase):
+    def setUp(self):
+        cache.clear()
+        thumbnail_index.clear()
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="password",
+        )
+
+    def create_image(self, name):
+        return Images.objects.create(
+            user=self.user,
+            title=name,
+            url=f"https://example.com/{name}.png",
+            image=SimpleUploadedFile(f"{name}.png", make_png()),
+        )
+
+    def render_list(self):
+        return LIST_TEMPLATE.render(
+            Context({"images": Images.objects.order_by("id")}),
+        )
+
+    def test_warm_render_does_not_touch_storage(self):
+        created = [self.create_image(f"image{i}") for i in range(3)]
+        for image in created:
+            generate_thumbnails(image)
+        thumbnail_index.clear()
+
+        first = self.render_list()
+        with mock.patch.object(
+            images.thumbnails,
+            "get_thumbnailer",
+            side_effect=AssertionError("storage lookup"),
+        ):
+            second = self.render_list()
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.count(".png"), 3)
+        self.assertEqual(
+            thumbnail_index.stats(),
+            {
+                "thumbnail_local_hits": 3,
+                "thumbnail_shared_hits": 3,
+                "thumbnail_misses": 0,
+            },
+        )
+
+    def test_cold_render_fills_index(self):
+        self.create_image("image")
+
+        self.render_list()
+        self.render_list()
+
+        self.assertEqual(thumbnail_index.stats()["thumbnail_misses"], 1)
+        self.assertEqual(thumbnail_index.stats()["thumbnail_local_hits"], 1)
+
+    def test_changed_source_is_not_served_from_index(self):
+        image = self.create_image("image")
+        generate_thumbnails(image)
+        old_url = images.thumbnails.thumbnail_url(image, "list")
+
+        image.image = SimpleUploadedFile("other.png", make_png(size=(8, 8)))
+        image.save()
+
+        new_url = images.thumbnails.thumbnail_url(image, "list")
+        self.assertNotEqual(old_url, new_url)
+        self.assertIn("other", new_url)
+
+    def test_counters_are_flushed_to_shared_metrics(self):
+        self.create_image("image")
+        self.render_list()
+
+        out = io.StringIO()
+        call_command("image_metrics", "--reset", stdout=out)
+
+        self.assertIn(
+            "0 local hit(s), 0 shared hit(s), 1 miss(es)",
+            out.getvalue(),
+        )
+        self.assertEqual(
+            metrics.get(*COUNTERS),
+            dict.fromkeys(COUNTERS, 0),
+        )
+
+
+class TestThumbnailIndexEviction(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_least_recently_used_entry_is_evicted(self):
+        index = ThumbnailIndex(max_size=2)
+        index.set(1, "a.png", "list", "/a")
+        index.set(2, "b.png", "list", "/b")
+        index.get(1, "a.png", "list")
+        index.set(3, "c.png", "list", "/c")
+        cache.clear()
+
+        self.assertEqual(index.get(1, "a.png", "list"), "/a")
+        self.assertIsNone(index.get(2, "b.png", "list"))
+        self.assertEqual(index.get(3, "c.png", "list"), "/c")
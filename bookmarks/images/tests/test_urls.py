@@ -68,7 +68,10 @@ class TestImageLikeUrls(TestCase):
             {"id": self.image.id, "action": "like"},
         )
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertJSONEqual(response.content, {"status": "ok"})
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "total_likes": 1},
+        )
 
     def test_image_unlike_url_valid(self):
         self.client.login(username="testuser", password="password")
@@ -80,7 +83,10 @@ class TestImageLikeUrls(TestCase):
             {"id": self.image.id, "action": "unlike"},
         )
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertJSONEqual(response.content, {"status": "ok"})
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "total_likes": 0},
+        )
 
 
 class TestDetailUrls(TestCase):
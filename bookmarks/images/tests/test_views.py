@@ -2,11 +2,15 @@ from http import HTTPStatus
 
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 import django.shortcuts
-from django.test import TestCase
+from django.test import override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from account.models import Profile
-from images.models import Images
+from actions.models import Action
+from images.likes import like_image
+from images.models import Images, IngestJob
 
 
 class TestDetailView(TestCase):
@@ -95,6 +99,8 @@ class ImageCreateViewTests(TestCase):
         self.assertEqual(new_image.description, "Test Description")
         self.assertEqual(new_image.url, "https://example.com/image.jpg")
         self.assertEqual(new_image.slug, "test-image")
+        self.assertEqual(new_image.status, Images.Status.PENDING)
+        self.assertTrue(IngestJob.objects.filter(image=new_image).exists())
 
         self.assertRedirects(response, new_image.get_absolute_url())
 
@@ -114,6 +120,164 @@ class ImageCreateViewTests(TestCase):
         self.assertEqual(Images.objects.count(), 0)
 
 
+@override_settings(IMAGES_DETAIL_LIKERS=5, IMAGES_LIKERS_PER_PAGE=4)
+class TestImageLikers(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="password",
+        )
+        self.image = Images.objects.create(
+            user=self.user,
+            title="Test Image",
+            url="https://example.com/image.jpg",
+            image=SimpleUploadedFile("image.jpg", b"file_content"),
+        )
+        self.url = self.image.get_absolute_url()
+        self.client.login(username="testuser", password="password")
+
+    def add_likers(self, count):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            liker = User.objects.create_user(
+                username=f"liker{i}",
+                first_name=f"Liker {i}",
+            )
+            if i % 2:
+                Profile.objects.create(user=liker, photo=f"users/{i}.png")
+            like_image(self.image.id, liker)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_detail_query_count_does_not_depend_on_likes(self):
+        self.add_likers(2)
+        few = self.count_queries()
+        self.add_likers(30)
+
+        self.assertEqual(self.count_queries(), few)
+
+    def test_detail_shows_recent_likers_only(self):
+        self.add_likers(8)
+
+        response = self.client.get(self.url)
+
+        likers = [user.username for user in response.context["likers"]]
+        self.assertEqual(likers, [f"liker{i}" for i in range(8, 3, -1)])
+        self.assertContains(response, "See all 8 likes")
+        url = django.shortcuts.reverse("images:likers", args=[self.image.id])
+        self.assertContains(response, f'data-url="{url}"')
+        self.assertContains(response, 'data-action="like"')
+
+    def test_detail_hides_all_likers_link_from_anonymous(self):
+        self.add_likers(8)
+        self.client.logout()
+
+        response = self.client.get(self.url)
+
+        self.assertNotContains(response, "See all 8 likes")
+
+    def test_detail_marks_liked_image(self):
+        like_image(self.image.id, self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'data-action="unlike"')
+
+    def test_likers_endpoint_pages_through_all_likers(self):
+        self.add_likers(6)
+        url = django.shortcuts.reverse("images:likers", args=[self.image.id])
+
+        first = self.client.get(url).json()
+        second = self.client.get(url, {"cursor": first["next_cursor"]})
+
+        self.assertEqual(len(first["likers"]), 4)
+        self.assertEqual(first["likers"][0]["username"], "liker6")
+        self.assertEqual(first["likers"][0]["photo"], None)
+        self.assertEqual(first["likers"][1]["photo"], "/media/users/5.png")
+        self.assertEqual(
+            [liker["username"] for liker in second.json()["likers"]],
+            ["liker2", "liker1"],
+        )
+        self.assertIsNone(second.json()["next_cursor"])
+
+    def test_likers_endpoint_non_existing_image(self):
+        url = django.shortcuts.reverse("images:likers", args=[9999999])
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class TestImageStatusView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        self.client.login(username="testuser", password="testpass")
+
+    def test_status_pending_image(self):
+        image = Images.objects.create(
+            user=self.user,
+            title="Test Image",
+            url="https://example.com/image.jpg",
+            status=Images.Status.PENDING,
+        )
+
+        response = self.client.get(
+            django.shortcuts.reverse("images:status", args=[image.id]),
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertJSONEqual(response.content, {"status": "pending"})
+
+    def test_status_ready_image(self):
+        image = Images.objects.create(
+            user=self.user,
+            title="Test Image",
+            url="https://example.com/image.jpg",
+            image=SimpleUploadedFile(
+                "test_image.jpg",
+                b"file_content",
+                content_type="image/jpeg",
+            ),
+        )
+
+        response = self.client.get(
+            django.shortcuts.reverse("images:status", args=[image.id]),
+        )
+
+        self.assertEqual(response.json()["status"], "ready")
+        self.assertEqual(response.json()["url"], image.image.url)
+
+    def test_status_non_existing_image(self):
+        response = self.client.get(
+            django.shortcuts.reverse("images:status", args=[9999999]),
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_detail_view_pending_image(self):
+        image = Images.objects.create(
+            user=self.user,
+            title="Test Image",
+            url="https://example.com/image.jpg",
+            status=Images.Status.PENDING,
+        )
+
+        response = self.client.get(image.get_absolute_url())
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(
+            response,
+            django.shortcuts.reverse("images:status", args=[image.id]),
+        )
+
+
 class TestImageLikeView(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -142,19 +306,62 @@ class TestImageLikeView(TestCase):
             {"id": self.image.id, "action": "like"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "ok"})
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "total_likes": 1},
+        )
         self.assertIn(self.user, self.image.users_like.all())
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.total_likes, 1)
+
+    def test_repeated_like_is_counted_once(self):
+        for _ in range(2):
+            response = self.client.post(
+                django.shortcuts.reverse("images:like"),
+                {"id": self.image.id, "action": "like"},
+            )
+
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "total_likes": 1},
+        )
+
+    @override_settings(ACTIONS_DUPLICATE_WINDOW=0)
+    def test_repeated_like_creates_one_action(self):
+        for _ in range(2):
+            self.client.post(
+                django.shortcuts.reverse("images:like"),
+                {"id": self.image.id, "action": "like"},
+            )
+
+        self.assertEqual(
+            Action.objects.filter(user=self.user, verb="likes").count(),
+            1,
+        )
 
     def test_unlike_image(self):
-        self.image.users_like.add(self.user)
+        like_image(self.image.id, self.user)
         response = self.client.post(
             django.shortcuts.reverse("images:like"),
             {"id": self.image.id, "action": "unlike"},
         )
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content, {"status": "ok"})
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "total_likes": 0},
+        )
         self.assertNotIn(self.user, self.image.users_like.all())
 
+    def test_unlike_not_liked_image(self):
+        response = self.client.post(
+            django.shortcuts.reverse("images:like"),
+            {"id": self.image.id, "action": "unlike"},
+        )
+        self.assertJSONEqual(
+            response.content,
+            {"status": "ok", "total_likes": 0},
+        )
+
     def test_like_image_not_authenticated(self):
         self.client.logout()
         response = self.client.post(
@@ -196,6 +403,70 @@ class TestImageLikeView(TestCase):
         )
 
 
+class TestImageLikeBatchView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+        )
+        self.client.login(username="testuser", password="testpass")
+        self.image = Images.objects.create(
+            user=self.user,
+            title="Test Image",
+            url="https://example.com/image.jpg",
+        )
+        self.url = django.shortcuts.reverse("images:like_batch")
+
+    def post(self, data):
+        return self.client.post(
+            self.url,
+            data,
+            content_type="application/json",
+        )
+
+    def test_batch_like(self):
+        response = self.post(
+            {"actions": [{"id": self.image.id, "action": "like"}]},
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertJSONEqual(
+            response.content,
+            {
+                "status": "ok",
+                "results": [
+                    {
+                        "id": self.image.id,
+                        "action": "like",
+                        "status": "liked",
+                        "total_likes": 1,
+                    },
+                ],
+            },
+        )
+
+    @override_settings(IMAGES_LIKE_BATCH_SIZE=2)
+    def test_invalid_batches(self):
+        for data in (
+            {},
+            {"actions": []},
+            {"actions": [{"id": "1", "action": "like"}]},
+            {"actions": [{"id": self.image.id, "action": "love"}]},
+            {"actions": [{"id": self.image.id, "action": "like"}] * 3},
+        ):
+            with self.subTest(data=data):
+                response = self.post(data)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertEqual(response.json()["status"], "error")
+
+    def test_batch_not_authenticated(self):
+        self.client.logout()
+
+        response = self.post({"actions": []})
+
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+
 class TestImageListView(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -0,0 +1,177 @@
+from collections import Counter, OrderedDict
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.conf import settings as thumbnail_settings
+from easy_thumbnails.files import get_thumbnailer
+
+from bookmarks import metrics
+from images.models import Images
+
+
+COUNTERS = (
+    "thumbnail_local_hits",
+    "thumbnail_shared_hits",
+    "thumbnail_misses",
+)
+
+
+class ThumbnailIndex:
+    """
+    Индекс URL готовых миниатюр по (id объекта, алиас) для поля
+    target из THUMBNAIL_ALIASES.
+    Сначала смотрит в память процесса, затем в общий кеш Django.
+    Имя исходного файла входит в ключ, поэтому смена файла
+    делает старые записи недостижимыми во всех процессах
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        flush_every: int = 100,
+        target: str = "images.Images.image",
+        namespace: str = "images",
+    ) -> None:
+        self.max_size = max_size
+        self.flush_every = flush_every
+        self.target = target
+        self.namespace = namespace
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._pending = Counter()
+
+    def _prefix(self, object_id: int) -> str:
+        return f"{self.namespace}:thumbnail:{object_id}:"
+
+    def _key(self, object_id: int, source: str, alias: str) -> str:
+        return f"{self._prefix(object_id)}{alias}:{source}"
+
+    def aliases(self) -> list[str]:
+        return list(aliases.all(target=self.target) or {})
+
+    def _record(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+            self._pending[name] += 1
+            flush = self._pending.total() >= self.flush_every
+
+        if flush:
+            self.flush_stats()
+
+    def flush_stats(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+
+        for counter, delta in pending.items():
+            metrics.incr(counter, delta)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {name: self._stats[name] for name in COUNTERS}
+
+    def _remember(self, key: str, url: str) -> None:
+        with self._lock:
+            self._local[key] = url
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def get(self, object_id: int, source: str, alias: str) -> str | None:
+        key = self._key(object_id, source, alias)
+        with self._lock:
+            url = self._local.get(key)
+            if url is not None:
+                self._local.move_to_end(key)
+        if url is not None:
+            self._record("thumbnail_local_hits")
+            return url
+
+        url = cache.get(key)
+        if url is not None:
+            self._remember(key, url)
+            self._record("thumbnail_shared_hits")
+            return url
+
+        self._record("thumbnail_misses")
+        return None
+
+    def set(self, object_id: int, source: str, alias: str, url: str) -> None:
+        key = self._key(object_id, source, alias)
+        self._remember(key, url)
+        cache.set(key, url, timeout=settings.IMAGES_THUMBNAIL_INDEX_TIMEOUT)
+
+    def invalidate(self, object_id: int, source: str = "") -> None:
+        prefix = self._prefix(object_id)
+        with self._lock:
+            keys = [key for key in self._local if key.startswith(prefix)]
+            for key in keys:
+                del self._local[key]
+
+        if source:
+            cache.delete_many(
+                [
+                    self._key(object_id, source, alias)
+                    for alias in self.aliases()
+                ],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+            self._stats.clear()
+            self._pending.clear()
+
+
+thumbnail_index = ThumbnailIndex(settings.IMAGES_THUMBNAIL_INDEX_SIZE)
+
+
+def generate_thumbnails(image: Images) -> None:
+    """
+    Сгенерировать все миниатюры из THUMBNAIL_ALIASES для изображения
+    и записать их URL в индекс
+    """
+    if not image.image:
+        return
+
+    thumbnailer = get_thumbnailer(image.image)
+    all_options = aliases.all(target=image.image, include_global=True) or {}
+    for alias, options in all_options.items():
+        options["ALIAS"] = alias
+        thumbnail = thumbnailer.get_thumbnail(options)
+        thumbnail_index.set(image.id, image.image.name, alias, thumbnail.url)
+
+
+def file_thumbnail_url(
+    index: ThumbnailIndex,
+    object_id: int,
+    file: FieldFile,
+    alias: str,
+) -> str:
+    """
+    URL миниатюры файла через индекс: генератор миниатюр и его
+    таблицы в БД задействуются только при промахе
+    """
+    if not file:
+        return ""
+
+    url = index.get(object_id, file.name, alias)
+    if url is not None:
+        return url
+
+    try:
+        thumbnail = get_thumbnailer(file)[alias]
+    except Exception:
+        if thumbnail_settings.THUMBNAIL_DEBUG:
+            raise
+        return ""
+
+    index.set(object_id, file.name, alias, thumbnail.url)
+    return thumbnail.url
+
+
+def thumbnail_url(image: Images, alias: str) -> str:
+    return file_thumbnail_url(thumbnail_index, image.id, image.image, alias)
@@ -13,6 +13,22 @@ urlpatterns = [
         images.views.ImageDetailView.as_view(),
         name="detail",
     ),
+    path(
+        "status/<int:id>/",
+        images.views.ImageStatusView.as_view(),
+        name="status",
+    ),
+    path(
+        "likers/<int:id>/",
+        images.views.ImageLikersView.as_view(),
+        name="likers",
+    ),
     path("like/", images.views.ImageLikeView.as_view(), name="like"),
+    path(
+        "like/batch/",
+        images.views.ImageLikeBatchView.as_view(),
+        name="like_batch",
+    ),
+    path("search/", images.views.ImageSearchView.as_view(), name="search"),
     path("", images.views.image_list, name="list"),
 ]
@@ -1,16 +1,37 @@
+from http import HTTPStatus
+import json
 from typing import Any
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.core.files.storage import default_storage
 from django.http import HttpRequest, HttpResponse, JsonResponse
 import django.shortcuts
+from django.template.loader import render_to_string
 from django.views import View
 from django.views.generic import CreateView, DetailView
 
+from actions.utils import create_action
+from images.cards import (
+    get_list_version,
+    get_page,
+    render_cards,
+    render_page,
+)
 from images.forms import ImagesCreateForm
+from images.likes import (
+    apply_likes,
+    like_image,
+    liked_by,
+    recent_likers,
+    recent_likes,
+    unlike_image,
+)
 from images.models import Images
+from images.pagination import CursorPaginator, InvalidCursor
+from images.search import search_images
 
 
 class ImageCreateView(LoginRequiredMixin, CreateView):
@@ -25,8 +46,10 @@ class ImageCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form: ImagesCreateForm) -> HttpResponse:
         form.instance.user = self.request.user
+        response = super().form_valid(form)
+        create_action(self.request.user, "bookmarked image", self.object)
         messages.success(self.request, "Image added successfully")
-        return super().form_valid(form)
+        return response
 
     def form_invalid(self, form: ImagesCreateForm) -> HttpResponse:
         return super().form_invalid(form)
@@ -48,10 +71,84 @@ class ImageDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         context["image"] = self.object
         context["section"] = "images"
+        context["likers"] = recent_likers(
+            self.object.id,
+            settings.IMAGES_DETAIL_LIKERS,
+        )
 
         return context
 
 
+class ImageLikersView(LoginRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, request: HttpRequest, id: int) -> JsonResponse:
+        if not Images.objects.filter(id=id).exists():
+            return JsonResponse(
+                {"status": "error", "message": "Image does not exist"},
+                status=HTTPStatus.NOT_FOUND,
+            )
+
+        paginator = CursorPaginator(
+            recent_likes(id),
+            settings.IMAGES_LIKERS_PER_PAGE,
+        )
+        try:
+            page = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor:
+            return JsonResponse(
+                {"status": "error", "message": "Invalid cursor"},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+
+        likers = []
+        for like in page:
+            profile = getattr(like.user, "profile", None)
+            likers.append(
+                {
+                    "username": like.user.username,
+                    "first_name": like.user.first_name,
+                    "photo": (
+                        profile.photo.url
+                        if profile and profile.photo
+                        else None
+                    ),
+                    "url": like.user.get_absolute_url(),
+                    "liked": like.created.isoformat(),
+                },
+            )
+
+        return JsonResponse(
+            {
+                "status": "ok",
+                "likers": likers,
+                "next_cursor": page.next_cursor,
+            },
+        )
+
+
+class ImageStatusView(LoginRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, request: HttpRequest, id: int) -> JsonResponse:
+        image = (
+            Images.objects.filter(id=id)
+            .values(Images.status.field.name, Images.image.field.name)
+            .first()
+        )
+        if image is None:
+            return JsonResponse(
+                {"status": "error", "message": "Image does not exist"},
+                status=HTTPStatus.NOT_FOUND,
+            )
+
+        data = {"status": image["status"]}
+        if image["status"] == Images.Status.READY and image["image"]:
+            data["url"] = default_storage.url(image["image"])
+
+        return JsonResponse(data)
+
+
 class ImageLikeView(LoginRequiredMixin, View):
     http_method_names = ["post"]
 
@@ -65,46 +162,155 @@ class ImageLikeView(LoginRequiredMixin, View):
             )
 
         try:
-            image = Images.objects.get(id=image_id)
+            image = Images.objects.only("id").get(id=image_id)
             if action == "like":
-                image.users_like.add(request.user)
+                total_likes, created = like_image(image.id, request.user)
+                if created:
+                    create_action(request.user, "likes", image)
             elif action == "unlike":
-                image.users_like.remove(request.user)
+                total_likes = unlike_image(image.id, request.user)
             else:
                 return JsonResponse(
                     {"status": "error", "message": "Invalid action"},
                 )
 
-            return JsonResponse({"status": "ok"})
+            return JsonResponse({"status": "ok", "total_likes": total_likes})
         except Images.DoesNotExist:
             return JsonResponse(
                 {"status": "error", "message": "Image does not exist"},
             )
 
 
-@login_required
-def image_list(request: HttpRequest) -> HttpResponse:
-    images = Images.objects.all()
-    paginator = Paginator(images, 8)
-    page = request.GET.get("page")
-    images_only = request.GET.get("images_only")
+class ImageLikeBatchView(LoginRequiredMixin, View):
+    """
+    Пачка лайков одним запросом:
+    {"actions": [{"id": 1, "action": "like"}, ...]}
+    """
 
-    try:
-        images = paginator.page(page)
-    except PageNotAnInteger:
-        images = paginator.page(1)
-    except EmptyPage:
-        if images_only:
-            return HttpResponse("")
-        images = paginator.page(paginator.num_pages)
+    http_method_names = ["post"]
+
+    def parse_actions(self, body: bytes) -> list[tuple[int, str]]:
+        try:
+            items = json.loads(body)["actions"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(
+                "Expected a JSON object with an actions list",
+            ) from None
+
+        if not isinstance(items, list) or not items:
+            raise ValueError("Expected a non-empty actions list")
+        if len(items) > settings.IMAGES_LIKE_BATCH_SIZE:
+            raise ValueError(
+                f"At most {settings.IMAGES_LIKE_BATCH_SIZE} actions allowed",
+            )
+
+        actions = []
+        for item in items:
+            if (
+                not isinstance(item, dict)
+                or type(item.get("id")) is not int
+                or item.get("action") not in ("like", "unlike")
+            ):
+                raise ValueError(f"Invalid action: {item!r}")
+            actions.append((item["id"], item["action"]))
+
+        return actions
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        try:
+            actions = self.parse_actions(request.body)
+        except ValueError as exc:
+            return JsonResponse(
+                {"status": "error", "message": str(exc)},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+
+        results = apply_likes(request.user, actions)
+        liked = [
+            result["id"] for result in results if result["status"] == "liked"
+        ]
+        for image in Images.objects.only("id").filter(id__in=liked):
+            create_action(request.user, "likes", image)
+
+        return JsonResponse({"status": "ok", "results": results})
+
+
+class ImageSearchView(LoginRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        query = request.GET.get("q", "").strip()
+        images = None
+        if query:
+            try:
+                images = search_images(
+                    query,
+                    settings.IMAGES_SEARCH_PER_PAGE,
+                    request.GET.get("cursor"),
+                )
+            except InvalidCursor:
+                images = search_images(query, settings.IMAGES_SEARCH_PER_PAGE)
 
-    if images_only:
         return django.shortcuts.render(
             request,
-            "images/image/list_images.html",
-            {"section": "images", "images": images},
+            "images/image/search.html",
+            {"section": "images", "query": query, "images": images},
         )
 
+
+def image_list_fragment(
+    request: HttpRequest,
+    paginator: CursorPaginator,
+    cursor: str | None,
+    scope: str = "all",
+) -> HttpResponse:
+    list_version = get_list_version()
+    cached = get_page(cursor, list_version, scope) if cursor else None
+    if cached is not None:
+        html, next_cursor, image_ids = cached
+    else:
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            return HttpResponse("")
+
+        if not page:
+            html = ""
+        elif cursor:
+            html = render_page(cursor, page, list_version, scope)
+        else:
+            html = render_cards(page)
+        next_cursor = page.next_cursor
+        image_ids = [image.id for image in page]
+
+    # Карточки общие для всех, лайки текущего пользователя
+    # дописываются к фрагменту отдельно
+    html += render_to_string(
+        "images/image/liked.html",
+        {"liked": liked_by(request).filter(image_ids)},
+    )
+    response = HttpResponse(html)
+    if next_cursor:
+        response["X-Next-Cursor"] = next_cursor
+    return response
+
+
+@login_required
+def image_list(request: HttpRequest) -> HttpResponse:
+    paginator = CursorPaginator(
+        Images.objects.filter(status=Images.Status.READY),
+        8,
+    )
+    cursor = request.GET.get("cursor")
+
+    if request.GET.get("images_only"):
+        return image_list_fragment(request, paginator, cursor)
+
+    try:
+        images = paginator.page(cursor)
+    except InvalidCursor:
+        images = paginator.page()
+
     return django.shortcuts.render(
         request,
         "images/image/list.html",